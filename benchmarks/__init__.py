@@ -0,0 +1 @@
+# Offline benchmarks for the UniDown engine: python -m benchmarks.run
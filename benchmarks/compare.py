@@ -0,0 +1,48 @@
+import argparse
+import json
+import sys
+
+# Side-by-side view of two benchmarks.run reports: python -m benchmarks.compare old.json new.json
+
+
+def load(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def metrics(report):
+    # Flatten a report into {metric name: (value, higher is better)}
+    values = {}
+    for case in report.get('analysis', []):
+        values[f"analysis.{case['name']}.median_s"] = (case['median_s'], False)
+        if 'first_entries_median_s' in case:
+            values[f"analysis.{case['name']}.first_entries_s"] = (case['first_entries_median_s'], False)
+    if 'overhead' in report:
+        values['overhead.per_item_s'] = (report['overhead']['per_item_s'], False)
+    for run in report.get('throughput', []):
+        values[f"throughput.j{run['jobs']}.c{run['connections']}.bytes_per_s"] = (run['bytes_per_s'], True)
+    return values
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare', description='Compare two benchmark reports.')
+    parser.add_argument('old')
+    parser.add_argument('new')
+    args = parser.parse_args(argv)
+
+    old, new = metrics(load(args.old)), metrics(load(args.new))
+    width = max((len(name) for name in new), default=10)
+    for name, (value, higher_is_better) in new.items():
+        if name not in old:
+            print(f"{name:<{width}}  {'-':>12}  {value:>12}")
+            continue
+        before = old[name][0]
+        change = (value - before) / before * 100 if before else 0.0
+        better = change > 0 if higher_is_better else change < 0
+        verdict = '' if abs(change) < 5 else ('better' if better else 'worse')
+        print(f"{name:<{width}}  {before:>12}  {value:>12}  {change:+7.1f}%  {verdict}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import yt_dlp.extractor
+from yt_dlp.extractor.common import InfoExtractor
+from yt_dlp.globals import extractors as extractors_context
+
+
+class UniDownBenchIE(InfoExtractor):
+    # Serves synthetic videos and playlists from a FakeSite. Besides its own local URLs it
+    # claims the Bilibili stand-in pages (BV1Bench....), so the Bilibili API path of the
+    # analyzer stays offline as well.
+    IE_NAME = 'unidown:bench'
+    _VALID_URL = (r'https?://(?:127\.0\.0\.1|localhost):\d+/bench/(?P<kind>video|playlist)/(?P<id>[\w-]+)'
+                  r'|https?://(?:www\.)?bilibili\.com/video/(?P<bvid>BV1Bench\d{4})')
+    BASE_URL = None
+
+    def _real_extract(self, url):
+        match = self._match_valid_url(url)
+        if match.group('bvid'):
+            page = self._search_regex(r'[?&]p=(\d+)', url, 'page', default='1')
+            return self._extract_video(f"{match.group('bvid')}_p{page}", url)
+        if match.group('kind') == 'video':
+            return self._extract_video(match.group('id'), url)
+
+        count = match.group('id')
+        data = self._download_json(f"{self.BASE_URL}/bench/api/playlist/{count}", count)
+        entries = (self.url_result(f"{self.BASE_URL}/bench/video/{entry['id']}", UniDownBenchIE, entry['id'],
+                                   entry['title'], duration=entry['duration'])
+                   for entry in data['entries'])
+        return self.playlist_result(entries, data['id'], data['title'])
+
+    def _extract_video(self, video_id, url):
+        data = self._download_json(f"{self.BASE_URL}/bench/api/video/{video_id}", video_id)
+        return dict(data, webpage_url=url)
+
+
+def install_fake_extractor(base_url):
+    # Put the extractor ahead of every built-in one, the way yt-dlp registers plugin extractors
+    UniDownBenchIE.BASE_URL = base_url
+    yt_dlp.extractor.import_extractors()
+    current = {name: ie for name, ie in extractors_context.value.items() if name != 'UniDownBenchIE'}
+    extractors_context.value = {'UniDownBenchIE': UniDownBenchIE, **current}
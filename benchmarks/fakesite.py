@@ -0,0 +1,234 @@
+import http.server
+import json
+import re
+import struct
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+# Local stand-in for everything the engine talks to: the Bilibili view API, b23.tv short
+# links, bilibili.com video pages, the metadata the fake extractor reads and the media files.
+# Every response is delayed by `latency` seconds; media bodies are paced to `bandwidth`
+# bytes per second per connection (0 = unlimited). With `ranges` off, media requests ignore
+# Range headers and always get the whole file.
+
+BLOCK = bytes(range(256)) * 256
+# Bilibili stand-in IDs encode their page count: BV1Bench0040 has 40 pages
+BENCH_BVID = re.compile(r'BV1Bench(\d{4})')
+# Quality ladder served for every video, as fractions of the configured video size
+FORMAT_LADDER = [('360p', 640, 360, 0.25), ('720p', 1280, 720, 0.5), ('1080p', 1920, 1080, 1.0)]
+
+
+def media_bytes(offset, length):
+    # Media content: BLOCK repeated, each copy stamped with its block number, so bytes written
+    # at the wrong offset show up when a download is compared with it
+    first = offset // len(BLOCK)
+    last = (offset + length - 1) // len(BLOCK)
+    data = b''.join(struct.pack('>Q', n) + BLOCK[8:] for n in range(first, last + 1))
+    skip = offset - first * len(BLOCK)
+    return data[skip:skip + length]
+
+
+def bench_bvid(pages):
+    return f"BV1Bench{pages:04d}"
+
+
+class FakeSite:
+    def __init__(self, latency=0.0, bandwidth=0, video_size=1024 * 1024):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.video_size = video_size
+        self.ranges = True
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def set_conditions(self, latency=None, bandwidth=None, video_size=None, ranges=None):
+        if latency is not None:
+            self.latency = latency
+        if bandwidth is not None:
+            self.bandwidth = bandwidth
+        if video_size is not None:
+            self.video_size = video_size
+        if ranges is not None:
+            self.ranges = ranges
+
+    def start(self):
+        site = self
+
+        class Handler(_Handler):
+            pass
+        Handler.site = site
+        self._server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name='fakesite', daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # --- synthetic content ---
+
+    def video_info(self, video_id):
+        duration = 60 + sum(video_id.encode()) % 600
+        formats = []
+        for format_id, width, height, share in FORMAT_LADDER:
+            size = max(1, int(self.video_size * share))
+            formats.append({
+                'format_id': format_id,
+                'url': f"{self.base_url}/media/{video_id}/{format_id}-{size}.mp4",
+                'ext': 'mp4',
+                'width': width,
+                'height': height,
+                'vcodec': 'avc1.640028',
+                'acodec': 'mp4a.40.2',
+                'filesize': size,
+                'tbr': size * 8 / 1000 / duration,
+            })
+        return {'id': video_id, 'title': f"Benchmark video {video_id}", 'duration': duration, 'formats': formats}
+
+    def playlist_info(self, count):
+        entries = [{'id': f"pl{count}-{i:05d}", 'title': f"Benchmark entry {i}", 'duration': 60 + i % 600}
+                   for i in range(1, count + 1)]
+        return {'id': f"pl{count}", 'title': f"Benchmark playlist ({count})", 'entries': entries}
+
+    def bilibili_view(self, bvid):
+        match = BENCH_BVID.fullmatch(bvid or '')
+        if not match:
+            return {'code': -404, 'message': 'not found'}
+        pages = [{'page': i, 'part': f"Part {i}", 'duration': 60 + i} for i in range(1, int(match.group(1)) + 1)]
+        return {'code': 0, 'message': '0', 'data': {'bvid': bvid, 'title': f"Benchmark {bvid}", 'pages': pages}}
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    site = None
+
+    def log_message(self, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionError:
+            pass
+
+    def do_HEAD(self):
+        self._respond(head=True)
+
+    def do_GET(self):
+        self._respond(head=False)
+
+    def _respond(self, head):
+        site = self.site
+        with site._lock:
+            site.requests += 1
+        if site.latency:
+            time.sleep(site.latency)
+
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+
+        if path == '/x/web-interface/view':
+            return self._send_json(site.bilibili_view((query.get('bvid') or [''])[0]), head)
+        match = re.fullmatch(r'/b23/bench(\d{4})', path)
+        if match:
+            self.send_response(302)
+            self.send_header('Location', f"https://www.bilibili.com/video/{bench_bvid(int(match.group(1)))}")
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if path.startswith('/video/'):
+            return self._send_body(b'<html><title>bench</title></html>', 'text/html', head)
+        match = re.fullmatch(r'/bench/api/video/([\w-]+)', path)
+        if match:
+            return self._send_json(site.video_info(match.group(1)), head)
+        match = re.fullmatch(r'/bench/api/playlist/(\d+)', path)
+        if match:
+            return self._send_json(site.playlist_info(int(match.group(1))), head)
+        match = re.fullmatch(r'/media/[\w-]+/\w+-(\d+)\.mp4', path)
+        if match:
+            return self._send_media(int(match.group(1)), head)
+        self._send_body(b'', 'text/plain', head, status=404)
+
+    def _send_json(self, data, head):
+        self._send_body(json.dumps(data).encode(), 'application/json', head)
+
+    def _send_body(self, body, content_type, head, status=200):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+
+    def _send_media(self, size, head):
+        start, end = 0, size - 1
+        range_header = self.headers.get('Range')
+        match = re.fullmatch(r'bytes=(\d+)-(\d*)', range_header or '')
+        if match and self.site.ranges:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            if start >= size:
+                self.send_response(416)
+                self.send_header('Content-Range', f"bytes */{size}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        if self.site.ranges:
+            self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Content-Length', str(end - start + 1))
+        self.end_headers()
+        if head:
+            return
+
+        bandwidth = self.site.bandwidth
+        started = time.monotonic()
+        sent = 0
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = media_bytes(start + sent, min(remaining, len(BLOCK)))
+            self.wfile.write(chunk)
+            sent += len(chunk)
+            remaining -= len(chunk)
+            if bandwidth:
+                # Sleep until the bytes sent so far fit the per-connection rate
+                delay = sent / bandwidth - (time.monotonic() - started)
+                if delay > 0:
+                    time.sleep(delay)
+
+
+def install_site_adapter(site, session):
+    # Route the engine's requests session for the real Bilibili hosts to the local site
+    from requests.adapters import HTTPAdapter
+
+    class LocalSiteAdapter(HTTPAdapter):
+        PREFIXES = {'api.bilibili.com': '', 'www.bilibili.com': '', 'b23.tv': '/b23'}
+
+        def send(self, request, **kwargs):
+            original = request.url
+            parsed = urlparse(original)
+            request.url = f"{site.base_url}{self.PREFIXES[parsed.hostname]}{parsed.path}" + (f"?{parsed.query}" if parsed.query else '')
+            response = super().send(request, **kwargs)
+            # Redirect handling and the engine see the real URL
+            response.url = original
+            return response
+
+    adapter = LocalSiteAdapter()
+    for host in LocalSiteAdapter.PREFIXES:
+        session.mount(f"https://{host}/", adapter)
+    return adapter
@@ -0,0 +1,245 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from .fakesite import FakeSite, bench_bvid, install_site_adapter
+
+# Offline end-to-end benchmarks of the engine behind the GUI and CLI (Analyzer,
+# BatchDownloader). Everything is served by a local FakeSite; results are printed or
+# written as JSON so runs can be compared with benchmarks.compare.
+
+SCHEMA_VERSION = 1
+# No browser cookies: the fake site needs none, and no result may depend on this machine's profiles
+COOKIES_BROWSER = None
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description='Run the offline UniDown benchmarks.')
+    parser.add_argument('--only', choices=('analysis', 'overhead', 'throughput'), action='append',
+                        help='run only these groups (repeatable; default: all)')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per analysis case (default: 3)')
+    parser.add_argument('--latency', type=float, default=20, help='server latency per request in ms (default: 20)')
+    parser.add_argument('--bandwidth', type=int, default=0, help='per-connection bandwidth in KB/s (default: unlimited)')
+    parser.add_argument('--playlist-sizes', default='10,100,500', help='playlist sizes to analyze (default: 10,100,500)')
+    parser.add_argument('--bulk-links', type=int, default=24, help='links pasted at once for the bulk analysis case (default: 24)')
+    parser.add_argument('--items', type=int, default=16, help='items per download batch (default: 16)')
+    parser.add_argument('--size', type=int, default=2048, help='file size per item in KB (default: 2048)')
+    parser.add_argument('--jobs', default='1,2,4,8', help='concurrent downloads to measure (default: 1,2,4,8)')
+    parser.add_argument('--connections', default='1,4', help='connections per file to measure (default: 1,4)')
+    parser.add_argument('--overhead-items', type=int, default=50, help='tiny items for the per-item overhead run (default: 50)')
+    parser.add_argument('-o', '--output', help='write the JSON report to this file instead of stdout')
+    parser.add_argument('--trace', metavar='FILE', help='also record every run as Chrome trace JSON')
+    return parser
+
+
+def int_list(text):
+    return [int(part) for part in text.split(',') if part.strip()]
+
+
+def summarize(name, runs, **extra):
+    return dict(name=name, runs=[round(run, 4) for run in runs], median_s=round(statistics.median(runs), 4),
+                min_s=round(min(runs), 4), max_s=round(max(runs), 4), **extra)
+
+
+def timed_analysis(url, force_refresh=True):
+    # Wall time of one Analyzer run plus, for streamed playlists, the time until the first rows
+    from unidown.engine import Analyzer
+
+    result = {}
+    analyzer = Analyzer(url, force_refresh=force_refresh, cookies_browser=COOKIES_BROWSER)
+    start = time.perf_counter()
+    analyzer.playlist_started.connect(lambda header: result.setdefault('first', time.perf_counter() - start))
+    analyzer.finished.connect(lambda info: result.update(info=info))
+    analyzer.error.connect(lambda message: result.update(error=message))
+    analyzer.run()
+    elapsed = time.perf_counter() - start
+    if 'error' in result:
+        raise RuntimeError(f"Analysis of {url} failed: {result['error']}")
+    return elapsed, result.get('first'), result['info']
+
+
+def bench_analysis(site, args):
+    from unidown import net
+
+    cases = [
+        ('single_video', f"{site.base_url}/bench/video/single"),
+        ('bilibili_multipage_40', f"https://www.bilibili.com/video/{bench_bvid(40)}"),
+        ('b23_short_link_40', 'https://b23.tv/bench0040'),
+    ]
+    cases += [(f"playlist_{size}", f"{site.base_url}/bench/playlist/{size}") for size in int_list(args.playlist_sizes)]
+
+    results = []
+    for name, url in cases:
+        runs, first = [], []
+        for _ in range(args.repeat):
+            # Short links are memoized per process; measure the cold resolution every time
+            with net._short_links_lock:
+                net._short_links.clear()
+            elapsed, first_rows, info = timed_analysis(url)
+            runs.append(elapsed)
+            if first_rows is not None:
+                first.append(first_rows)
+        extra = {'entries': len(info.get('entries') or [])}
+        if first:
+            extra['first_entries_median_s'] = round(statistics.median(first), 4)
+        results.append(summarize(name, runs, **extra))
+
+    # Same single video again, answered from the analysis cache
+    runs = [timed_analysis(cases[0][1], force_refresh=False)[0] for _ in range(args.repeat)]
+    results.append(summarize('single_video_cached', runs))
+
+    # A pasted list of links, analyzed together on the bulk pool
+    urls = [f"{site.base_url}/bench/video/bulk-{i:03d}" for i in range(args.bulk_links)]
+    runs = [timed_bulk_analysis(urls) for _ in range(args.repeat)]
+    results.append(summarize(f"bulk_{len(urls)}_links", runs, entries=len(urls)))
+    return results
+
+
+def timed_bulk_analysis(urls):
+    from unidown.engine import BulkAnalyzer
+
+    result = {}
+    analyzer = BulkAnalyzer(urls, force_refresh=True, cookies_browser=COOKIES_BROWSER)
+    analyzer.finished.connect(lambda results, errors: result.update(results=results, errors=errors))
+    start = time.perf_counter()
+    analyzer.run()
+    elapsed = time.perf_counter() - start
+    if result['errors']:
+        raise RuntimeError(f"Bulk analysis failed: {result['errors'][0]}")
+    return elapsed
+
+
+def playlist_items(site, count, prefix):
+    from unidown.engine import download_items
+
+    info = {'is_playlist': True, 'title': prefix, 'entries': [
+        {'url': f"{site.base_url}/bench/video/{prefix}-{i:05d}", 'id': f"{prefix}-{i:05d}", 'ie_key': 'UniDownBench',
+         'title': f"Item {i}"}
+        for i in range(1, count + 1)]}
+    return download_items(info, 'best')
+
+
+def run_batch(items, workdir, max_workers, connections):
+    from unidown.engine import BatchDownloader
+
+    path = tempfile.mkdtemp(dir=workdir)
+    errors = []
+    downloader = BatchDownloader(items, path, 'best', max_workers=max_workers, connections=connections,
+                                 cookies_browser=COOKIES_BROWSER)
+    downloader.error.connect(errors.append)
+    start = time.perf_counter()
+    downloader.run()
+    elapsed = time.perf_counter() - start
+    shutil.rmtree(path, ignore_errors=True)
+    return elapsed, errors
+
+
+def bench_overhead(site, args, workdir):
+    # Tiny files on a zero-latency server: what remains is UniDown's and yt-dlp's own cost per item
+    latency, bandwidth, size = site.latency, site.bandwidth, site.video_size
+    site.set_conditions(latency=0, bandwidth=0, video_size=1024)
+    try:
+        items = playlist_items(site, args.overhead_items, 'overhead')
+        elapsed, errors = run_batch(items, workdir, 1, 1)
+    finally:
+        site.set_conditions(latency=latency, bandwidth=bandwidth, video_size=size)
+    return {'items': len(items), 'wall_s': round(elapsed, 4), 'per_item_s': round(elapsed / len(items), 4),
+            'failed': len(errors)}
+
+
+def bench_throughput(site, args, workdir):
+    results = []
+    for connections in int_list(args.connections):
+        for jobs in int_list(args.jobs):
+            items = playlist_items(site, args.items, f"tp-j{jobs}-c{connections}")
+            elapsed, errors = run_batch(items, workdir, jobs, connections)
+            total_bytes = site.video_size * len(items)
+            results.append({
+                'jobs': jobs,
+                'connections': connections,
+                'items': len(items),
+                'bytes': total_bytes,
+                'wall_s': round(elapsed, 4),
+                'bytes_per_s': round(total_bytes / elapsed),
+                'items_per_s': round(len(items) / elapsed, 3),
+                'failed': len(errors),
+            })
+    return results
+
+
+def environment():
+    import yt_dlp.version
+
+    env = {'python': platform.python_version(), 'platform': platform.platform(), 'yt_dlp': yt_dlp.version.__version__,
+           'cpu_count': os.cpu_count()}
+    try:
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env['git_revision'] = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root, capture_output=True,
+                                             text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        env['git_revision'] = None
+    return env
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    groups = args.only or ['analysis', 'overhead', 'throughput']
+
+    from unidown.cache import AnalysisCache
+    from unidown.library import ContentIndex
+    from unidown.net import get_session
+    from unidown.trace import tracer
+    from .fake_extractor import install_fake_extractor
+
+    if args.trace:
+        tracer.enable()
+    workdir = tempfile.mkdtemp(prefix='unidown-bench-')
+    site = FakeSite(latency=args.latency / 1000, bandwidth=args.bandwidth * 1024, video_size=args.size * 1024).start()
+    try:
+        install_fake_extractor(site.base_url)
+        install_site_adapter(site, get_session(None))
+        # Keep the user's analysis cache and content index out of the measurements
+        AnalysisCache._shared = AnalysisCache(os.path.join(workdir, 'analysis.sqlite3'))
+        ContentIndex._shared = ContentIndex(os.path.join(workdir, 'library.sqlite3'))
+
+        report = {
+            'schema': SCHEMA_VERSION,
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'environment': environment(),
+            'config': {'latency_ms': args.latency, 'bandwidth_kbps': args.bandwidth, 'size_kb': args.size,
+                       'items': args.items, 'repeat': args.repeat},
+        }
+        if 'analysis' in groups:
+            print("Benchmarking analysis...", file=sys.stderr)
+            report['analysis'] = bench_analysis(site, args)
+        if 'overhead' in groups:
+            print("Benchmarking per-item overhead...", file=sys.stderr)
+            report['overhead'] = bench_overhead(site, args, workdir)
+        if 'throughput' in groups:
+            print("Benchmarking batch throughput...", file=sys.stderr)
+            report['throughput'] = bench_throughput(site, args, workdir)
+        report['requests_served'] = site.requests
+    finally:
+        site.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
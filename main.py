@@ -1,35 +1,187 @@
 import sys
-import re
 import os
-import requests
+import argparse
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+# Imported first so the startup timeline covers everything below
+from unidown.startup import startup_profile, warm_up
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                              QHBoxLayout, QTabWidget, QLineEdit, QPushButton, 
                              QLabel, QFileDialog, QFormLayout, QFrame, QDialog,
                              QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox,
-                             QListWidget, QListWidgetItem, QAbstractItemView)
-from PySide6.QtCore import Qt, QThread, Signal
+                             QListWidget, QListWidgetItem, QAbstractItemView, QSpinBox,
+                             QTableView, QMessageBox, QComboBox, QPlainTextEdit)
+from PySide6.QtCore import Qt, QObject, QThread, QTimer, Signal, QAbstractTableModel, QModelIndex
 from PySide6.QtGui import QFont, QIcon
+startup_profile.mark("PySide6 imported")
+from unidown.bandwidth import shared_governor
+from unidown.cache import AnalysisCache
+from unidown.cookies import shared_cookie_provider
+from unidown.engine import (Analyzer, BatchDownloader, BulkAnalyzer, clean_error, download_items, merge_analyses,
+                             playlist_folder)
+from unidown.formats import compact_format_info, episode_title, find_equivalent_format, fallback_format_spec
+from unidown.jobqueue import JobQueue, FIFO, PRIORITY, SHORTEST_FIRST, RUNNING, RETRY_WAIT
+from unidown.journal import BatchJournal
+from unidown.links import extract_urls
+from unidown.net import close_sessions
+from unidown.postprocess import shared_postprocess_pool
+from unidown.profiles import CODEC_NAMES, ProfileStore, choose_formats, describe_choice, describe_profile
+from unidown.preflight import check_space, entry_size, estimate_batch, required_space
+from unidown.progress import format_bytes, format_eta, format_progress
+from unidown.trace import configure_logging, tracer
+startup_profile.mark("modules imported")
+
+log = logging.getLogger("unidown.gui")
 
 class ModernTab(QWidget):
     def __init__(self, platform_name):
         super().__init__()
         self.statusBar().showMessage("Ready")
 
+class EpisodeTableModel(QAbstractTableModel):
+    HEADERS = ["No.", "Duration", "Title", "Availability"]
+    check_toggled = Signal(int, bool)
+
+    def __init__(self, entries, playlist_title='', parent=None):
+        super().__init__(parent)
+        # Entries stay as yt-dlp returned them; display text is derived per visible cell
+        self.entries = entries
+        self.playlist_title = playlist_title or ''
+        self.checks = bytearray(b'\x01') * len(entries)
+        # Callable(row) -> (text, tooltip) for the Availability column
+        self.availability = lambda row: ("", None)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def url(self, row):
+        entry = self.entries[row]
+        return entry.get('url') or entry.get('webpage_url')
+
+    def is_checked(self, row):
+        return bool(self.checks[row])
+
+    def checked_rows(self):
+        return [i for i, checked in enumerate(self.checks) if checked]
+
+    def display_title(self, row):
+        return episode_title(self.entries[row], self.playlist_title)
+
+    def duration_text(self, row):
+        duration = self.entries[row].get('duration')
+        if not duration:
+            return "--:--"
+        mins, secs = divmod(int(duration), 60)
+        hours, mins = divmod(mins, 60)
+        return f"{hours:02d}:{mins:02d}:{secs:02d}" if hours > 0 else f"{mins:02d}:{secs:02d}"
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(row + 1)
+            if column == 1:
+                return self.duration_text(row)
+            if column == 2:
+                return self.display_title(row)
+            if column == 3:
+                return self.availability(row)[0]
+        elif role == Qt.ItemDataRole.CheckStateRole and column == 0:
+            return Qt.CheckState.Checked if self.checks[row] else Qt.CheckState.Unchecked
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column == 1:
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == Qt.ItemDataRole.ToolTipRole and column == 3:
+            return self.availability(row)[1]
+        elif role == Qt.ItemDataRole.UserRole:
+            return self.url(row)
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.CheckStateRole or index.column() != 0:
+            return False
+        checked = value in (Qt.CheckState.Checked, Qt.CheckState.Checked.value)
+        self.checks[index.row()] = 1 if checked else 0
+        self.dataChanged.emit(index, index, [role])
+        self.check_toggled.emit(index.row(), checked)
+        return True
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.column() == 0:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def append_entries(self, batch):
+        if not batch:
+            return
+        first = len(self.entries)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self.entries.extend(batch)
+        self.checks.extend(b'\x01' * len(batch))
+        self.endInsertRows()
+
+    def fill_details(self, row, detail):
+        # Details from a full extraction of the entry: its duration is exact, while a listed
+        # title is kept (part names, merged bulk prefixes) unless the listing had none
+        entry = self.entries[row]
+        update = {}
+        if detail.get('duration'):
+            update['duration'] = detail['duration']
+        if detail.get('title') and not entry.get('title'):
+            update['title'] = detail['title']
+        if any(entry.get(k) != v for k, v in update.items()):
+            self.entries[row] = dict(entry, **update)
+            self.refresh_row(row)
+
+    def set_all_checked(self, state):
+        self.checks[:] = (b'\x01' if state else b'\x00') * len(self.entries)
+        self.refresh_column(0)
+
+    def refresh_row(self, row):
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def refresh_column(self, column):
+        if self.entries:
+            self.dataChanged.emit(self.index(0, column), self.index(len(self.entries) - 1, column))
+
 class FormatSelectionDialog(QDialog):
-    def __init__(self, info, parent=None):
+    def __init__(self, info, parent=None, proxy=None, download_path='.', cookies_browser=None):
         super().__init__(parent)
         self.setWindowTitle("Select Download Options")
         self.resize(1000, 600)
         self.info = info
+        self.download_path = download_path
         self.is_playlist = info.get('is_playlist', False)
         self.selected_urls = []
         self.selected_format_id = None
+        self.format_rows = []
+        # Per-episode probe results, keyed by row
+        self.probe_results = {}
+        self.probe_errors = {}
+        self.prober = None
+        # Rows whose probe is queued or running
+        self._probing = set()
+        # Availability of the chosen format per probed row, rebuilt when the format changes
+        self._status_cache = {}
+        self._supported_count = 0
         
         # Determine strict structure based on type
         if self.is_playlist:
             sample_info = info['sample_info']
             video_title = info.get('title', 'Unknown Playlist')
-            description = f"Playlist: {len(info['entries'])} items"
+            self.loading = info.get('loading', False)
+            description = self._playlist_description(len(info['entries']))
         else:
             sample_info = info
             video_title = info.get('title', 'Unknown Title')
@@ -47,6 +199,7 @@ class FormatSelectionDialog(QDialog):
         title_label.setStyleSheet("font-weight: bold; font-size: 16px; color: #00a8ff;")
         desc_label = QLabel(description)
         desc_label.setStyleSheet("color: #aaa;")
+        self.desc_label = desc_label
         info_layout.addWidget(title_label)
         info_layout.addWidget(desc_label)
         layout.addWidget(info_frame)
@@ -58,58 +211,24 @@ class FormatSelectionDialog(QDialog):
         if self.is_playlist:
             ep_layout = QVBoxLayout()
             ep_label = QLabel("Select Episodes:")
-            self.ep_table = QTableWidget()
-            self.ep_table.setColumnCount(3)
-            self.ep_table.setHorizontalHeaderLabels(["No.", "Duration", "Title"])
+            # Rows are rendered on demand from the entry list, so large playlists open instantly
+            self.ep_model = EpisodeTableModel(list(info.get('entries', [])), info.get('title', ''), self)
+            self.ep_model.availability = self._availability
+            self.ep_table = QTableView()
+            self.ep_table.setModel(self.ep_model)
             self.ep_table.verticalHeader().setVisible(False)
-            self.ep_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+            self.ep_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+            self.ep_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+            self.ep_table.setWordWrap(False)
             
             # Set Column Widths
             header = self.ep_table.horizontalHeader()
+            header.setResizeContentsPrecision(100)
             header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
             header.setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
             header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+            header.setSectionResizeMode(3, QHeaderView.ResizeMode.ResizeToContents)
 
-            # Populate episodes
-            playlist_title = info.get('title', '')
-            entries = info.get('entries', [])
-            self.ep_table.setRowCount(len(entries))
-            
-            for i, entry in enumerate(entries):
-                full_title = entry.get('title') or entry.get('description') or "Unknown"
-                
-                # 1. Clean Title (remove main video/playlist title prefix)
-                display_title = full_title
-                if playlist_title and display_title.startswith(playlist_title):
-                    display_title = display_title[len(playlist_title):].strip()
-                    if display_title.startswith('-') or display_title.startswith('_'):
-                        display_title = display_title[1:].strip()
-                
-                # 2. Format Duration
-                duration = entry.get('duration')
-                if duration:
-                    mins, secs = divmod(int(duration), 60)
-                    hours, mins = divmod(mins, 60)
-                    dur_str = f"{hours:02d}:{mins:02d}:{secs:02d}" if hours > 0 else f"{mins:02d}:{secs:02d}"
-                else:
-                    dur_str = "--:--"
-
-                # 3. Create Items
-                # 序号 + Checkbox
-                idx_item = QTableWidgetItem(str(i + 1))
-                idx_item.setCheckState(Qt.CheckState.Checked)
-                item_url = entry.get('url') or entry.get('webpage_url')
-                idx_item.setData(Qt.ItemDataRole.UserRole, item_url)
-                self.ep_table.setItem(i, 0, idx_item)
-                
-                # Duration
-                dur_item = QTableWidgetItem(dur_str)
-                dur_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                self.ep_table.setItem(i, 1, dur_item)
-                
-                # Title
-                self.ep_table.setItem(i, 2, QTableWidgetItem(display_title))
-                
             ep_layout.addWidget(ep_label)
             ep_layout.addWidget(self.ep_table)
             
@@ -127,7 +246,19 @@ class FormatSelectionDialog(QDialog):
 
         # Format List
         fmt_layout = QVBoxLayout()
-        fmt_label = QLabel("Select Resolution/Format (Based on first video):" if self.is_playlist else "Select Format:")
+        # A saved profile instead of a row: resolved against every episode's own formats
+        profile_layout = QHBoxLayout()
+        profile_layout.addWidget(QLabel("Format Profile:"))
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItem("None (pick a format below)", None)
+        for profile in ProfileStore().load():
+            self.profile_combo.addItem(profile['name'], profile)
+        self.profile_combo.currentIndexChanged.connect(self._on_profile_changed)
+        profile_layout.addWidget(self.profile_combo, 1)
+        fmt_layout.addLayout(profile_layout)
+        fmt_label = QLabel("Select Resolution/Format (listed from first video, checked per episode):" if self.is_playlist else "Select Format:")
+        self.probe_label = QLabel("")
+        self.probe_label.setStyleSheet("color: #aaa;")
         
         self.table = QTableWidget()
         self.table.setColumnCount(5)
@@ -140,6 +271,7 @@ class FormatSelectionDialog(QDialog):
         
         fmt_layout.addWidget(fmt_label)
         fmt_layout.addWidget(self.table)
+        fmt_layout.addWidget(self.probe_label)
         content_layout.addLayout(fmt_layout, stretch=2 if self.is_playlist else 1)
         
         layout.addLayout(content_layout)
@@ -147,8 +279,20 @@ class FormatSelectionDialog(QDialog):
         # Options
         self.chk_merge = QCheckBox("Merge Best Audio (Recommended for HD Video)")
         self.chk_merge.setChecked(True)
+        self.chk_merge.toggled.connect(self._schedule_estimate)
         layout.addWidget(self.chk_merge)
 
+        # Pre-flight: estimated size of the selection against free space on the target drive
+        self.size_label = QLabel("")
+        self.size_label.setStyleSheet("color: #aaa;")
+        layout.addWidget(self.size_label)
+        self._estimate = None
+        self._estimate_timer = QTimer(self)
+        self._estimate_timer.setSingleShot(True)
+        self._estimate_timer.setInterval(200)
+        self._estimate_timer.timeout.connect(self._update_estimate)
+        self.table.itemSelectionChanged.connect(self._schedule_estimate)
+
         # Buttons
         btn_layout = QHBoxLayout()
         cancel_btn = QPushButton("Cancel")
@@ -166,14 +310,88 @@ class FormatSelectionDialog(QDialog):
         self.setStyleSheet("""
             QDialog { background-color: #1a1a1a; color: #fff; }
             #infoFrame { background-color: #252525; border-radius: 8px; padding: 10px; }
-            QTableWidget { background-color: #252525; color: #fff; gridline-color: #333; border: none; }
+            QTableWidget, QTableView { background-color: #252525; color: #fff; gridline-color: #333; border: none; }
             QHeaderView::section { background-color: #333; color: #ccc; padding: 5px; border: none; }
-            QTableWidget::item:selected { background-color: #00a8ff; color: #fff; }
+            QTableWidget::item:selected, QTableView::item:selected { background-color: #00a8ff; color: #fff; }
             QPushButton { background-color: #333; color: #fff; padding: 8px 15px; border-radius: 4px; }
             QPushButton#primaryButton { background-color: #00a8ff; }
             QCheckBox { color: #ccc; spacing: 8px; }
         """)
 
+        # Episodes are listed flat; full details are probed for the rows on screen and the rows
+        # the user selects or checks, once scrolling settles
+        if self.is_playlist:
+            self._sample_probe = compact_format_info(sample_info)
+            self.prober = EpisodeFormatProber(proxy, cookies_browser=cookies_browser, parent=self)
+            self.prober.probed.connect(self._on_episode_probed)
+            self.prober.failed.connect(self._on_episode_probe_failed)
+            self.table.itemSelectionChanged.connect(self._on_format_changed)
+            self.ep_model.check_toggled.connect(self._on_episode_check_toggled)
+            self._visible_timer = QTimer(self)
+            self._visible_timer.setSingleShot(True)
+            self._visible_timer.setInterval(150)
+            self._visible_timer.timeout.connect(self._probe_visible_rows)
+            scroll_bar = self.ep_table.verticalScrollBar()
+            scroll_bar.valueChanged.connect(self._visible_timer.start)
+            scroll_bar.rangeChanged.connect(self._visible_timer.start)
+            self.ep_table.selectionModel().selectionChanged.connect(self._on_episode_selection_changed)
+            self._seed_probes(0)
+            self._update_probe_label()
+        self._update_estimate()
+
+    def _schedule_estimate(self):
+        # Checks and probe results arrive in bursts; recount once they settle
+        self._estimate_timer.start()
+
+    def _update_estimate(self):
+        profile = self._profile()
+        chosen = self._chosen_format()
+        if profile is None and chosen is None:
+            self._estimate = None
+            self.size_label.setText("Select a format to estimate the download size")
+            self.size_label.setStyleSheet("color: #aaa;")
+            return
+        merge_audio = self.chk_merge.isChecked()
+        if self.is_playlist:
+            sizes = []
+            for row in self.ep_model.checked_rows():
+                probe_info = self.probe_results.get(row)
+                sizes.append(entry_size(probe_info['formats'], self.ep_model.entries[row].get('duration'), chosen,
+                                        merge_audio, profile) if probe_info else None)
+        else:
+            sizes = [entry_size(self.info.get('formats') or [], self.info.get('duration'), chosen, merge_audio, profile)]
+        self._estimate = estimate = estimate_batch(sizes)
+        if not estimate['known']:
+            self.size_label.setText("Estimated size: unknown (no sizes reported yet)")
+            self.size_label.setStyleSheet("color: #aaa;")
+            return
+        text = f"Estimated size: {format_bytes(estimate['total_bytes'])}"
+        if estimate['unknown']:
+            text += f" ({estimate['known']}/{estimate['entries']} episodes measured, rest extrapolated)"
+        free, enough = check_space(self.download_path, estimate)
+        if free is not None:
+            text += f" · {format_bytes(free)} free"
+        if enough is False:
+            text += " · not enough space"
+        self.size_label.setText(text)
+        self.size_label.setStyleSheet("color: #ff6b6b;" if enough is False else "color: #aaa;")
+
+    def _profile(self):
+        return self.profile_combo.currentData()
+
+    def _on_profile_changed(self):
+        profile = self._profile()
+        self.table.setEnabled(profile is None)
+        self.chk_merge.setEnabled(profile is None)
+        self._schedule_estimate()
+        if self.is_playlist:
+            self._on_format_changed()
+        elif profile is not None:
+            choice = choose_formats(self.info.get('formats') or [], profile, self.info.get('duration'))
+            self.probe_label.setText(f"{describe_profile(profile)}: {describe_choice(*choice) or 'no matching format'}")
+        else:
+            self.probe_label.setText("")
+
     def _format_duration(self, seconds):
         if not seconds: return "Unknown Duration"
         mins, secs = divmod(int(seconds), 60)
@@ -248,6 +466,7 @@ class FormatSelectionDialog(QDialog):
             sorted_formats.append(best_audio)
         
         # Populate the table with filtered formats
+        self.format_rows = sorted_formats
         self.table.setRowCount(len(sorted_formats))
         for i, fmt in enumerate(sorted_formats):
             self.table.setItem(i, 0, QTableWidgetItem(str(fmt.get('format_id', ''))))
@@ -287,418 +506,550 @@ class FormatSelectionDialog(QDialog):
             
             self.table.setItem(i, 4, QTableWidgetItem(note.strip()))
 
+    def _playlist_description(self, count):
+        if self.loading:
+            return f"Playlist: {count} items loaded so far (still loading...)"
+        return f"Playlist: {count} items"
+
+    def append_entries(self, batch):
+        # Rows streamed in by AnalysisWorker while the dialog is already open
+        first = self.ep_model.rowCount()
+        self.ep_model.append_entries(batch)
+        self._seed_probes(first)
+        self._visible_timer.start()
+        self._schedule_estimate()
+        self.desc_label.setText(self._playlist_description(self.ep_model.rowCount()))
+        self._update_probe_label()
+
+    def finish_loading(self, error=None):
+        self.loading = False
+        description = self._playlist_description(self.ep_model.rowCount())
+        if error:
+            description += f" (loading stopped: {error})"
+        self.desc_label.setText(description)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.is_playlist:
+            self._visible_timer.start()
+
+    def _seed_probes(self, first):
+        # Entries that were fully extracted already carry their formats; the rest are probed
+        # when they come on screen
+        for row in range(first, self.ep_model.rowCount()):
+            entry = self.ep_model.entries[row]
+            if entry.get('formats'):
+                self.probe_results[row] = {'formats': entry['formats']}
+            elif row == 0:
+                self.probe_results[row] = self._sample_probe
+            else:
+                continue
+            if self._chosen_format() is not None and self._row_status(row)[0] in ('exact', 'equivalent'):
+                self._supported_count += 1
+
+    def _probe_row(self, row):
+        if row in self.probe_results or row in self._probing:
+            return
+        if self.prober.probe(row, self.ep_model.url(row)):
+            self._probing.add(row)
+
+    def _probe_visible_rows(self):
+        first = self.ep_table.rowAt(0)
+        if first < 0:
+            return
+        last = self.ep_table.rowAt(self.ep_table.viewport().height() - 1)
+        if last < 0:
+            last = self.ep_model.rowCount() - 1
+        for row in range(first, last + 1):
+            self._probe_row(row)
+        self._update_probe_label()
+
+    def _on_episode_selection_changed(self, selected, deselected):
+        for row in sorted({index.row() for index in selected.indexes()}):
+            self._probe_row(row)
+        self._update_probe_label()
+
+    def _on_episode_check_toggled(self, row, checked):
+        self._schedule_estimate()
+        if checked:
+            self._probe_row(row)
+            self._update_probe_label()
+
+    def _on_episode_probed(self, row, probe_info):
+        self._probing.discard(row)
+        self.probe_results[row] = probe_info
+        self.probe_errors.pop(row, None)
+        self.ep_model.fill_details(row, probe_info)
+        if self._row_status(row)[0] in ('exact', 'equivalent'):
+            self._supported_count += 1
+        self.ep_model.refresh_row(row)
+        self._update_probe_label()
+        self._schedule_estimate()
+
+    def _on_episode_probe_failed(self, row, message):
+        self._probing.discard(row)
+        self.probe_errors[row] = message
+        self.ep_model.refresh_row(row)
+        self._update_probe_label()
+
+    def _on_format_changed(self):
+        self._status_cache = {}
+        chosen = self._chosen_format()
+        self._supported_count = 0
+        if chosen is not None:
+            for row in self.probe_results:
+                if self._row_status(row)[0] in ('exact', 'equivalent'):
+                    self._supported_count += 1
+        self.ep_model.refresh_column(3)
+        self._update_probe_label()
+
+    def _chosen_format(self):
+        if self._profile() is not None:
+            return None
+        selected = self.table.selectedItems()
+        if not selected or selected[0].row() >= len(self.format_rows):
+            return None
+        return self.format_rows[selected[0].row()]
+
+    def _row_status(self, row):
+        if row not in self._status_cache:
+            chosen = self._chosen_format()
+            if chosen is None:
+                return None, None
+            self._status_cache[row] = find_equivalent_format(self.probe_results[row]['formats'], chosen)
+        return self._status_cache[row]
+
+    def _availability(self, row):
+        # Called lazily by the model for visible rows only; returns (text, tooltip)
+        if row in self.probe_errors:
+            return "Probe failed", self.probe_errors[row]
+        if row not in self.probe_results:
+            return ("Probing..." if row in self._probing else ""), None
+        profile = self._profile()
+        if profile is not None:
+            video, audio = choose_formats(self.probe_results[row]['formats'], profile,
+                                          self.ep_model.entries[row].get('duration'))
+            if not video and not audio:
+                return "✗ No match", None
+            return f"→ {describe_choice(video, audio)}", None
+        status, fmt = self._row_status(row)
+        if status is None:
+            return "Ready", None
+        if status == 'exact':
+            return "✓", None
+        if status == 'equivalent':
+            return f"≈ {fmt.get('format_id')}", None
+        return "✗ Not available", None
+
+    def _update_probe_label(self):
+        probed = len(self.probe_results)
+        if self._profile() is not None:
+            self.probe_label.setText(
+                f"{describe_profile(self._profile())}: each episode gets its best fit "
+                f"(previewed for {probed}/{self.ep_model.rowCount()} episodes)")
+        elif self._chosen_format() is None:
+            self.probe_label.setText(f"Probed {probed}/{self.ep_model.rowCount()} episodes")
+        else:
+            self.probe_label.setText(
+                f"{self._supported_count}/{probed} probed episodes support this format"
+                + (f" ({len(self._probing)} still probing)" if self._probing else ""))
+
+    def _format_for_row(self, row, chosen, final_fmt, merge_audio):
+        # Pick the episode's own stream for the chosen resolution when probing found one
+        probe_info = self.probe_results.get(row)
+        if probe_info is None:
+            return f"{final_fmt}/{fallback_format_spec(chosen, merge_audio)}"
+        status, fmt = find_equivalent_format(probe_info['formats'], chosen)
+        if status == 'exact':
+            return final_fmt
+        if status == 'equivalent':
+            fmt_id = str(fmt.get('format_id'))
+            if merge_audio and fmt.get('vcodec', 'none') != 'none' and fmt.get('acodec', 'none') == 'none':
+                fmt_id += "+bestaudio"
+            return fmt_id
+        return fallback_format_spec(chosen, merge_audio)
+
+    def done(self, result):
+        if self.prober:
+            self.prober.cancel()
+        super().done(result)
+
     def _set_all_checked(self, state):
-        for i in range(self.ep_table.rowCount()):
-            item = self.ep_table.item(i, 0)
-            item.setCheckState(Qt.CheckState.Checked if state else Qt.CheckState.Unchecked)
+        self.ep_model.set_all_checked(state)
+        self._schedule_estimate()
 
     def accept_selection(self):
         # 1. Get Format
+        profile = self._profile()
         selected_fmt_items = self.table.selectedItems()
-        if not selected_fmt_items:
+        if profile is not None:
+            # Resolved per episode at download time
+            final_fmt = None
+        elif not selected_fmt_items:
             # Fallback to 'best' if nothing selected? Or prevent?
             # Let's enforce selection for now
             return
+        else:
+            row = selected_fmt_items[0].row()
+            fmt_id = self.table.item(row, 0).text()
+            fmt_note = self.table.item(row, 4).text()
 
-        row = selected_fmt_items[0].row()
-        fmt_id = self.table.item(row, 0).text()
-        fmt_note = self.table.item(row, 4).text()
-        
-        final_fmt = fmt_id
-        if "Video Only" in fmt_note and self.chk_merge.isChecked():
-            final_fmt += "+bestaudio"
+            final_fmt = fmt_id
+            if "Video Only" in fmt_note and self.chk_merge.isChecked():
+                final_fmt += "+bestaudio"
         self.selected_format_id = final_fmt
 
         # 2. Get URLs
         if self.is_playlist:
             self.selected_urls = []
-            for i in range(self.ep_table.rowCount()):
-                idx_item = self.ep_table.item(i, 0)
-                title_item = self.ep_table.item(i, 2)
-                if idx_item.checkState() == Qt.CheckState.Checked:
-                    # Format as: P01 Title
-                    try:
-                        seq_num = int(idx_item.text())
-                        pref_title = f"P{seq_num:02d} {title_item.text()}"
-                    except:
-                        pref_title = f"{idx_item.text()} {title_item.text()}"
-                        
-                    self.selected_urls.append({
-                        'url': idx_item.data(Qt.ItemDataRole.UserRole),
-                        'title': pref_title
-                    })
+            for i in self.ep_model.checked_rows():
+                # Format as: P01 Title (merged bulk lists keep plain titles)
+                pref_title = self.ep_model.display_title(i)
+                if not self.info.get('bulk'):
+                    pref_title = f"P{i + 1:02d} {pref_title}"
+                entry = self.ep_model.entries[i]
+                self.selected_urls.append({
+                    'url': self.ep_model.url(i),
+                    'id': entry.get('id'),
+                    'ie_key': entry.get('ie_key'),
+                    'title': pref_title,
+                    'duration': entry.get('duration'),
+                    'format': self._format_for_row(i, self.format_rows[row], final_fmt, self.chk_merge.isChecked())
+                              if profile is None else None,
+                    'profile': profile
+                })
         else:
             self.selected_urls = [{
                 'url': self.info['webpage_url'],
-                'title': self.info.get('title', 'video')
+                'id': self.info.get('id'),
+                'ie_key': self.info.get('extractor_key'),
+                'title': self.info.get('title', 'video'),
+                'duration': self.info.get('duration'),
+                'profile': profile
             }]
 
         if not self.selected_urls:
             return  # Must select at least one
 
+        self._update_estimate()
+        free, enough = check_space(self.download_path, self._estimate) if self._estimate else (None, None)
+        if enough is False:
+            reply = QMessageBox.warning(
+                self, "Not Enough Disk Space",
+                f"The selection needs about {format_bytes(required_space(self._estimate))} "
+                f"(including room for merging), but only {format_bytes(free)} is free in {self.download_path}.\n\n"
+                "Download anyway? Items that do not fit will fail before they start.",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+
         self.accept()
 
 class AnalysisWorker(QThread):
     finished = Signal(object) # Returns info dict
     error = Signal(str)
-    
-    def __init__(self, url, proxy=None):
+    # Incremental mode: playlist header (with sample_info, no entries) and then entry batches
+    playlist_started = Signal(object)
+    entries_batch = Signal(object)
+
+    def __init__(self, url, proxy=None, force_refresh=False, incremental=True, cookies_browser=None):
         super().__init__()
-        self.url = url
-        self.proxy = proxy
-        
+        # The work happens in the Qt-free engine; its notifiers fire on this thread
+        self.engine = Analyzer(url, proxy, force_refresh, incremental, cookies_browser=cookies_browser)
+        self.engine.finished.connect(self.finished.emit)
+        self.engine.error.connect(self.error.emit)
+        self.engine.playlist_started.connect(self.playlist_started.emit)
+        self.engine.entries_batch.connect(self.entries_batch.emit)
+
+    def stop(self):
+        self.engine.stop()
+
     def run(self):
-        ydl_opts = {
-            'quiet': True,
-            'no_color': True,
-            'cookiesfrombrowser': ('firefox',),
-        }
-        
-        # Bilibili requires full extraction to get titles for multi-page videos/playlists properly
-        # YouTube needs extract_flat to avoid slowly fetching every video in a playlist
-        if 'bilibili' not in self.url and 'b23.tv' not in self.url and 'youtube.com' not in self.url and 'youtu.be' not in self.url:
-             ydl_opts['extract_flat'] = 'in_playlist'
-        
-        if self.proxy:
-            ydl_opts['proxy'] = self.proxy
-            
-        try:
-            # 1. Try Bilibili Specific API for multi-page videos
-            if 'bilibili.com' in self.url or 'b23.tv' in self.url:
-                try:
-                    effective_url = self.url
-                    if 'b23.tv' in effective_url:
-                        # Follow redirect for short links
-                        try:
-                            s = requests.Session()
-                            if self.proxy:
-                                s.proxies = {'http': self.proxy, 'https': self.proxy}
-                            r = s.head(effective_url, allow_redirects=True, timeout=5)
-                            effective_url = r.url
-                        except:
-                            pass
-                    
-                    bvid_match = re.search(r'(BV[a-zA-Z0-9]{10}|av[0-9]+)', effective_url)
-                    if bvid_match:
-                        bvid = bvid_match.group(1)
-                        print(f"[DEBUG] Extracted BV ID: {bvid}")
-                        api_url = 'https://api.bilibili.com/x/web-interface/view'
-                        params = {'bvid': bvid} if bvid.startswith('BV') else {'aid': bvid[2:]}
-                        headers = {
-                            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                            'Referer': 'https://www.bilibili.com/'
-                        }
-                        
-                        s = requests.Session()
-                        if self.proxy:
-                            s.proxies = {'http': self.proxy, 'https': self.proxy}
-                        
-                        resp = s.get(api_url, params=params, headers=headers, timeout=10)
-                        api_data = resp.json()
-                        print(f"[DEBUG] API response code: {api_data.get('code')}")
-                        
-                        if api_data.get('code') == 0:
-                            v_data = api_data['data']
-                            pages = v_data.get('pages', [])
-                            print(f"[DEBUG] Pages count: {len(pages)}")
-                            
-                            # Only use API for multi-page videos
-                            if len(pages) > 1:
-                                print(f"[DEBUG] Multi-page video detected")
-                                entries = []
-                                for p in pages:
-                                    p_num = p.get('page', 1)
-                                    p_url = f"https://www.bilibili.com/video/{bvid}?p={p_num}"
-                                    entries.append({
-                                        'title': p.get('part', f"P{p_num}"),
-                                        'duration': p.get('duration'),
-                                        'url': p_url,
-                                        'webpage_url': p_url,
-                                        'id': f"{bvid}_p{p_num}"
-                                    })
-                                
-                                import yt_dlp
-                                with yt_dlp.YoutubeDL({'quiet': True, 'no_color': True, 'proxy': self.proxy}) as ydl:
-                                    # Get format info from the first page
-                                    sample_info = ydl.extract_info(entries[0]['url'], download=False)
-                                
-                                final_info = {
-                                    'is_playlist': True,
-                                    'title': v_data.get('title', 'Bilibili Multi-page'),
-                                    'entries': entries,
-                                    'sample_info': sample_info,
-                                    'webpage_url': effective_url
-                                }
-                                self.finished.emit(final_info)
-                                return
-                            # For single-page videos, fall through to yt-dlp below
-                            print(f"[DEBUG] Single-page video, falling through to yt-dlp")
-                        else:
-                            print(f"[DEBUG] API returned non-zero code: {api_data.get('code')}, {api_data.get('message')}")
-                except Exception as e:
-                    print(f"Bilibili API failed: {e}")
+        self.engine.run()
 
+class BulkAnalysisWorker(QThread):
+    progress = Signal(int, int, str) # done, total, url
+    finished = Signal(object, object) # [(url, info)], [(url, error)]
 
-            # 2. Default extraction with yt-dlp
-            print(f"[DEBUG] Starting yt-dlp extraction for: {self.url}")
-            import yt_dlp
-            try:
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    # 1. Initial extraction
-                    print(f"[DEBUG] Calling ydl.extract_info...")
-                    info = ydl.extract_info(self.url, download=False)
-                    print(f"[DEBUG] extract_info completed, type: {info.get('_type') if info else 'None'}")
-                    
-                    # Check if it is a playlist
-                    if info.get('_type') == 'playlist' and 'entries' in info:
-                        print(f"[DEBUG] Detected as playlist")
-                        entries = list(info.get('entries', []))
-                        if not entries:
-                             raise Exception("Playlist is empty")
-                             
-                        # Get sample format from the first entry
-                        sample_entry = entries[0]
-                        sample_url = sample_entry.get('url') or sample_entry.get('webpage_url')
-                        if not sample_url:
-                            sample_url = self.url 
-                        
-                        with yt_dlp.YoutubeDL({'quiet':True, 'no_color':True, 'proxy': self.proxy}) as ydl_sample:
-                            sample_info = ydl_sample.extract_info(sample_url, download=False)
-                        
-                        final_info = {
-                            'is_playlist': True,
-                            'title': info.get('title', 'Playlist'),
-                            'entries': entries,
-                            'sample_info': sample_info,
-                            'webpage_url': info.get('webpage_url', self.url)
-                        }
-                        self.finished.emit(final_info)
-                    
-                    else:
-                        # Single video
-                        print(f"[DEBUG] Detected as single video")
-                        if 'formats' not in info:
-                            print(f"[DEBUG] No formats, re-extracting...")
-                            # Re-extract fully
-                            if 'extract_flat' in ydl_opts:
-                                ydl_opts.pop('extract_flat')
-                            with yt_dlp.YoutubeDL(ydl_opts) as ydl_full:
-                                 info = ydl_full.extract_info(self.url, download=False)
-                        else:
-                            print(f"[DEBUG] Found {len(info.get('formats', []))} formats")
-
-                        info['is_playlist'] = False
-                        print(f"[DEBUG] Emitting single video: {info.get('title')}")
-                        self.finished.emit(info)
-                        print(f"[DEBUG] Emit completed")
-            except Exception as yt_err:
-                print(f"[DEBUG] yt-dlp extraction error: {yt_err}")
-                raise
-                    
+    def __init__(self, urls, proxy=None, force_refresh=False, cookies_browser=None):
+        super().__init__()
+        self.engine = BulkAnalyzer(urls, proxy, force_refresh, cookies_browser=cookies_browser)
+        self.engine.progress.connect(self.progress.emit)
+        self.engine.finished.connect(self.finished.emit)
+
+    def stop(self):
+        self.engine.stop()
+
+    def run(self):
+        self.engine.run()
+
+class EpisodeFormatProber(QObject):
+    probed = Signal(int, object) # row, compact info with formats
+    failed = Signal(int, str)
+
+    def __init__(self, proxy=None, max_workers=4, cookies_browser=None, parent=None):
+        super().__init__(parent)
+        self.proxy = proxy
+        self.cookies = shared_cookie_provider(cookies_browser)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._submitted = set()
+        self._cancelled = False
+        self._local = threading.local()
+        # One YoutubeDL per pool thread, closed once the pool is done
+        self._engines = []
+        self._engines_lock = threading.Lock()
+
+    def probe(self, row, url):
+        if self._cancelled or not url or row in self._submitted:
+            return False
+        self._submitted.add(row)
+        self._executor.submit(self._probe, row, url)
+        return True
+
+    def cancel(self):
+        # Queued probes are dropped; running ones finish but are not reported
+        self._cancelled = True
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        threading.Thread(target=self._close_engines, name="probe-cleanup", daemon=True).start()
+
+    def _close_engines(self):
+        # After the running probes, so no engine is closed under one of them
+        self._executor.shutdown(wait=True)
+        with self._engines_lock:
+            engines, self._engines = self._engines, []
+        for ydl in engines:
+            ydl.close()
+
+    def _probe(self, row, url):
+        if self._cancelled:
+            return
+        try:
+            probe_info = AnalysisCache.shared().get(url, kind='formats')
+            if probe_info is None:
+                ydl = getattr(self._local, 'ydl', None)
+                if ydl is not None and not self.cookies.is_current(ydl):
+                    with self._engines_lock:
+                        self._engines.remove(ydl)
+                    ydl.close()
+                    ydl = None
+                if ydl is None:
+                    import yt_dlp
+                    ydl = yt_dlp.YoutubeDL({'quiet': True, 'no_color': True, 'no_warnings': True, 'proxy': self.proxy})
+                    self.cookies.apply(ydl)
+                    self._local.ydl = ydl
+                    with self._engines_lock:
+                        self._engines.append(ydl)
+                probe_info = compact_format_info(ydl.extract_info(url, download=False))
+                AnalysisCache.shared().put(url, probe_info, kind='formats')
         except Exception as e:
-            # Clean ANSI codes from error message
-            error_msg = re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', str(e))
-            self.error.emit(error_msg)
+            if not self._cancelled:
+                self.failed.emit(row, clean_error(e))
+            return
+        if not self._cancelled:
+            self.probed.emit(row, probe_info)
 
-class DownloadCancelledException(Exception):
-    pass
+class WarmUpWorker(QThread):
+    # Loads yt-dlp, its extractors and the HTTP stack once the window is on screen,
+    # so the first analysis does not pay for them
+    def __init__(self, cookies_browser=None):
+        super().__init__()
+        self.cookies_browser = cookies_browser
 
-class DownloadWorker(QThread):
+    def run(self):
+        threading.current_thread().name = "warm-up"
+        warm_up(cookies_browser=self.cookies_browser)
+
+class BatchSignals(QObject):
+    # Delivers a BatchDownloader's notifiers, which fire on queue threads, to the GUI thread
     finished = Signal(str)
     error = Signal(str)
-    progress = Signal(str)
+    progress = Signal(str) # Status messages (processing, analyzing, retrying...)
+    progress_data = Signal(object) # Throttled transfer payloads, see unidown.progress
+    done = Signal()
 
-    def __init__(self, urls, path, format_str=None, proxy=None):
-        super().__init__()
-        # Ensure urls is a list
-        self.urls = urls if isinstance(urls, list) else [urls]
-        self.path = path
-        self.format_str = format_str
-        self.proxy = proxy
-        self._is_cancelled = False
-        self._current_file = None
-        # Track video information for detailed progress
-        self.total_videos = len(self.urls)
-        self.current_video_index = 0
-        self.current_video_title = ''
+    def __init__(self, batch, parent=None):
+        super().__init__(parent)
+        self.batch = batch
+        batch.finished.connect(self.finished.emit)
+        batch.error.connect(self.error.emit)
+        batch.progress.connect(self.progress.emit)
+        batch.progress_data.connect(self.progress_data.emit)
+        batch.done.connect(self.done.emit)
+
+class JobTableModel(QAbstractTableModel):
+    HEADERS = ["Next", "Platform", "Title", "Duration", "Priority", "Status"]
+    STATE_TEXT = {'queued': "Queued", 'done': "Done", 'skipped': "Skipped (already downloaded)",
+                  'failed': "Failed", 'cancelled': "Cancelled", 'postprocessing': "Downloaded, merging..."}
+
+    def __init__(self, job_queue, parent=None):
+        super().__init__(parent)
+        self.job_queue = job_queue
+        # (job, dispatch rank or None) in queue order, from JobQueue.snapshot()
+        self.rows = []
 
-    def stop(self):
-        self._is_cancelled = True
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
 
-    def run(self):
-        total_videos = len(self.urls)
-        
-        # Define progress hook function to show detailed progress
-        def progress_hook(d):
-            if d.get('filename'):
-                self._current_file = d['filename']
-                
-            if self._is_cancelled:
-                # Raising an exception inside the hook is a common way to stop yt-dlp
-                raise DownloadCancelledException("Download cancelled")
-                
-            if d['status'] == 'downloading':
-                # Helper to strip ANSI codes
-                def clean(s):
-                    if not s: return ""
-                    return re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', s)
-
-                percent = clean(d.get('_percent_str', '0%')).strip()
-                # Try to get total size
-                total = clean(d.get('_total_bytes_str') or d.get('_total_bytes_approx_str', 'unknown size'))
-                speed = clean(d.get('_speed_str', '0B/s'))
-                eta = clean(d.get('_eta_str', '00:00'))
-                
-                # Get filename without path
-                filename = d.get('filename', 'Unknown')
-                file_basename = os.path.basename(filename)
-                
-                # Show detailed progress with video number and title
-                progress_msg = f"[{self.current_video_index}/{total_videos}] {self.current_video_title} ({percent} at {speed}, ETA: {eta})"
-                # Clear the line and print new progress in one line
-                print(f"\r  {progress_msg}", end='', flush=True)
-                self.progress.emit(progress_msg)
-            elif d['status'] == 'finished':
-                filename = d.get('filename', 'Unknown')
-                file_basename = os.path.basename(filename)
-                # Show completion message
-                finish_msg = f"[{self.current_video_index}/{total_videos}] {self.current_video_title} - Download Complete!"
-                print(f"\r  {finish_msg}                    ")  # Extra spaces to clear any remaining text
-                self.progress.emit("Finalizing file...")
-
-        ydl_opts = {
-            'format': self.format_str if self.format_str else 'best',
-            'outtmpl': f'{self.path}/%(title)s.%(ext)s',
-            'noplaylist': True,
-            'progress_hooks': [progress_hook],
-            'quiet': True,
-            'no_warnings': True,
-            'no_color': True,
-            'cookiesfrombrowser': ('firefox',),
-        }
-        if self.proxy:
-            ydl_opts['proxy'] = self.proxy
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
 
-        import yt_dlp
-        
-        for i, item_data in enumerate(self.urls):
-            url = item_data['url']
-            title = item_data['title']
-            
-            # Update current video info for progress tracking
-            self.current_video_index = i + 1
-            self.current_video_title = title
-            
-            # Check cancellation at start of each video
-            if self._is_cancelled:
-                self.error.emit("Download cancelled by user.")
-                return
+    def job(self, row):
+        return self.rows[row][0]
 
-            try:
-                msg = f"Processing ({i+1}/{total_videos})..." if total_videos > 1 else "Starting download..."
-                self.progress.emit(msg)
-                
-                if not url:
-                    raise Exception("Missing video URL")
-
-                # Update outtmpl with specific title
-                current_opts = ydl_opts.copy()
-                # Sanitize title for filename
-                safe_title = re.sub(r'[\\/*?::"<>|]', "_", title).strip()
-                current_opts['outtmpl'] = f'{self.path}/{safe_title}.%(ext)s'
-
-                with yt_dlp.YoutubeDL(current_opts) as ydl:
-                    if self._is_cancelled: raise DownloadCancelledException()
-                    
-                    self.progress.emit(f"Analyzing ({i+1}/{total_videos}): {title}")
-                    ydl.download([url])
-                    
-            except DownloadCancelledException:
-                self._cleanup_partial_file()
-                self.error.emit("Download cancelled by user.")
-                return # Stop entire batch
-            except Exception as e:
-                # If one fails, maybe continue? Or stop? 
-                # Let's emit error but try next? Or stop?
-                # Usually users prefer stopping on error or explicit error report.
-                # For now, let's report error string but continue if it's not cancellation
-                if "Download cancelled" in str(e):
-                    self._cleanup_partial_file()
-                    self.error.emit("Download cancelled by user.")
-                    return
-
-                self.error.emit(f"Error on video {i+1}: {str(e)}")
-                # Continue to next video?
-                continue
-        
-        # Check if all videos were downloaded successfully
-        if not self._is_cancelled:
-            # Check download results
-            downloaded_files = []
-            for filename in os.listdir(self.path):
-                if filename.endswith((".mp4", ".mkv", ".webm", ".flv", ".avi", ".mov", ".wmv", ".mp3", ".m4a")):
-                    # 移除扩展名，只保留文件名
-                    name_without_ext = os.path.splitext(filename)[0]
-                    downloaded_files.append(name_without_ext)
-            
-            # Find missing videos
-            missing_files = []
-            expected_files = [re.sub(r'[\\/*?::"<>|]', "_", item['title']).strip() for item in self.urls]
-            
-            for expected in expected_files:
-                found = False
-                for downloaded in downloaded_files:
-                    if downloaded == expected or downloaded.startswith(expected):
-                        found = True
-                        break
-                if not found:
-                    missing_files.append(expected)
-            
-            if missing_files and total_videos > 1:
-                # Retry missing downloads
-                print(f"\nFound {len(missing_files)} missing files, retrying...")
-                self.progress.emit(f"Retrying {len(missing_files)} missing files...")
-                
-                # Find the URLs for missing files
-                missing_urls = []
-                for item in self.urls:
-                    safe_title = re.sub(r'[\\/*?::"<>|]', "_", item['title']).strip()
-                    if safe_title in missing_files:
-                        missing_urls.append(item)
-                
-                if missing_urls:
-                    # Retry with the missing URLs
-                    retry_worker = DownloadWorker(missing_urls, self.path, self.format_str, self.proxy)
-                    retry_worker.run()
-            else:
-                self.finished.emit("Batch Download Complete!" if total_videos > 1 else "Download Complete!")
+    def refresh(self):
+        rows = self.job_queue.snapshot()
+        if len(rows) != len(self.rows) or any(new[0] is not old[0] for new, old in zip(rows, self.rows)):
+            self.beginResetModel()
+            self.rows = rows
+            self.endResetModel()
         else:
-            self.finished.emit("Download cancelled by user.")
+            self.rows = rows
+            if rows:
+                self.dataChanged.emit(self.index(0, 0), self.index(len(rows) - 1, len(self.HEADERS) - 1))
+
+    def status_text(self, job):
+        if job.state == RUNNING:
+            return format_progress(job.progress) if job.progress else "Running"
+        if job.state == RETRY_WAIT:
+            return "Waiting to retry"
+        return self.STATE_TEXT.get(job.state, job.state)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        job, rank = self.rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return str(rank) if rank else ""
+            if column == 1:
+                return job.platform or ""
+            if column == 2:
+                return job.title
+            if column == 3:
+                return format_eta(job.duration) if job.duration else "--:--"
+            if column == 4:
+                return str(job.priority)
+            if column == 5:
+                return self.status_text(job)
+        elif role == Qt.ItemDataRole.TextAlignmentRole and column in (0, 3, 4):
+            return Qt.AlignmentFlag.AlignCenter
+        elif role == Qt.ItemDataRole.ToolTipRole and column == 2:
+            return job.batch.path
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+class QueueTab(QWidget):
+    POLICY_NAMES = [("First in, first out", FIFO), ("Priority", PRIORITY), ("Shortest first", SHORTEST_FIRST)]
+
+    def __init__(self, job_queue):
+        super().__init__()
+        self.job_queue = job_queue
+        self._dirty = True
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(30, 40, 30, 40)
+        layout.setSpacing(15)
+
+        title_label = QLabel("Download Queue")
+        title_label.setObjectName("tabTitle")
+        layout.addWidget(title_label)
+
+        top_layout = QHBoxLayout()
+        top_layout.addWidget(QLabel("Scheduling:"))
+        self.policy_combo = QComboBox()
+        for name, policy in self.POLICY_NAMES:
+            self.policy_combo.addItem(name, policy)
+        self.policy_combo.currentIndexChanged.connect(
+            lambda: self.job_queue.set_policy(self.policy_combo.currentData()))
+        top_layout.addWidget(self.policy_combo)
+        top_layout.addStretch()
+        self.summary_label = QLabel("")
+        top_layout.addWidget(self.summary_label)
+        layout.addLayout(top_layout)
+
+        self.model = JobTableModel(job_queue, self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.table.setWordWrap(False)
+        header = self.table.horizontalHeader()
+        for column in range(len(JobTableModel.HEADERS)):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        btn_layout = QHBoxLayout()
+        for text, slot in (("Move Up", lambda: self._move(-1)),
+                           ("Move Down", lambda: self._move(1)),
+                           ("Priority +", lambda: self._bump_priority(1)),
+                           ("Priority -", lambda: self._bump_priority(-1)),
+                           ("Cancel Batch", self._cancel_batch),
+                           ("Clear Finished", self.job_queue.clear_finished)):
+            btn = QPushButton(text)
+            btn.clicked.connect(slot)
+            btn_layout.addWidget(btn)
+        layout.addLayout(btn_layout)
 
-    def _cleanup_partial_file(self):
-        if not self._current_file:
+        # Queue threads only flag changes; the view polls so bursts of updates cost one repaint
+        job_queue.changed.connect(self._mark_dirty)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(500)
+
+    def _mark_dirty(self):
+        self._dirty = True
+
+    def selected_jobs(self):
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        return [self.model.job(row) for row in rows]
+
+    def refresh(self):
+        running = sum(1 for job, _ in self.model.rows if job.state == RUNNING)
+        if not self._dirty and not running:
             return
-            
-        # List of potential temp extensions yt-dlp uses
-        files_to_check = [
-            self._current_file,
-            self._current_file + ".part",
-            self._current_file + ".ytdl"
-        ]
-        
-        for f_path in files_to_check:
-            if os.path.exists(f_path):
-                try:
-                    os.remove(f_path)
-                    print(f"Cleaned up: {f_path}") # Debug info
-                except OSError:
-                    pass
+        self._dirty = False
+        selected = self.selected_jobs()
+        self.model.refresh()
+        if selected:
+            # A reset drops the selection; put it back on the same jobs
+            selection = self.table.selectionModel()
+            for row, (job, _) in enumerate(self.model.rows):
+                if job in selected:
+                    selection.select(self.model.index(row, 0),
+                                     selection.SelectionFlag.Select | selection.SelectionFlag.Rows)
+        waiting = sum(1 for _, rank in self.model.rows if rank)
+        running = sum(1 for job, _ in self.model.rows if job.state == RUNNING)
+        self.summary_label.setText(f"{running} running, {waiting} waiting")
+
+    def _move(self, offset):
+        jobs = self.selected_jobs()
+        if jobs:
+            self.job_queue.move(jobs, offset)
+            self.refresh()
+
+    def _bump_priority(self, delta):
+        jobs = self.selected_jobs()
+        for job in jobs:
+            self.job_queue.set_priority([job], job.priority + delta)
+        self.refresh()
+
+    def _cancel_batch(self):
+        for batch in {job.batch for job in self.selected_jobs()}:
+            self.job_queue.cancel(batch)
 
 class ModernTab(QWidget):
-    def __init__(self, platform_name, settings_tab=None):
+    def __init__(self, platform_name, settings_tab=None, job_queue=None):
         super().__init__()
         self.platform_name = platform_name
         self.settings_tab = settings_tab
+        self.job_queue = job_queue
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 40, 30, 40)
@@ -720,6 +1071,21 @@ class ModernTab(QWidget):
         self.url_input.setMinimumHeight(50)
         input_layout.addWidget(self.url_input)
 
+        # Bulk mode: any number of links or BV/av IDs, pasted or dropped as a .txt file
+        self.bulk_input = QPlainTextEdit()
+        self.bulk_input.setPlaceholderText("Paste links or BV/av IDs (any layout, duplicates are ignored), or drop .txt files here...")
+        self.bulk_input.setMinimumHeight(120)
+        self.bulk_input.setVisible(False)
+        input_layout.addWidget(self.bulk_input)
+        self.chk_bulk = QCheckBox("Bulk mode (many links at once)")
+        self.chk_bulk.toggled.connect(self.set_bulk_mode)
+        input_layout.addWidget(self.chk_bulk)
+        self.setAcceptDrops(True)
+
+        # Skip the analysis cache and query the site again
+        self.chk_refresh = QCheckBox("Force refresh (ignore cached analysis)")
+        input_layout.addWidget(self.chk_refresh)
+
         layout.addWidget(input_container)
 
         # Status Label
@@ -743,6 +1109,13 @@ class ModernTab(QWidget):
         layout.addStretch()
         
         self.current_worker = None
+        self.streaming_dialog = None
+        # Entry batches that arrived before the streaming dialog was open
+        self._early_entries = []
+        # Analyses abandoned mid-stream; kept referenced until their thread exits
+        self._stale_workers = []
+        # Batches submitted to the job queue, kept referenced until they are done
+        self.batches = []
 
     def handle_action(self):
         if self.current_worker and self.current_worker.isRunning():
@@ -756,39 +1129,65 @@ class ModernTab(QWidget):
             self.status_label.setText("Cancelling...")
             self.action_btn.setEnabled(False)
 
-    def extract_clean_url(self, text):
-        text = text.strip()
-        
-        # 1. Try to find a Bilibili URL in the text
-        url_match = re.search(r'https?://(?:www\.)?bilibili\.com/video/(BV[a-zA-Z0-9]{10}|av[0-9]+)', text)
-        if url_match:
-            return url_match.group(0)
-            
-        # 2. Try to find a Bilibili short link (b23.tv)
-        short_match = re.search(r'https?://b23\.tv/[a-zA-Z0-9]+', text)
-        if short_match:
-            return short_match.group(0)
-            
-        # 3. Try to find a stand-alone BV or av ID
-        id_match = re.search(r'\b(BV[a-zA-Z0-9]{10}|av[0-9]+)\b', text)
-        if id_match:
-            return f"https://www.bilibili.com/video/{id_match.group(1)}"
-            
-        # 3. If it looks like a YouTube URL (for the other tab)
-        yt_match = re.search(r'https?://(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/)([a-zA-Z0-9_-]{11})', text)
-        if yt_match:
-            return yt_match.group(0)
+    def get_proxy(self):
+        if self.settings_tab:
+            return self.settings_tab.proxy_input.text() or None
+        return None
 
-        # fallback to the original text if no patterns match
-        return text
+    def get_cookies_browser(self):
+        return self.settings_tab.cookies_browser() if self.settings_tab else None
+
+    def get_download_path(self):
+        if self.settings_tab:
+            return self.settings_tab.path_input.text() or "."
+        return "."
+
+    def set_bulk_mode(self, enabled):
+        if enabled and self.url_input.text().strip() and not self.bulk_input.toPlainText().strip():
+            self.bulk_input.setPlainText(self.url_input.text().strip())
+        self.url_input.setVisible(not enabled)
+        self.bulk_input.setVisible(enabled)
+        if self.chk_bulk.isChecked() != enabled:
+            self.chk_bulk.setChecked(enabled)
+
+    def dragEnterEvent(self, event):
+        mime = event.mimeData()
+        if mime.hasText() or any(url.toLocalFile().lower().endswith('.txt') for url in mime.urls()):
+            event.acceptProposedAction()
+
+    def dropEvent(self, event):
+        mime = event.mimeData()
+        texts = []
+        for url in mime.urls():
+            path = url.toLocalFile()
+            if path.lower().endswith('.txt'):
+                try:
+                    with open(path, encoding='utf-8', errors='replace') as f:
+                        texts.append(f.read())
+                except OSError as e:
+                    self.status_label.setText(f"Could not read {os.path.basename(path)}: {e}")
+        if not texts and mime.hasText():
+            texts.append(mime.text())
+        if not texts:
+            return
+        self.set_bulk_mode(True)
+        current = self.bulk_input.toPlainText().rstrip()
+        self.bulk_input.setPlainText("\n".join(([current] if current else []) + texts))
+        self.status_label.setText(f"{len(extract_urls(self.bulk_input.toPlainText()))} unique links ready")
+        event.acceptProposedAction()
 
     def start_analysis(self):
-        raw_text = self.url_input.text().strip()
+        self._stale_workers = [w for w in self._stale_workers if w.isRunning()]
+        raw_text = (self.bulk_input.toPlainText() if self.chk_bulk.isChecked() else self.url_input.text()).strip()
         if not raw_text:
             self.status_label.setText("Please enter a valid URL or Video ID")
             return
 
-        url = self.extract_clean_url(raw_text)
+        urls = extract_urls(raw_text)
+        if len(urls) > 1:
+            self.start_bulk_analysis(urls)
+            return
+        url = urls[0] if urls else raw_text
         
         # Get proxy settings
         proxy = None
@@ -799,51 +1198,131 @@ class ModernTab(QWidget):
         self.action_btn.setText("Cancel Analysis")
         self.status_label.setText("Analyzing video formats...")
         
-        self.current_worker = AnalysisWorker(url, proxy)
-        # We need to add stop() to AnalysisWorker too for consistency
-        if not hasattr(self.current_worker, 'stop'):
-            self.current_worker.stop = lambda: None # Placeholder for now
-            
+        # With a default profile there is no dialog to stream entries into
+        auto_profile = self.settings_tab.auto_profile() if self.settings_tab else None
+        self.current_worker = AnalysisWorker(url, proxy, self.chk_refresh.isChecked(), incremental=auto_profile is None,
+                                             cookies_browser=self.get_cookies_browser())
         self.current_worker.finished.connect(self.on_analysis_finished)
         self.current_worker.error.connect(self.on_error)
+        self.current_worker.playlist_started.connect(self.on_playlist_started)
+        # Connected up front: a flat listing can send every batch before the dialog is open
+        self._early_entries = []
+        self.current_worker.entries_batch.connect(self.on_entries_batch)
+        self.current_worker.start()
+
+    def start_bulk_analysis(self, urls):
+        self.action_btn.setText("Cancel Analysis")
+        self.status_label.setText(f"Analyzing {len(urls)} links...")
+        self.current_worker = BulkAnalysisWorker(urls, self.get_proxy(), self.chk_refresh.isChecked(),
+                                                 self.get_cookies_browser())
+        self.current_worker.progress.connect(self.on_bulk_progress)
+        self.current_worker.finished.connect(self.on_bulk_finished)
         self.current_worker.start()
 
+    def on_bulk_progress(self, done, total, url):
+        self.status_label.setText(f"Analyzing links... {done}/{total}")
+
+    def on_bulk_finished(self, results, errors):
+        worker = self.current_worker
+        if worker and worker.isRunning():
+            worker.wait()
+        cancelled = worker is not None and worker.engine.cancelled
+        self.reset_action_button()
+        if cancelled:
+            self.status_label.setText("Analysis cancelled")
+            return
+        summary = f"{len(results)} of {len(results) + len(errors)} links analyzed"
+        if errors:
+            summary += f", {len(errors)} failed: " + "; ".join(f"{url} ({message})" for url, message in errors[:3])
+            if len(errors) > 3:
+                summary += f"; and {len(errors) - 3} more"
+        if not results:
+            self.status_label.setText(f"Error: {summary}")
+            return
+
+        info = merge_analyses(results)
+        auto_profile = self.settings_tab.auto_profile() if self.settings_tab else None
+        if auto_profile is not None:
+            # Straight to the queue, like a single link with a default profile
+            self.start_real_download(download_items(info, profile=auto_profile), None)
+            return
+        self.status_label.setText(summary)
+        dialog = FormatSelectionDialog(info, self, self.get_proxy(), self.get_download_path(), self.get_cookies_browser())
+        self._handle_dialog_result(dialog, dialog.exec(), info)
+
+    def on_playlist_started(self, info):
+        # Open the dialog on the first entries; the rest stream in while it is shown
+        worker = self.current_worker
+        self.status_label.setText("Loading playlist entries...")
+        dialog = FormatSelectionDialog(info, self, self.get_proxy(), self.get_download_path(), self.get_cookies_browser())
+        early, self._early_entries = self._early_entries, []
+        for batch in early:
+            dialog.append_entries(batch)
+        self.streaming_dialog = dialog
+        result = dialog.exec()
+        self.streaming_dialog = None
+
+        if worker.isRunning():
+            # Selection made (or cancelled) before the playlist finished loading
+            worker.stop()
+            worker.finished.disconnect()
+            worker.error.disconnect()
+            worker.entries_batch.disconnect()
+            self._stale_workers.append(worker)
+        self.reset_action_button()
+        self._handle_dialog_result(dialog, result, info)
+
+    def on_entries_batch(self, batch):
+        if self.streaming_dialog:
+            self.streaming_dialog.append_entries(batch)
+        elif self.sender() is self.current_worker:
+            self._early_entries.append(batch)
+
     def on_analysis_finished(self, info):
+        if self.streaming_dialog:
+            self.streaming_dialog.finish_loading()
+            return
+
         # Wait for thread to finish before resetting
-        if self.current_worker and self.current_worker.isRunning():
-            self.current_worker.wait()
+        worker = self.current_worker
+        if worker and worker.isRunning():
+            worker.wait()
         self.reset_action_button()
+        if worker is not None and worker.engine.cancelled:
+            # Cancelled just as the result came in: neither a dialog nor downloads
+            self.status_label.setText("Analysis cancelled")
+            return
+
+        auto_profile = self.settings_tab.auto_profile() if self.settings_tab else None
+        if auto_profile is not None:
+            # Skip the dialog: every entry gets its best fit for the default profile
+            playlist_title = info.get('title') if info.get('is_playlist') else None
+            self.start_real_download(download_items(info, profile=auto_profile), None, playlist_title)
+            return
         self.status_label.setText("Select a format to download")
         
-        dialog = FormatSelectionDialog(info, self)
-        if dialog.exec():
+        dialog = FormatSelectionDialog(info, self, self.get_proxy(), self.get_download_path(), self.get_cookies_browser())
+        self._handle_dialog_result(dialog, dialog.exec(), info)
+
+    def _handle_dialog_result(self, dialog, result, info):
+        if result:
             # User selected something
             format_str = dialog.selected_format_id
             urls = dialog.selected_urls
             # Get playlist title if applicable
-            playlist_title = info.get('title') if info.get('is_playlist') else None
+            # Bulk selections go to the download folder itself, not a folder per selection
+            playlist_title = info.get('title') if info.get('is_playlist') and not info.get('bulk') else None
             self.start_real_download(urls, format_str, playlist_title)
         else:
             self.status_label.setText("Download cancelled")
 
     def start_real_download(self, urls, format_str, playlist_title=None):
-        path = "."
-        proxy = None
-        if self.settings_tab:
-            p = self.settings_tab.path_input.text()
-            if p: path = p
-            px = self.settings_tab.proxy_input.text()
-            if px: proxy = px
+        path = self.get_download_path()
+        proxy = self.get_proxy()
 
         # If it's a playlist and multiple items are selected, create a subfolder
         if playlist_title and len(urls) > 1:
-            # Sanitize folder name
-            safe_title = re.sub(r'[\\/*?:"<>|]', "_", playlist_title).strip()
-            # Truncate very long titles to avoid path length issues
-            if len(safe_title) > 150:
-                safe_title = safe_title[:150]
-            
-            path = os.path.abspath(os.path.join(path, safe_title))
+            path = playlist_folder(path, playlist_title)
             if not os.path.exists(path):
                 try:
                     os.makedirs(path, exist_ok=True)
@@ -851,28 +1330,70 @@ class ModernTab(QWidget):
                     self.status_label.setText(f"Error creating directory: {e}")
                     # Fallback to original path if fail
 
-        self.action_btn.setText("Cancel Download")
-        self.action_btn.setEnabled(True)
-        self.action_btn.setStyleSheet("background-color: #e74c3c;") # Red for cancel
-        
-        self.current_worker = DownloadWorker(urls, path, format_str, proxy)
-        self.current_worker.finished.connect(self.on_finished)
-        self.current_worker.error.connect(self.on_error)
-        self.current_worker.progress.connect(self.on_progress)
-        self.current_worker.start()
+        try:
+            journal = BatchJournal.create(urls, path, format_str, proxy, playlist_title, self.platform_name)
+        except OSError as e:
+            log.warning(f"Could not create batch journal: {e}")
+            journal = None
+        self._submit_batch(urls, path, format_str, proxy, journal)
+
+    def resume_batch(self, journal):
+        data = journal.data
+        os.makedirs(data['path'], exist_ok=True)
+        self._submit_batch(journal.items, data['path'], data['format'], data.get('proxy'), journal)
+
+    def _submit_batch(self, urls, path, format_str, proxy, journal=None):
+        # The tab stays free for the next link; the shared queue decides when items run
+        connections = self.settings_tab.conn_input.value() if self.settings_tab else 1
+        reuse_existing = self.settings_tab.chk_reuse.isChecked() if self.settings_tab else True
+        preallocate = self.settings_tab.chk_preallocate.isChecked() if self.settings_tab else False
+        batch = BatchDownloader(urls, path, format_str, proxy, journal=journal, connections=connections,
+                                bandwidth_channel=self.platform_name, reuse_existing=reuse_existing,
+                                preallocate=preallocate, cookies_browser=self.get_cookies_browser())
+        signals = BatchSignals(batch, self)
+        signals.finished.connect(self.on_batch_finished)
+        signals.error.connect(self.on_batch_error)
+        signals.progress.connect(self.on_progress)
+        signals.progress_data.connect(self.on_progress_data)
+        signals.done.connect(lambda: self._forget_batch(signals))
+        self.batches.append(signals)
+        jobs = self.job_queue.submit(batch, platform=self.platform_name)
+        self.url_input.clear()
+        self.status_label.setText(f"Queued {len(jobs)} item(s); see the Queue tab")
+
+    def _forget_batch(self, signals):
+        if signals in self.batches:
+            self.batches.remove(signals)
+        signals.deleteLater()
 
-    def on_finished(self, msg):
+    def on_batch_finished(self, msg):
         self.status_label.setText(msg)
-        self.reset_action_button()
-        self.url_input.clear()
 
-    def on_error(self, err):
+    def on_batch_error(self, err):
+        # A single item failed for good; the rest of the batch keeps going
         self.status_label.setText(f"Error: {err}")
+
+    def on_error(self, err):
+        if self.streaming_dialog:
+            # Keep the entries loaded so far selectable
+            self.streaming_dialog.finish_loading(err)
+            return
+        worker = self.current_worker
+        if isinstance(worker, AnalysisWorker) and worker.engine.cancelled:
+            self.status_label.setText("Analysis cancelled")
+        else:
+            self.status_label.setText(f"Error: {err}")
         self.reset_action_button()
 
     def on_progress(self, msg):
         self.status_label.setText(msg)
 
+    def on_progress_data(self, payload):
+        msg = format_progress(payload)
+        if payload.get('total', 1) > 1:
+            msg += f" | {payload['completed']} done, {payload['active']} active"
+        self.status_label.setText(msg)
+
     def reset_action_button(self):
         self.action_btn.setText("Analyze & Download")
         self.action_btn.setEnabled(True)
@@ -881,6 +1402,15 @@ class ModernTab(QWidget):
 
 
 class SettingsTab(QWidget):
+    @staticmethod
+    def _limit_spinbox():
+        spin = QSpinBox()
+        spin.setRange(0, 1000000)
+        spin.setSingleStep(100)
+        spin.setSuffix(" KB/s")
+        spin.setSpecialValueText("Unlimited")
+        return spin
+
     def __init__(self):
         super().__init__()
         layout = QVBoxLayout(self)
@@ -914,6 +1444,79 @@ class SettingsTab(QWidget):
         self.proxy_input.setPlaceholderText("e.g. http://127.0.0.1:7890")
         form_layout.addRow("Proxy Server:", self.proxy_input)
 
+        # Browser whose cookies are sent with every request (signed-in quality, members-only videos)
+        self.cookies_combo = QComboBox()
+        self.cookies_combo.addItem("None", None)
+        for browser in ('firefox', 'chrome', 'chromium', 'edge', 'brave', 'opera', 'vivaldi', 'safari', 'whale'):
+            self.cookies_combo.addItem(browser.capitalize(), browser)
+        self.cookies_combo.setCurrentIndex(self.cookies_combo.findData('firefox'))
+        self.cookies_combo.setToolTip("A browser without a readable cookie database is skipped with a warning")
+        form_layout.addRow("Browser Cookies:", self.cookies_combo)
+
+        # Concurrent downloads for playlist batches
+        self.jobs_input = QSpinBox()
+        self.jobs_input.setRange(1, 16)
+        self.jobs_input.setValue(3)
+        self.jobs_input.setToolTip("Number of items downloaded at the same time across all tabs")
+        form_layout.addRow("Concurrent Downloads:", self.jobs_input)
+
+        platform_jobs_layout = QHBoxLayout()
+        self.platform_jobs_inputs = {}
+        for name in ("Bilibili", "YouTube"):
+            spin = QSpinBox()
+            spin.setRange(0, 16)
+            spin.setSpecialValueText("No limit")
+            self.platform_jobs_inputs[name] = spin
+            platform_jobs_layout.addWidget(QLabel(f"{name}:"))
+            platform_jobs_layout.addWidget(spin)
+        form_layout.addRow("Per-Platform Downloads:", platform_jobs_layout)
+
+        # Parallel connections within a single file
+        self.conn_input = QSpinBox()
+        self.conn_input.setRange(1, 16)
+        self.conn_input.setValue(1)
+        self.conn_input.setToolTip("Connections per file: concurrent fragments for DASH/HLS, Range segments for direct files")
+        form_layout.addRow("Connections per File:", self.conn_input)
+
+        # Bandwidth caps take effect immediately, including for running downloads
+        self.limit_input = self._limit_spinbox()
+        self.limit_input.valueChanged.connect(lambda v: shared_governor().set_global_limit(v * 1024))
+        form_layout.addRow("Total Bandwidth Limit:", self.limit_input)
+
+        tab_limits_layout = QHBoxLayout()
+        self.tab_limit_inputs = {}
+        for name in ("Bilibili", "YouTube"):
+            spin = self._limit_spinbox()
+            spin.valueChanged.connect(lambda v, name=name: shared_governor().set_channel_limit(name, v * 1024))
+            self.tab_limit_inputs[name] = spin
+            tab_limits_layout.addWidget(QLabel(f"{name}:"))
+            tab_limits_layout.addWidget(spin)
+        form_layout.addRow("Per-Tab Limits:", tab_limits_layout)
+
+        # Default format profile: analyses go straight to the queue instead of the format dialog
+        profile_layout = QHBoxLayout()
+        self.profile_store = ProfileStore()
+        self.profile_combo = QComboBox()
+        self.profile_combo.setToolTip("Resolved against each episode's own formats; skips the format dialog")
+        new_profile_btn = QPushButton("New...")
+        new_profile_btn.clicked.connect(lambda: self.edit_profile(None))
+        edit_profile_btn = QPushButton("Edit...")
+        edit_profile_btn.clicked.connect(lambda: self.edit_profile(self.auto_profile()))
+        profile_layout.addWidget(self.profile_combo, 1)
+        profile_layout.addWidget(new_profile_btn)
+        profile_layout.addWidget(edit_profile_btn)
+        form_layout.addRow("Format Profile:", profile_layout)
+
+        self.chk_reuse = QCheckBox("Hardlink videos already downloaded to another folder")
+        self.chk_reuse.setChecked(True)
+        self.chk_reuse.setToolTip("Same video and format found in an earlier download: link (or copy) it instead of downloading again")
+        form_layout.addRow("Duplicates:", self.chk_reuse)
+
+        self.chk_preallocate = QCheckBox("Preallocate files (less fragmentation on hard disks)")
+        self.chk_preallocate.setToolTip("Reserve each file's full size before downloading it")
+        form_layout.addRow("Disk:", self.chk_preallocate)
+        self.reload_profiles()
+
         layout.addWidget(form_frame)
         
         # Save Button
@@ -930,6 +1533,136 @@ class SettingsTab(QWidget):
         if folder:
             self.path_input.setText(folder)
 
+    def cookies_browser(self):
+        return self.cookies_combo.currentData()
+
+    def auto_profile(self):
+        return self.profile_combo.currentData()
+
+    def reload_profiles(self, select_name=None):
+        self.profile_combo.clear()
+        self.profile_combo.addItem("Ask every time (format dialog)", None)
+        for profile in self.profile_store.load():
+            self.profile_combo.addItem(profile['name'], profile)
+            if profile['name'] == select_name:
+                self.profile_combo.setCurrentIndex(self.profile_combo.count() - 1)
+
+    def edit_profile(self, profile):
+        dialog = FormatProfileDialog(profile, self)
+        if not dialog.exec():
+            return
+        try:
+            if dialog.deleted:
+                self.profile_store.delete(profile['name'])
+                self.reload_profiles()
+            else:
+                new_profile = dialog.profile()
+                self.profile_store.save_profile(new_profile, replace=profile['name'] if profile else None)
+                self.reload_profiles(new_profile['name'])
+        except OSError as e:
+            QMessageBox.warning(self, "Format Profiles", f"Could not save profiles: {e}")
+
+
+class FormatProfileDialog(QDialog):
+    HEIGHTS = [("Best available", None), ("2160p", 2160), ("1440p", 1440), ("1080p", 1080), ("720p", 720),
+               ("480p", 480), ("360p", 360)]
+    CONTAINERS = [("Any", None), ("mp4", 'mp4'), ("webm", 'webm')]
+
+    def __init__(self, profile=None, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Edit Format Profile" if profile else "New Format Profile")
+        self.deleted = False
+        profile = profile or {}
+
+        layout = QVBoxLayout(self)
+        form_layout = QFormLayout()
+        self.name_input = QLineEdit(profile.get('name', ''))
+        self.name_input.setPlaceholderText("e.g. 1080p AVC, 2 GB cap")
+        form_layout.addRow("Name:", self.name_input)
+
+        self.height_combo = self._combo(self.HEIGHTS, profile.get('max_height'))
+        form_layout.addRow("Max Resolution:", self.height_combo)
+        self.codec_combo = self._combo([("Any", None)] + [(name, key) for key, name in CODEC_NAMES.items()],
+                                       profile.get('vcodec'))
+        form_layout.addRow("Preferred Codec:", self.codec_combo)
+        self.ext_combo = self._combo(self.CONTAINERS, profile.get('ext'))
+        form_layout.addRow("Preferred Container:", self.ext_combo)
+
+        self.fps_input = QSpinBox()
+        self.fps_input.setRange(0, 240)
+        self.fps_input.setSpecialValueText("Any")
+        self.fps_input.setValue(profile.get('max_fps') or 0)
+        form_layout.addRow("Max Frame Rate:", self.fps_input)
+
+        self.abr_input = QSpinBox()
+        self.abr_input.setRange(0, 1024)
+        self.abr_input.setSingleStep(32)
+        self.abr_input.setSuffix(" kbps")
+        self.abr_input.setSpecialValueText("Any")
+        self.abr_input.setValue(profile.get('min_abr') or 0)
+        form_layout.addRow("Min Audio Bitrate:", self.abr_input)
+
+        self.size_input = QSpinBox()
+        self.size_input.setRange(0, 1000000)
+        self.size_input.setSingleStep(100)
+        self.size_input.setSuffix(" MB")
+        self.size_input.setSpecialValueText("No cap")
+        self.size_input.setValue((profile.get('max_size') or 0) // (1024 * 1024))
+        form_layout.addRow("Size Cap per Video:", self.size_input)
+
+        self.audio_only = QCheckBox("Audio only")
+        self.audio_only.setChecked(bool(profile.get('audio_only')))
+        form_layout.addRow("", self.audio_only)
+        layout.addLayout(form_layout)
+
+        btn_layout = QHBoxLayout()
+        if profile:
+            delete_btn = QPushButton("Delete")
+            delete_btn.clicked.connect(self._delete)
+            btn_layout.addWidget(delete_btn)
+        btn_layout.addStretch()
+        cancel_btn = QPushButton("Cancel")
+        cancel_btn.clicked.connect(self.reject)
+        save_btn = QPushButton("Save")
+        save_btn.setObjectName("primaryButton")
+        save_btn.clicked.connect(self._save)
+        btn_layout.addWidget(cancel_btn)
+        btn_layout.addWidget(save_btn)
+        layout.addLayout(btn_layout)
+
+    @staticmethod
+    def _combo(choices, current):
+        combo = QComboBox()
+        for text, value in choices:
+            combo.addItem(text, value)
+            if value == current:
+                combo.setCurrentIndex(combo.count() - 1)
+        return combo
+
+    def profile(self):
+        profile = {
+            'name': self.name_input.text().strip(),
+            'max_height': self.height_combo.currentData(),
+            'max_fps': self.fps_input.value(),
+            'vcodec': self.codec_combo.currentData(),
+            'ext': self.ext_combo.currentData(),
+            'min_abr': self.abr_input.value(),
+            'max_size': self.size_input.value() * 1024 * 1024,
+            'audio_only': self.audio_only.isChecked(),
+        }
+        # Unset rules are left out, like in parsed profiles
+        return {key: value for key, value in profile.items() if value}
+
+    def _save(self):
+        if not self.name_input.text().strip():
+            self.name_input.setFocus()
+            return
+        self.accept()
+
+    def _delete(self):
+        self.deleted = True
+        self.accept()
+
 class UniDownApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -942,6 +1675,45 @@ class UniDownApp(QMainWindow):
         # Set App Icon
         self.setWindowIcon(QIcon("assets/icon.png"))
 
+        # Offer to pick up batches interrupted by a crash or close
+        QTimer.singleShot(0, self.offer_resume)
+
+    def offer_resume(self):
+        try:
+            journals = BatchJournal.list_unfinished()
+        except OSError:
+            return
+        tabs = {'Bilibili': self.tab_bilibili, 'YouTube': self.tab_youtube}
+        for journal in journals:
+            data = journal.data
+            tab = tabs.get(data.get('platform'), self.tab_bilibili)
+            total = len(journal.items)
+            done = total - journal.remaining()
+            name = data.get('playlist_title') or journal.items[0].get('title', 'download')
+            answer = QMessageBox.question(
+                self, "Resume Downloads",
+                f"An unfinished download batch was found:\n\n{name}\n{done}/{total} items done, saved to {data['path']}\n\nResume it?")
+            if answer == QMessageBox.StandardButton.Yes:
+                tab.resume_batch(journal)
+                self.tabs.setCurrentWidget(self.tab_queue)
+            else:
+                journal.discard()
+
+    def closeEvent(self, event):
+        # Stop running batches without deleting .part files so they can resume next time
+        self.job_queue.cancel_all(keep_partial=True)
+        self.job_queue.wait_idle(5)
+        # Cancelled batches skip merges that have not started; let the running ones finish so
+        # their items end up complete instead of as loose streams
+        pool = shared_postprocess_pool()
+        if pool.pending():
+            self.statusBar().showMessage("Finishing merges...")
+            QApplication.processEvents()
+            pool.wait_idle(30)
+        self.job_queue.shutdown(wait=False)
+        close_sessions()
+        super().closeEvent(event)
+
     def init_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -966,11 +1738,19 @@ class UniDownApp(QMainWindow):
         self.tabs.setDocumentMode(True)
         
         self.tab_settings = SettingsTab()
-        self.tab_bilibili = ModernTab("Bilibili", self.tab_settings)
-        self.tab_youtube = ModernTab("YouTube", self.tab_settings)
+        # One queue for every tab; concurrency settings apply to it immediately
+        self.job_queue = JobQueue(self.tab_settings.jobs_input.value())
+        self.tab_settings.jobs_input.valueChanged.connect(self.job_queue.set_max_workers)
+        for name, spin in self.tab_settings.platform_jobs_inputs.items():
+            spin.valueChanged.connect(lambda v, name=name: self.job_queue.set_platform_limit(name, v))
+
+        self.tab_bilibili = ModernTab("Bilibili", self.tab_settings, self.job_queue)
+        self.tab_youtube = ModernTab("YouTube", self.tab_settings, self.job_queue)
+        self.tab_queue = QueueTab(self.job_queue)
 
         self.tabs.addTab(self.tab_bilibili, "Bilibili")
         self.tabs.addTab(self.tab_youtube, "YouTube")
+        self.tabs.addTab(self.tab_queue, "Queue")
         self.tabs.addTab(self.tab_settings, "Settings")
 
         main_layout.addWidget(self.tabs)
@@ -1062,12 +1842,42 @@ class UniDownApp(QMainWindow):
         """)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    # Our own flags; everything else is left for Qt
+    parser = argparse.ArgumentParser(add_help=False)
+    # Print the startup timeline once warm-up is done, then exit
+    parser.add_argument("--profile-startup", action="store_true")
+    parser.add_argument("--verbose", action="store_true")
+    # Record analysis/download phases and write them as a Chrome trace on exit
+    parser.add_argument("--trace", metavar="FILE")
+    options, qt_args = parser.parse_known_args()
+    profile_startup = options.profile_startup
+    configure_logging(options.verbose)
+    if options.trace:
+        tracer.enable()
+
+    app = QApplication([sys.argv[0]] + qt_args)
+    startup_profile.mark("QApplication created")
     
     # Set default font
     font = QFont("Segoe UI", 10)
     app.setFont(font)
     
     window = UniDownApp()
+    startup_profile.mark("main window built")
     window.show()
-    sys.exit(app.exec())
+    startup_profile.mark("window shown")
+
+    warm_up_worker = WarmUpWorker(window.tab_settings.cookies_browser())
+    if profile_startup:
+        warm_up_worker.finished.connect(lambda: (startup_profile.report(), app.quit()))
+
+    def start_warm_up():
+        # Runs on the first event loop pass, after the window got its first paint request
+        startup_profile.mark("event loop running")
+        warm_up_worker.start()
+    QTimer.singleShot(0, start_warm_up)
+    exit_code = app.exec()
+    if options.trace:
+        tracer.export_chrome_trace(options.trace)
+        print(f"Trace written to {options.trace}", file=sys.stderr)
+    sys.exit(exit_code)
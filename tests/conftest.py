@@ -0,0 +1,36 @@
+import pytest
+
+from benchmarks.fake_extractor import install_fake_extractor
+from benchmarks.fakesite import FakeSite
+from unidown import cookies
+from unidown.cache import AnalysisCache
+from unidown.library import ContentIndex
+
+
+@pytest.fixture(autouse=True)
+def isolated_home(tmp_path, monkeypatch):
+    # Caches, indexes and journals go to a fresh per-user tree, never the developer's own
+    home = tmp_path / 'home'
+    home.mkdir()
+    monkeypatch.setenv('HOME', str(home))
+    monkeypatch.setenv('XDG_CACHE_HOME', str(home / '.cache'))
+    monkeypatch.setenv('XDG_DATA_HOME', str(home / '.local' / 'share'))
+    monkeypatch.setattr(AnalysisCache, '_shared', None)
+    monkeypatch.setattr(ContentIndex, '_shared', None)
+    monkeypatch.setattr(cookies, '_providers', {})
+    return home
+
+
+@pytest.fixture(scope='session')
+def site():
+    # Local media server plus the fake extractor that reads it; see benchmarks/fakesite.py
+    site = FakeSite(video_size=64 * 1024).start()
+    install_fake_extractor(site.base_url)
+    yield site
+    site.stop()
+
+
+@pytest.fixture
+def fast_site(site):
+    site.set_conditions(latency=0, bandwidth=0, video_size=64 * 1024)
+    return site
@@ -0,0 +1,56 @@
+import os
+
+import pytest
+
+from unidown.archive import ARCHIVE_NAME, DownloadArchive, item_archive_key
+from unidown.engine import BatchDownloader
+
+
+@pytest.mark.parametrize('item, key', [
+    ({'url': 'https://www.bilibili.com/video/BV1xx411c7mD?p=2'}, ('bilibili', 'BV1xx411c7mD_p2')),
+    ({'url': 'BV1xx411c7mD'}, ('bilibili', 'BV1xx411c7mD_p1')),
+    ({'url': 'https://b23.tv/abc123', 'ie_key': 'BiliBili', 'id': 'BV1xx411c7mD'}, ('bilibili', 'BV1xx411c7mD_p1')),
+    ({'url': 'https://b23.tv/abc123', 'ie_key': 'BiliBili', 'id': 'BV1xx411c7mD_p3'}, ('bilibili', 'BV1xx411c7mD_p3')),
+    ({'url': 'https://youtu.be/dQw4w9WgXcQ'}, ('youtube', 'dQw4w9WgXcQ')),
+    ({'url': 'https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1'}, ('youtube', 'dQw4w9WgXcQ')),
+    ({'url': 'https://example.com/v/1', 'ie_key': 'Generic', 'id': 7}, ('generic', '7')),
+    ({'url': 'https://example.com/v/1'}, ('url', 'https://example.com/v/1')),
+])
+def test_item_archive_key(item, key):
+    assert item_archive_key(item) == key
+
+
+def test_archive_persists_one_line_per_item(tmp_path):
+    archive = DownloadArchive.for_directory(str(tmp_path))
+    archive.add('youtube', 'dQw4w9WgXcQ')
+    archive.add('youtube', 'dQw4w9WgXcQ')
+    archive.add('bilibili', 'BV1xx411c7mD_p1')
+
+    assert archive.contains('youtube', 'dQw4w9WgXcQ')
+    assert not archive.contains('youtube', 'other')
+    with open(tmp_path / ARCHIVE_NAME, encoding='utf-8') as f:
+        assert f.read().splitlines() == ['youtube dQw4w9WgXcQ', 'bilibili BV1xx411c7mD_p1']
+
+    reloaded = DownloadArchive.for_directory(str(tmp_path))
+    assert len(reloaded) == 2 and reloaded.contains('bilibili', 'BV1xx411c7mD_p1')
+
+
+def test_short_link_and_canonical_url_share_one_key(tmp_path):
+    archive = DownloadArchive.for_directory(str(tmp_path))
+    archive.add(*item_archive_key({'url': 'https://b23.tv/abc123', 'ie_key': 'BiliBili', 'id': 'BV1xx411c7mD'}))
+
+    for url in ('https://www.bilibili.com/video/BV1xx411c7mD', 'https://m.bilibili.com/video/BV1xx411c7mD?p=1'):
+        assert archive.contains(*item_archive_key({'url': url}))
+    assert not archive.contains(*item_archive_key({'url': 'https://www.bilibili.com/video/BV1xx411c7mD?p=2'}))
+
+
+def test_batch_skips_archived_items(fast_site, tmp_path):
+    items = [{'url': f"{fast_site.base_url}/bench/video/arc-{i}", 'title': f"P{i:02d} arc"} for i in (1, 2)]
+    BatchDownloader(items, str(tmp_path), 'best').run()
+    os.remove(tmp_path / 'P01 arc.mp4')
+
+    downloader = BatchDownloader(items, str(tmp_path), 'best')
+    downloader.run()
+
+    assert downloader.skipped_videos == 2
+    assert not os.path.exists(tmp_path / 'P01 arc.mp4')
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from unidown.cache import AnalysisCache, normalize_video_key
+from unidown.engine import Analyzer
+
+
+@pytest.mark.parametrize('url, key', [
+    ('https://www.bilibili.com/video/BV1xx411c7mD', 'bilibili:BV1xx411c7mD:p1'),
+    ('https://m.bilibili.com/video/BV1xx411c7mD?p=3&spm_id_from=x', 'bilibili:BV1xx411c7mD:p3'),
+    ('BV1xx411c7mD', 'bilibili:BV1xx411c7mD:p1'),
+    ('https://b23.tv/abc123', 'b23:abc123'),
+    ('https://youtu.be/dQw4w9WgXcQ?t=10', 'youtube:dQw4w9WgXcQ'),
+    ('https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ', 'youtube:dQw4w9WgXcQ'),
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1', 'youtube:dQw4w9WgXcQ:list=PL1'),
+    ('https://www.youtube.com/playlist?list=PL1', 'youtube:playlist:PL1'),
+    ('https://example.com/video', 'https://example.com/video'),
+])
+def test_normalize_video_key(url, key):
+    assert normalize_video_key(url) == key
+
+
+def make_cache(tmp_path, **kwargs):
+    return AnalysisCache(str(tmp_path / 'analysis.sqlite3'), **kwargs)
+
+
+def test_round_trip_and_kinds(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put('https://youtu.be/dQw4w9WgXcQ', {'title': 'a', 'formats': [{'format_id': '18'}]})
+    cache.put('https://youtu.be/dQw4w9WgXcQ', {'formats': []}, kind='formats')
+
+    assert cache.get('https://www.youtube.com/watch?v=dQw4w9WgXcQ') == {'title': 'a', 'formats': [{'format_id': '18'}]}
+    assert cache.get('https://youtu.be/dQw4w9WgXcQ', kind='formats') == {'formats': []}
+    cache.invalidate('https://youtu.be/dQw4w9WgXcQ')
+    assert cache.get('https://youtu.be/dQw4w9WgXcQ') is None
+
+
+def test_expired_entries_are_dropped(tmp_path, monkeypatch):
+    cache = make_cache(tmp_path, ttl=60)
+    cache.put('https://example.com/a', {'title': 'a'})
+    now = time.time()
+    monkeypatch.setattr(time, 'time', lambda: now + 61)
+    assert cache.get('https://example.com/a') is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    cache = make_cache(tmp_path, ttl=0, max_entries=2)
+    for name in 'abc':
+        clock[0] += 1
+        if name == 'c':
+            # 'a' was read after 'b' was written, so 'b' is the least recently used
+            cache.get('https://example.com/a')
+            clock[0] += 1
+        cache.put(f"https://example.com/{name}", {'title': name})
+
+    assert cache.get('https://example.com/a') == {'title': 'a'}
+    assert cache.get('https://example.com/b') is None
+    assert cache.get('https://example.com/c') == {'title': 'c'}
+
+
+def test_size_bound_evicts_oldest(tmp_path):
+    cache = make_cache(tmp_path, ttl=0, max_bytes=100)
+    cache.put('https://example.com/a', {'title': 'a' * 60})
+    time.sleep(0.01)
+    cache.put('https://example.com/b', {'title': 'b' * 60})
+    assert cache.get('https://example.com/a') is None
+    assert cache.get('https://example.com/b') is not None
+
+
+def test_non_json_values_are_refused(tmp_path):
+    cache = make_cache(tmp_path)
+    with pytest.raises(TypeError):
+        cache.put('https://example.com/a', {'tags': {'x'}})
+    assert cache.get('https://example.com/a') is None
+
+
+@pytest.mark.parametrize('path', ['video/cached', 'playlist/3'])
+def test_cache_hit_matches_fresh_analysis(fast_site, path):
+    results = []
+    for force_refresh in (True, False):
+        analyzer = Analyzer(f"{fast_site.base_url}/bench/{path}", force_refresh=force_refresh, incremental=False)
+        analyzer.finished.connect(results.append)
+        analyzer.error.connect(pytest.fail)
+        analyzer.run()
+    fresh, cached = results
+    assert cached == fresh
+
+
+@pytest.mark.parametrize('path', ['video/stopped', 'playlist/3'])
+@pytest.mark.parametrize('cached', [False, True])
+def test_stopped_analysis_reports_cancel_instead_of_result(fast_site, path, cached):
+    url = f"{fast_site.base_url}/bench/{path}"
+    if cached:
+        warm = Analyzer(url, incremental=False)
+        warm.error.connect(pytest.fail)
+        warm.run()
+    for incremental in (False, True):
+        analyzer = Analyzer(url, incremental=incremental)
+        results, errors = [], []
+        analyzer.finished.connect(results.append)
+        analyzer.error.connect(errors.append)
+        analyzer.stop()
+        analyzer.run()
+        assert analyzer.cancelled
+        assert results == [] and errors == ["Analysis cancelled"]
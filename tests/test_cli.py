@@ -0,0 +1,42 @@
+import logging
+import os
+
+import pytest
+import yt_dlp.cookies
+
+from unidown import cli
+
+
+@pytest.fixture
+def no_cookie_reads(monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError('browser cookies were read')
+
+    monkeypatch.setattr(yt_dlp.cookies, 'extract_cookies_from_browser', refuse)
+
+
+def test_cookies_are_off_by_default():
+    args = cli.build_parser().parse_args(['analyze', 'https://youtu.be/dQw4w9WgXcQ'])
+    assert args.cookies_from_browser is None
+    args = cli.build_parser().parse_args(['download', '--cookies-from-browser', 'chrome:Work', 'x'])
+    assert args.cookies_from_browser == 'chrome:Work'
+    with pytest.raises(SystemExit):
+        cli.build_parser().parse_args(['download', '--cookies-from-browser', 'firefox', '--no-cookies', 'x'])
+
+
+def test_analyze_and_download_without_cookies(fast_site, tmp_path, capsys, no_cookie_reads):
+    url = f"{fast_site.base_url}/bench/video/cli-1"
+    assert cli.main(['analyze', url]) == 0
+    assert 'Benchmark video cli-1' in capsys.readouterr().out
+
+    assert cli.main(['download', '--no-cookies', '-f', 'best', '-o', str(tmp_path), url]) == 0
+    assert 'Benchmark video cli-1.mp4' in os.listdir(tmp_path)
+
+
+def test_missing_browser_cookies_only_warn(fast_site, tmp_path, caplog):
+    # HOME is an empty folder here (see conftest): there is no Firefox profile to read
+    url = f"{fast_site.base_url}/bench/video/cli-2"
+    with caplog.at_level(logging.WARNING, logger='unidown.cookies'):
+        assert cli.main(['download', '--cookies-from-browser', 'firefox', '-f', 'best', '-o', str(tmp_path), url]) == 0
+    assert 'Could not load firefox cookies' in caplog.text
+    assert 'Benchmark video cli-2.mp4' in os.listdir(tmp_path)
@@ -0,0 +1,71 @@
+import logging
+import os
+import sqlite3
+import time
+
+import pytest
+
+from unidown.cookies import shared_cookie_provider
+from unidown.engine import YoutubeDLCache
+
+
+@pytest.fixture
+def firefox_db(isolated_home):
+    # A Firefox profile with one cookie, where yt-dlp looks for it on Linux
+    profile = isolated_home / '.mozilla' / 'firefox' / 'abc.default'
+    profile.mkdir(parents=True)
+    path = profile / 'cookies.sqlite'
+    with sqlite3.connect(path) as db:
+        db.execute('CREATE TABLE moz_cookies (id INTEGER PRIMARY KEY, originAttributes TEXT, name TEXT, value TEXT, '
+                   'host TEXT, path TEXT, expiry INTEGER, lastAccessed INTEGER, creationTime INTEGER, '
+                   'isSecure INTEGER, isHttpOnly INTEGER)')
+        db.execute("INSERT INTO moz_cookies (originAttributes, name, value, host, path, expiry, isSecure, isHttpOnly) "
+                   "VALUES ('', 'SESSDATA', 'secret', '.bilibili.com', '/', ?, 1, 1)", (int(time.time()) + 3600,))
+    db.close()
+    return path
+
+
+def touch_later(path):
+    later = time.time() + 10
+    os.utime(path, (later, later))
+
+
+def test_no_browser_gives_an_empty_jar(firefox_db):
+    for browser in (None, '', 'none', 'None'):
+        assert len(shared_cookie_provider(browser).get_jar()) == 0
+
+
+def test_missing_database_only_warns(caplog):
+    with caplog.at_level(logging.WARNING, logger='unidown.cookies'):
+        assert len(shared_cookie_provider('firefox').get_jar()) == 0
+    assert 'Could not load firefox cookies' in caplog.text
+
+
+def test_jar_is_shared_until_the_database_changes(firefox_db):
+    provider = shared_cookie_provider('firefox')
+    jar = provider.get_jar()
+    assert [cookie.name for cookie in jar] == ['SESSDATA']
+    assert shared_cookie_provider('firefox') is provider and provider.get_jar() is jar
+
+    touch_later(firefox_db)
+    assert provider.get_jar() is not jar
+
+
+def test_wal_writes_do_not_rebuild_reused_engines(firefox_db):
+    provider = shared_cookie_provider('firefox')
+    cache = YoutubeDLCache()
+    opts = {'quiet': True}
+    ydl = cache.get(opts, provider)
+    assert provider.is_current(ydl)
+
+    # A running Firefox keeps writing its WAL file; the engine stays
+    wal = firefox_db.parent / 'cookies.sqlite-wal'
+    wal.write_bytes(b'\0' * 32)
+    touch_later(wal)
+    assert cache.get(opts, provider) is ydl
+
+    # A checkpoint into the database itself brings the new cookies in
+    touch_later(firefox_db)
+    rebuilt = cache.get(opts, provider)
+    assert rebuilt is not ydl and provider.is_current(rebuilt)
+    cache.close()
@@ -0,0 +1,104 @@
+import os
+import threading
+
+from unidown.engine import BatchDownloader
+from unidown.retry import RetryPolicy
+
+
+def video_items(site, prefix, count):
+    return [{'url': f"{site.base_url}/bench/video/{prefix}-{i}", 'title': f"P{i:02d} {prefix}"}
+            for i in range(1, count + 1)]
+
+
+def test_batch_downloads_every_item_within_worker_bound(fast_site, tmp_path, monkeypatch):
+    fast_site.set_conditions(latency=0.05)
+    running = []
+    peak = []
+    lock = threading.Lock()
+    original = BatchDownloader._download_item
+
+    def tracked(self, *args):
+        with lock:
+            running.append(1)
+            peak.append(len(running))
+        try:
+            return original(self, *args)
+        finally:
+            with lock:
+                running.pop()
+
+    monkeypatch.setattr(BatchDownloader, '_download_item', tracked)
+    errors = []
+    downloader = BatchDownloader(video_items(fast_site, 'pool', 6), str(tmp_path), 'best', max_workers=2)
+    downloader.error.connect(errors.append)
+    downloader.run()
+
+    assert errors == []
+    assert max(peak) == 2
+    assert sorted(name for name in os.listdir(tmp_path) if name.endswith('.mp4')) == [
+        f"P{i:02d} pool.mp4" for i in range(1, 7)]
+
+
+def test_batch_reports_failed_items_and_continues(fast_site, tmp_path):
+    items = video_items(fast_site, 'ok', 2) + [{'url': f"{fast_site.base_url}/missing/video", 'title': 'broken'}]
+    errors = []
+    downloader = BatchDownloader(items, str(tmp_path), 'best', max_workers=2, retry_policy=RetryPolicy(max_attempts=1))
+    downloader.error.connect(errors.append)
+    downloader.run()
+
+    assert len(errors) == 1 and 'video 3' in errors[0]
+    assert os.path.exists(tmp_path / 'P01 ok.mp4') and os.path.exists(tmp_path / 'P02 ok.mp4')
+
+
+def test_progress_bytes_are_counted_once_per_item(fast_site, tmp_path, monkeypatch):
+    throttled = []
+    monkeypatch.setattr(BatchDownloader, '_throttle_bytes', lambda self, nbytes: throttled.append(nbytes))
+    downloader = BatchDownloader(video_items(fast_site, 'bytes', 1), str(tmp_path), 'best')
+
+    def report(downloaded):
+        downloader._progress_hook({'status': 'downloading', 'tmpfilename': 'a.part', 'downloaded_bytes': downloaded,
+                                   'info_dict': {'unidown_index': 1}})
+
+    for downloaded in (100, 300, 50, 80):
+        report(downloaded)
+    # The drop to 50 is a stream that started over; its bytes count from there
+    assert throttled == [100, 200, 0, 30]
+
+    downloader._transferred.clear()
+    throttled.clear()
+    downloader.run()
+    assert sum(throttled) == 64 * 1024
+    assert downloader._transferred == {}
+    assert downloader._throttle._last == {}
+
+
+def test_deferred_postprocessing_runs_on_its_own_engine(fast_site, tmp_path, monkeypatch):
+    from yt_dlp.postprocessor.common import PostProcessor
+
+    from unidown.transfer import TransferYoutubeDL
+
+    runs = []
+
+    class RecordingPP(PostProcessor):
+        # Stands in for the stream merger yt-dlp attaches to items with separate streams
+        def run(self, info):
+            runs.append((self._downloader, threading.current_thread().name, info['unidown_index']))
+            return [], info
+
+    downloading = {}
+    original = TransferYoutubeDL.post_process
+
+    def post_process(self, filename, info, files_to_move=None):
+        downloading[info['unidown_index']] = self
+        info.setdefault('__postprocessors', []).append(RecordingPP(self))
+        return original(self, filename, info, files_to_move)
+
+    monkeypatch.setattr(TransferYoutubeDL, 'post_process', post_process)
+    downloader = BatchDownloader(video_items(fast_site, 'pp', 3), str(tmp_path), 'best', max_workers=2)
+    downloader.run()
+
+    assert sorted(index for _, _, index in runs) == [1, 2, 3]
+    for ydl, thread_name, index in runs:
+        assert ydl is not downloading[index]
+        assert thread_name.startswith('unidown-postprocess')
+    assert downloader.completed_videos == 3
@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from unidown.engine import Notifier
+from unidown.jobqueue import DONE, POSTPROCESSING, PRIORITY, SHORTEST_FIRST, SPARE_JOB_THREADS, JobQueue
+
+
+class FakeBatch:
+    # The part of BatchDownloader the queue drives; run_item records the order items start in
+
+    def __init__(self, name, items, log, run=None):
+        self.name = name
+        self.urls = [dict(item, title=f"{name}{i}") for i, item in enumerate(items, 1)]
+        self.progress_data = Notifier()
+        self.cancelled = False
+        self.finished = threading.Event()
+        self._log = log
+        self._run = run
+
+    def start(self, queue):
+        self.queue = queue
+
+    def run_item(self, index):
+        self._log.append(self.urls[index - 1]['title'])
+        if self._run:
+            return self._run(self, index)
+        return DONE, None
+
+    def finish(self):
+        self.finished.set()
+
+    def stop(self, keep_partial=False):
+        self.cancelled = True
+
+
+@pytest.fixture
+def queue():
+    queue = JobQueue(1)
+    yield queue
+    queue.shutdown()
+
+
+def run_behind_blocker(queue, batches):
+    # Holds the only slot until every batch is queued, so the policy alone decides the order
+    log = batches[0][0]._log
+    release = threading.Event()
+    blocker = FakeBatch('blocker', [{}], log, run=lambda batch, index: (release.wait(5), (DONE, None))[1])
+    queue.submit(blocker)
+    for batch, priority in batches:
+        queue.submit(batch, priority=priority)
+    release.set()
+    for batch, _ in batches:
+        assert batch.finished.wait(5)
+    return [title for title in log if title != 'blocker1']
+
+
+def test_fifo_runs_items_in_submit_order(queue):
+    log = []
+    first, second = FakeBatch('a', [{}, {}], log), FakeBatch('b', [{}, {}], log)
+    queue.submit(first)
+    queue.submit(second)
+    assert first.finished.wait(5) and second.finished.wait(5)
+    assert log == ['a1', 'a2', 'b1', 'b2']
+
+
+def test_priority_runs_higher_priority_batches_first(queue):
+    queue.set_policy(PRIORITY)
+    log = []
+    low, high = FakeBatch('low', [{}, {}], log), FakeBatch('high', [{}, {}], log)
+    order = run_behind_blocker(queue, [(low, 0), (high, 5)])
+    assert order == ['high1', 'high2', 'low1', 'low2']
+
+
+def test_shortest_first_orders_by_duration_unknown_last(queue):
+    queue.set_policy(SHORTEST_FIRST)
+    log = []
+    batch = FakeBatch('v', [{'duration': 30}, {}, {'duration': 10}, {'duration': 20}], log)
+    assert run_behind_blocker(queue, [(batch, 0)]) == ['v3', 'v4', 'v1', 'v2']
+
+
+def test_unknown_policy_is_rejected(queue):
+    with pytest.raises(ValueError):
+        queue.set_policy('random')
+
+
+def test_stage_outcome_of_a_merge_finished_before_the_slot_was_freed(queue):
+    def merge_inline(batch, index):
+        # The post-processing stage reports back while run_item has not returned yet
+        batch.queue.stage_finished(batch, index, DONE)
+        return POSTPROCESSING, None
+
+    batch = FakeBatch('m', [{}], [], run=merge_inline)
+    [job] = queue.submit(batch)
+    assert batch.finished.wait(5)
+    assert job.state == DONE and job.stage_outcome is None
+
+
+def test_postprocessing_job_frees_its_slot_until_the_stage_reports(queue):
+    log = []
+    merging = FakeBatch('m', [{}], log, run=lambda batch, index: (POSTPROCESSING, None))
+    other = FakeBatch('o', [{}], log)
+    [job] = queue.submit(merging)
+    queue.submit(other)
+
+    assert other.finished.wait(5)
+    assert job.state == POSTPROCESSING and not merging.finished.is_set()
+    queue.stage_finished(merging, 1, DONE)
+    assert merging.finished.wait(5) and job.state == DONE
+
+
+def test_pool_follows_max_workers():
+    queue = JobQueue(3)
+    try:
+        assert queue._pool_size == 3 + SPARE_JOB_THREADS
+        queue.set_max_workers(8)
+        assert queue.max_workers == 8 and queue._pool_size == 8 + SPARE_JOB_THREADS
+
+        # All eight slots are usable once the limit was raised
+        running = threading.Semaphore(0)
+        release = threading.Event()
+
+        def hold(batch, index):
+            running.release()
+            release.wait(5)
+            return DONE, None
+
+        batch = FakeBatch('p', [{}] * 8, [], run=hold)
+        queue.submit(batch)
+        for _ in range(8):
+            assert running.acquire(timeout=5)
+        release.set()
+        assert batch.finished.wait(5)
+    finally:
+        queue.shutdown()
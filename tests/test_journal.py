@@ -0,0 +1,53 @@
+import os
+
+from unidown.engine import BatchDownloader
+from unidown.journal import DONE, FAILED, IN_PROGRESS, PENDING, BatchJournal
+from unidown.retry import RetryPolicy
+
+
+def test_journal_records_item_states(tmp_path):
+    items = [{'url': 'https://youtu.be/aaaaaaaaaaa', 'title': 'a'}, {'url': 'https://youtu.be/bbbbbbbbbbb', 'title': 'b'}]
+    journal = BatchJournal.create(items, str(tmp_path), 'best', playlist_title='list', platform='YouTube')
+    assert [item['state'] for item in journal.items] == [PENDING, PENDING]
+
+    journal.set_state(1, DONE)
+    journal.set_state(2, FAILED, 'HTTP Error 404')
+    reloaded = BatchJournal.load(journal.path)
+    assert reloaded.data['path'] == str(tmp_path) and reloaded.data['playlist_title'] == 'list'
+    assert reloaded.is_done(1) and not reloaded.is_done(2)
+    assert reloaded.items[1]['error'] == 'HTTP Error 404' and reloaded.remaining() == 1
+
+    journal.set_state(2, IN_PROGRESS)
+    assert 'error' not in BatchJournal.load(journal.path).items[1]
+
+
+def test_list_unfinished_skips_finished_and_corrupt_journals(tmp_path):
+    items = [{'url': 'https://youtu.be/aaaaaaaaaaa', 'title': 'a'}]
+    unfinished = BatchJournal.create(items, str(tmp_path), 'best')
+    finished = BatchJournal.create(items, str(tmp_path), 'best')
+    finished.set_state(1, DONE)
+    with open(os.path.join(os.path.dirname(finished.path), 'broken.json'), 'w') as f:
+        f.write('{')
+
+    assert [journal.path for journal in BatchJournal.list_unfinished()] == [unfinished.path]
+    unfinished.discard()
+    assert BatchJournal.list_unfinished() == []
+
+
+def test_finished_batch_discards_its_journal(fast_site, tmp_path):
+    items = [{'url': f"{fast_site.base_url}/bench/video/jr-{i}", 'title': f"P{i:02d} jr"} for i in (1, 2)]
+    journal = BatchJournal.create(items, str(tmp_path), 'best')
+    BatchDownloader(items, str(tmp_path), 'best', journal=journal).run()
+
+    assert not os.path.exists(journal.path)
+
+
+def test_batch_with_failures_keeps_journal_for_resume(fast_site, tmp_path):
+    items = [{'url': f"{fast_site.base_url}/bench/video/jr-ok", 'title': 'P01 ok'},
+             {'url': f"{fast_site.base_url}/missing/video", 'title': 'P02 broken'}]
+    journal = BatchJournal.create(items, str(tmp_path), 'best')
+    BatchDownloader(items, str(tmp_path), 'best', journal=journal, retry_policy=RetryPolicy(max_attempts=1)).run()
+
+    [kept] = BatchJournal.list_unfinished()
+    assert kept.path == journal.path
+    assert [item['state'] for item in kept.items] == [DONE, FAILED]
@@ -0,0 +1,105 @@
+import errno
+import os
+import shutil
+
+import pytest
+
+from unidown.engine import BatchDownloader
+from unidown.library import ContentIndex
+
+KEY = ('youtube', 'abc123', '22')
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ContentIndex(str(tmp_path / 'library.sqlite3'))
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / 'first' / 'video.mp4'
+    path.parent.mkdir()
+    path.write_bytes(b'x' * 4096)
+    return path
+
+
+@pytest.mark.parametrize('info, key', [
+    ({'extractor_key': 'Youtube', 'id': 'abc123', 'format_id': '22'}, KEY),
+    ({'extractor': 'generic', 'id': 'clip', 'format_id': '0', 'webpage_url': 'https://a.example/clip'},
+     ('generic', 'https://a.example/clip', '0')),
+    ({'extractor_key': 'Youtube', 'id': 'abc123'}, None),
+])
+def test_key(info, key):
+    assert ContentIndex.key(info) == key
+
+
+def test_known_copy_is_hardlinked(index, source, tmp_path):
+    index.add(KEY, str(source))
+    target = tmp_path / 'second' / 'video.mp4'
+    assert index.link_existing(KEY, str(target)) == str(source)
+    assert os.path.samefile(source, target)
+    # The new copy is known too, so it can stand in once the first one is gone
+    source.unlink()
+    assert index.find(KEY) == str(target)
+
+
+@pytest.mark.parametrize('code', [errno.EXDEV, errno.EPERM])
+def test_copy_when_hardlinking_fails(index, source, tmp_path, monkeypatch, code):
+    def refuse(src, dst):
+        raise OSError(code, os.strerror(code))
+
+    monkeypatch.setattr(os, 'link', refuse)
+    index.add(KEY, str(source))
+    target = tmp_path / 'second' / 'video.mp4'
+    assert index.link_existing(KEY, str(target)) == str(source)
+    assert not os.path.samefile(source, target)
+    assert target.read_bytes() == source.read_bytes()
+
+
+def test_failed_copy_leaves_no_partial_file(index, source, tmp_path, monkeypatch):
+    def refuse(src, dst):
+        raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+    def copy_fails(src, dst):
+        with open(dst, 'wb') as f:
+            f.write(b'x')
+        raise OSError(errno.ENOSPC, os.strerror(errno.ENOSPC))
+
+    monkeypatch.setattr(os, 'link', refuse)
+    monkeypatch.setattr(shutil, 'copy2', copy_fails)
+    index.add(KEY, str(source))
+    target = tmp_path / 'second' / 'video.mp4'
+    with pytest.raises(OSError):
+        index.link_existing(KEY, str(target))
+    assert not target.exists()
+
+
+@pytest.mark.parametrize('change', ['removed', 'rewritten'])
+def test_stale_rows_are_pruned(index, source, tmp_path, change):
+    index.add(KEY, str(source))
+    if change == 'removed':
+        source.unlink()
+    else:
+        source.write_bytes(b'y')
+    assert index.link_existing(KEY, str(tmp_path / 'second' / 'video.mp4')) is None
+    assert not (tmp_path / 'second').exists()
+    rows = index._conn.execute('SELECT COUNT(*) FROM content').fetchone()[0]
+    assert rows == 0
+
+
+def test_same_path_is_not_linked_onto_itself(index, source):
+    index.add(KEY, str(source))
+    assert index.link_existing(KEY, str(source)) is None
+    assert source.exists()
+
+
+def test_second_folder_links_instead_of_downloading(fast_site, tmp_path):
+    items = [{'url': f"{fast_site.base_url}/bench/video/shared", 'title': 'Shared'}]
+    first = BatchDownloader(items, str(tmp_path / 'a'), 'best')
+    first.run()
+    second = BatchDownloader(items, str(tmp_path / 'b'), 'best')
+    second.run()
+    assert (first.completed_videos, first.linked_videos) == (1, 0)
+    assert (second.completed_videos, second.linked_videos) == (1, 1)
+    (downloaded,) = [name for name in os.listdir(tmp_path / 'a') if not name.startswith('.')]
+    assert os.path.samefile(tmp_path / 'a' / downloaded, tmp_path / 'b' / downloaded)
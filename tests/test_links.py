@@ -0,0 +1,51 @@
+import pytest
+
+from unidown.links import extract_urls
+
+
+@pytest.mark.parametrize('text, urls', [
+    ('https://www.bilibili.com/video/BV1xx411c7mD?p=3&spm_id_from=333.788',
+     ['https://www.bilibili.com/video/BV1xx411c7mD?p=3']),
+    ('https://m.bilibili.com/video/BV1xx411c7mD/?spm=x&p=2', ['https://m.bilibili.com/video/BV1xx411c7mD/?p=2']),
+    ('https://www.bilibili.com/video/av170001?share_source=copy', ['https://www.bilibili.com/video/av170001']),
+    ('https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123&index=2&pp=abc',
+     ['https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL123']),
+    ('https://www.youtube.com/watch?feature=share&v=dQw4w9WgXcQ&t=10s', ['https://www.youtube.com/watch?v=dQw4w9WgXcQ']),
+    ('https://youtu.be/dQw4w9WgXcQ?list=PLx&si=tracking', ['https://youtu.be/dQw4w9WgXcQ?list=PLx']),
+    ('https://www.youtube.com/shorts/dQw4w9WgXcQ?feature=share', ['https://www.youtube.com/shorts/dQw4w9WgXcQ']),
+    ('https://www.youtube.com/playlist?list=PL999&si=zz', ['https://www.youtube.com/playlist?list=PL999']),
+    ('https://b23.tv/abc123', ['https://b23.tv/abc123']),
+    ('https://example.com/watch?id=5', ['https://example.com/watch?id=5']),
+])
+def test_extract_urls_keeps_only_meaningful_query_parameters(text, urls):
+    assert extract_urls(text) == urls
+
+
+def test_extract_urls_from_free_text():
+    text = ('看这个 https://www.bilibili.com/video/BV1xx411c7mD?p=3。还有 BV1yy411c7mD, '
+            'and (https://youtu.be/dQw4w9WgXcQ). Also https://example.com/a?b=c.')
+    assert extract_urls(text) == [
+        'https://www.bilibili.com/video/BV1xx411c7mD?p=3',
+        'https://www.bilibili.com/video/BV1yy411c7mD',
+        'https://youtu.be/dQw4w9WgXcQ',
+        'https://example.com/a?b=c',
+    ]
+
+
+def test_extract_urls_drops_duplicates_but_not_other_pages():
+    text = '\n'.join([
+        'https://www.bilibili.com/video/BV1xx411c7mD',
+        'BV1xx411c7mD',
+        'https://m.bilibili.com/video/BV1xx411c7mD?p=1',
+        'https://www.bilibili.com/video/BV1xx411c7mD?p=2',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://youtu.be/dQw4w9WgXcQ?t=42',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1',
+    ])
+    assert extract_urls(text) == [
+        'https://www.bilibili.com/video/BV1xx411c7mD',
+        'https://www.bilibili.com/video/BV1xx411c7mD?p=2',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+        'https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL1',
+    ]
+    assert extract_urls('') == [] and extract_urls(None) == []
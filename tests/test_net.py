@@ -0,0 +1,20 @@
+from unidown import cli
+from unidown.net import close_sessions, get_session
+
+
+def test_sessions_are_shared_per_proxy_and_closed_on_exit(monkeypatch):
+    session = get_session()
+    assert get_session() is session and get_session('http://127.0.0.1:9') is not session
+    closed = []
+    monkeypatch.setattr(type(session), 'close', lambda self: closed.append(self))
+
+    close_sessions()
+    assert session in closed and len(closed) == 2
+    assert get_session() is not session
+
+
+def test_command_line_closes_sessions(fast_site, monkeypatch):
+    calls = []
+    monkeypatch.setattr('unidown.net.close_sessions', lambda: calls.append(True))
+    assert cli.main(['analyze', f"{fast_site.base_url}/bench/video/net-1"]) == 0
+    assert calls == [True]
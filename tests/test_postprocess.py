@@ -0,0 +1,24 @@
+import threading
+
+from unidown.postprocess import PostProcessPool
+
+
+def test_wait_idle_returns_once_every_task_is_through():
+    pool = PostProcessPool(max_workers=2)
+    release = threading.Event()
+    for _ in range(3):
+        pool.submit(release.wait)
+    assert pool.pending() == 3
+    assert not pool.wait_idle(0.05)
+    release.set()
+    assert pool.wait_idle(5)
+    assert pool.pending() == 0
+    pool.shutdown()
+
+
+def test_crashed_task_still_counts_as_through():
+    pool = PostProcessPool(max_workers=1)
+    pool.submit(lambda: 1 / 0)
+    assert pool.wait_idle(5)
+    assert pool.pending() == 0
+    pool.shutdown()
@@ -0,0 +1,73 @@
+import pytest
+
+from unidown import engine
+from unidown.engine import BatchDownloader
+from unidown.preflight import (SPACE_MARGIN, InsufficientSpaceError, bytes_on_disk, check_space, download_size,
+                               entry_size, estimate_batch, required_space)
+
+KB = 1024
+FORMATS = [
+    {'format_id': 'v', 'vcodec': 'avc1', 'acodec': 'none', 'filesize': 800 * KB},
+    {'format_id': 'muxed', 'vcodec': 'avc1', 'acodec': 'mp4a', 'tbr': 80},
+    {'format_id': 'a-lo', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 64, 'filesize': 50 * KB},
+    {'format_id': 'a-hi', 'vcodec': 'none', 'acodec': 'mp4a', 'abr': 128, 'filesize': 100 * KB},
+]
+
+
+def test_entry_size():
+    # Video-only picks get the best audio added, as the download will merge it
+    assert entry_size(FORMATS, chosen={'format_id': 'v'}) == 900 * KB
+    assert entry_size(FORMATS, chosen={'format_id': 'v'}, merge_audio=False) == 800 * KB
+    # 80 kbps for 100 s
+    assert entry_size(FORMATS, duration=100, chosen={'format_id': 'muxed'}) == 1_000_000
+    assert entry_size(FORMATS, chosen={'format_id': 'muxed'}) is None
+    assert entry_size(FORMATS, profile={'audio_only': True}) == 100 * KB
+
+
+def test_download_size():
+    assert download_size({'requested_formats': [FORMATS[0], FORMATS[3]]}) == 900 * KB
+    assert download_size({'filesize': 5 * KB}) == 5 * KB
+    assert download_size({'tbr': 80, 'duration': 100}) == 1_000_000
+    assert download_size({'requested_formats': [FORMATS[0], FORMATS[1]]}) is None
+
+
+def test_estimate_batch_extrapolates_unknown_entries():
+    estimate = estimate_batch([100, None, 300, None])
+    assert estimate == {'entries': 4, 'known': 2, 'unknown': 2, 'measured_bytes': 400, 'total_bytes': 800,
+                        'largest_bytes': 300}
+    assert required_space(estimate) == 800 + 300 + SPACE_MARGIN
+    assert estimate_batch([None])['total_bytes'] == 0
+
+
+def test_check_space(tmp_path, monkeypatch):
+    estimate = estimate_batch([100 * KB])
+    monkeypatch.setattr('unidown.preflight.free_space', lambda path: required_space(estimate))
+    assert check_space(str(tmp_path), estimate) == (required_space(estimate), True)
+    monkeypatch.setattr('unidown.preflight.free_space', lambda path: required_space(estimate) - 1)
+    assert check_space(str(tmp_path), estimate)[1] is False
+    assert check_space(str(tmp_path), estimate_batch([None])) == (required_space(estimate) - 1, None)
+
+
+def test_bytes_on_disk_counts_finished_streams_and_part_files(tmp_path):
+    (tmp_path / 'a.f1.mp4').write_bytes(b'x' * 64 * KB)
+    (tmp_path / 'a.f2.m4a.part').write_bytes(b'x' * 32 * KB)
+    with open(tmp_path / 'sparse.mp4.part', 'wb') as f:
+        f.truncate(10 * 1024 * KB)
+    assert bytes_on_disk([str(tmp_path / 'a.f1.mp4'), str(tmp_path / 'a.f2.m4a')]) >= 96 * KB
+    # A sparse file holds none of its length yet
+    assert bytes_on_disk([str(tmp_path / 'sparse.mp4')]) < 1024 * KB
+    assert bytes_on_disk([str(tmp_path / 'missing.mp4')]) == 0
+
+
+def test_running_items_reserve_only_what_they_have_not_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine, 'free_space', lambda path: SPACE_MARGIN + 300 * KB)
+    downloader = BatchDownloader([{'url': 'https://youtu.be/aaaaaaaaaaa', 'title': 'a'}], str(tmp_path), 'best')
+    # Item 1 is running: 200 KB estimated, 150 KB of it already written (and so already out of free)
+    (tmp_path / 'a.mp4.part').write_bytes(b'x' * 150 * KB)
+    downloader._reserved[1] = 200 * KB
+    downloader._written_files[1] = {str(tmp_path / 'a.mp4')}
+
+    downloader._check_space({'unidown_index': 2, 'filesize': 200 * KB})
+    assert downloader._reserved[2] == 200 * KB
+    with pytest.raises(InsufficientSpaceError):
+        downloader._check_space({'unidown_index': 3, 'filesize': 100 * KB})
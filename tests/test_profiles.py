@@ -0,0 +1,96 @@
+import pytest
+
+from unidown.profiles import (BUILTIN_PROFILES, ProfileStore, choose_formats, describe_profile, parse_profile,
+                              profile_format_spec)
+
+MB = 1024 ** 2
+
+
+def video(format_id, height, vcodec='avc1.640028', fps=30, ext='mp4', size=None, tbr=None):
+    return {'format_id': format_id, 'height': height, 'vcodec': vcodec, 'acodec': 'none', 'fps': fps, 'ext': ext,
+            'filesize': size, 'tbr': tbr}
+
+
+def audio(format_id, abr, ext='m4a', size=None):
+    return {'format_id': format_id, 'vcodec': 'none', 'acodec': 'mp4a.40.2', 'abr': abr, 'ext': ext, 'filesize': size}
+
+
+FORMATS = [
+    video('2160-vp9', 2160, 'vp09.00.50.08', size=900 * MB),
+    video('1080-avc', 1080, size=300 * MB),
+    video('1080-av1', 1080, 'av01.0.08M.08', size=200 * MB),
+    video('1080-avc60', 1080, fps=60, size=450 * MB),
+    video('720-avc', 720, size=120 * MB),
+    audio('a-64', 64, size=5 * MB),
+    audio('a-128', 128, size=10 * MB),
+    audio('a-opus', 160, ext='webm', size=12 * MB),
+    {'format_id': 'sb0', 'ext': 'mhtml', 'vcodec': 'none', 'acodec': 'none'},
+]
+
+
+def test_parse_profile_rules():
+    profile = parse_profile('height<=1080p, fps<=30, codec=AVC, ext=mp4, abr>=128, size<=1.5G')
+    assert profile == {'name': 'height<=1080p, fps<=30, codec=AVC, ext=mp4, abr>=128, size<=1.5G', 'max_height': 1080,
+                       'max_fps': 30, 'vcodec': 'avc', 'ext': 'mp4', 'min_abr': 128, 'max_size': int(1.5 * 1024 ** 3)}
+    assert parse_profile('audio', name='Music') == {'name': 'Music', 'audio_only': True}
+
+
+@pytest.mark.parametrize('text', ['height>=1080', 'codec=h263', 'size<=lots', 'resolution', 'bitrate=5'])
+def test_parse_profile_rejects_bad_rules(text):
+    with pytest.raises(ValueError):
+        parse_profile(text)
+
+
+def test_describe_profile():
+    assert describe_profile(BUILTIN_PROFILES[1]) == '≤1080p, prefer AVC, audio ≥128 kbps, cap 2 GB'
+    assert describe_profile({'audio_only': True, 'max_size': 500 * MB}) == 'audio only, cap 500 MB'
+
+
+@pytest.mark.parametrize('rules, spec', [
+    ('', '2160-vp9+a-opus'),
+    ('height<=1080', '1080-avc60+a-opus'),
+    ('height<=1080,fps<=30,codec=av1', '1080-av1+a-opus'),
+    ('height<=1080,fps<=30,codec=avc,ext=mp4', '1080-avc+a-128'),
+    ('height<=1080,codec=avc,size<=200M', '720-avc+a-opus'),
+    ('height<=480', '720-avc+a-opus'),
+    ('audio,abr>=128', 'a-opus'),
+])
+def test_profile_format_spec(rules, spec):
+    assert profile_format_spec(FORMATS, parse_profile(rules)) == spec
+
+
+def test_size_cap_uses_bitrate_and_falls_back_to_the_smallest():
+    formats = [video('hi', 1080, tbr=4000), video('lo', 480, tbr=1000), audio('a', 128)]
+    # 60 s: 30 MB at 4000 kbps, 7.5 MB at 1000 kbps; the audio size is unknown
+    assert choose_formats(formats, {'max_size': 10 * MB}, duration=60)[0]['format_id'] == 'hi'
+    formats[2]['filesize'] = MB
+    assert choose_formats(formats, {'max_size': 10 * MB}, duration=60)[0]['format_id'] == 'lo'
+    assert choose_formats(formats, {'max_size': MB}, duration=60)[0]['format_id'] == 'lo'
+
+
+def test_audio_only_without_separate_audio_takes_the_smallest_muxed_format():
+    muxed = [dict(video('big', 720, size=80 * MB), acodec='mp4a'), dict(video('small', 360, size=20 * MB), acodec='mp4a')]
+    assert choose_formats(muxed, {'audio_only': True}) == (muxed[1], None)
+    assert profile_format_spec([], {}) is None
+
+
+def test_store_starts_with_builtins_and_edits_in_place(tmp_path):
+    store = ProfileStore(str(tmp_path / 'profiles.json'))
+    assert [p['name'] for p in store.load()] == [p['name'] for p in BUILTIN_PROFILES]
+
+    store.save_profile({'name': 'Phone', 'max_height': 480})
+    store.save_profile({'name': 'Tablet', 'max_height': 720}, replace='720p data saver')
+    assert [p['name'] for p in store.load()] == ['Best quality', '1080p AVC, 2 GB cap', 'Tablet', 'Audio only', 'Phone']
+    # Renamed onto an existing name: the edited profile stays where it was, the other one goes
+    store.save_profile({'name': 'Tablet', 'max_height': 1080}, replace='Phone')
+    assert [p['name'] for p in store.load()] == ['Best quality', '1080p AVC, 2 GB cap', 'Audio only', 'Tablet']
+    assert store.get('Tablet') == {'name': 'Tablet', 'max_height': 1080}
+
+    store.delete('Tablet')
+    assert store.get('Tablet') is None and len(ProfileStore(store.path).load()) == 3
+
+
+def test_store_ignores_a_corrupt_file(tmp_path):
+    path = tmp_path / 'profiles.json'
+    path.write_text('{"name": "not a list"}')
+    assert ProfileStore(str(path)).load() == [dict(p) for p in BUILTIN_PROFILES]
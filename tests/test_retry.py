@@ -0,0 +1,78 @@
+import socket
+
+import pytest
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import DownloadError, ExtractorError, UnsupportedError
+
+from unidown.engine import BatchDownloader
+from unidown.retry import PERMANENT, TRANSIENT, RetryPolicy, classify_error
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.reason = 'reason'
+        self.headers = {}
+
+    def close(self):
+        pass
+
+
+def wrapped(error):
+    # What YoutubeDL.download raises: the original error hangs off exc_info
+    return DownloadError(f"ERROR: {error}", exc_info=(type(error), error, None))
+
+
+@pytest.mark.parametrize('error, kind', [
+    (HTTPError(FakeResponse(503)), TRANSIENT),
+    (HTTPError(FakeResponse(429)), TRANSIENT),
+    (HTTPError(FakeResponse(404)), PERMANENT),
+    (TransportError('connection reset'), TRANSIENT),
+    (socket.timeout('timed out'), TRANSIENT),
+    (UnsupportedError('https://example.com/x'), PERMANENT),
+    (ExtractorError('Private video', expected=True), PERMANENT),
+    (ExtractorError('Read timed out', expected=True), TRANSIENT),
+    (Exception('HTTP Error 502: Bad Gateway'), TRANSIENT),
+    (Exception('Video unavailable'), PERMANENT),
+    (Exception('something odd'), PERMANENT),
+])
+def test_classify_error(error, kind):
+    assert classify_error(error) == kind
+    assert classify_error(wrapped(error)) == kind
+
+
+def test_should_retry_only_transient_errors_within_attempts():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.should_retry(1, TRANSIENT) and policy.should_retry(2, TRANSIENT)
+    assert not policy.should_retry(3, TRANSIENT)
+    assert not policy.should_retry(1, PERMANENT)
+
+
+def test_delay_backs_off_exponentially_within_jitter():
+    policy = RetryPolicy(base_delay=2.0, max_delay=10.0, jitter=0.5)
+    for attempt, expected in ((1, 2.0), (2, 4.0), (3, 8.0), (4, 10.0), (8, 10.0)):
+        for _ in range(50):
+            assert expected * 0.5 <= policy.delay(attempt) <= expected * 1.5
+    assert RetryPolicy(base_delay=1.0, jitter=0).delay(3) == 4.0
+
+
+def test_batch_retries_transient_failures(fast_site, tmp_path, monkeypatch):
+    original = BatchDownloader._download_item
+    calls = []
+
+    def flaky(self, index, item_data, opts):
+        calls.append(index)
+        if len(calls) == 1:
+            raise TransportError('connection reset by peer')
+        return original(self, index, item_data, opts)
+
+    monkeypatch.setattr(BatchDownloader, '_download_item', flaky)
+    items = [{'url': f"{fast_site.base_url}/bench/video/retry-1", 'title': 'P01 retry'}]
+    errors = []
+    downloader = BatchDownloader(items, str(tmp_path), 'best', retry_policy=RetryPolicy(base_delay=0.01, jitter=0))
+    downloader.error.connect(errors.append)
+    downloader.run()
+
+    assert calls == [1, 1]
+    assert errors == [] and downloader.attempts[1] == 2
+    assert (tmp_path / 'P01 retry.mp4').exists()
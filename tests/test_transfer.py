@@ -0,0 +1,100 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.fakesite import media_bytes
+from unidown.transfer import MIN_SEGMENT_SIZE, SEGMENTS_SUFFIX, SegmentedHttpFD, TransferYoutubeDL, transfer_options
+
+SIZE = 4 * MIN_SEGMENT_SIZE
+
+
+@pytest.fixture
+def big_site(fast_site):
+    fast_site.set_conditions(video_size=SIZE)
+    yield fast_site
+    fast_site.set_conditions(ranges=True)
+
+
+@pytest.fixture
+def fetched(monkeypatch):
+    # Byte ranges requested by SegmentedHttpFD, in the order they were started
+    chunks = []
+    original = SegmentedHttpFD._fetch_chunk
+
+    def tracked(self, url, headers, chunk, *args, **kwargs):
+        chunks.append(chunk)
+        return original(self, url, headers, chunk, *args, **kwargs)
+
+    monkeypatch.setattr(SegmentedHttpFD, '_fetch_chunk', tracked)
+    return chunks
+
+
+def download(site, tmp_path, video_id, connections=4):
+    opts = {'outtmpl': f'{tmp_path}/%(id)s.%(ext)s', 'format': '1080p', 'quiet': True, 'noprogress': True,
+            **transfer_options(connections)}
+    with TransferYoutubeDL(opts) as ydl:
+        assert ydl.download([f"{site.base_url}/bench/video/{video_id}"]) == 0
+    return tmp_path / f'{video_id}.mp4'
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_range_segments_reassemble_byte_for_byte(big_site, tmp_path, fetched):
+    path = download(big_site, tmp_path, 'split')
+
+    assert sorted(fetched) == [(start, start + MIN_SEGMENT_SIZE - 1) for start in range(0, SIZE, MIN_SEGMENT_SIZE)]
+    assert read(path) == media_bytes(0, SIZE)
+    assert not os.path.exists(f'{path}.part{SEGMENTS_SUFFIX}')
+
+
+def test_resume_fetches_only_missing_segments(big_site, tmp_path, fetched):
+    # State left by an interrupted run: segments 0 and 2 written, the rest still garbage
+    part = tmp_path / 'resumed.mp4.part'
+    data = bytearray(b'\xff' * SIZE)
+    for i in (0, 2):
+        start = i * MIN_SEGMENT_SIZE
+        data[start:start + MIN_SEGMENT_SIZE] = media_bytes(start, MIN_SEGMENT_SIZE)
+    part.write_bytes(bytes(data))
+    with open(f'{part}{SEGMENTS_SUFFIX}', 'w') as f:
+        json.dump({'total': SIZE, 'chunk_size': MIN_SEGMENT_SIZE, 'done': [0, 2]}, f)
+
+    path = download(big_site, tmp_path, 'resumed')
+
+    assert sorted(fetched) == [(MIN_SEGMENT_SIZE, 2 * MIN_SEGMENT_SIZE - 1), (3 * MIN_SEGMENT_SIZE, SIZE - 1)]
+    assert read(path) == media_bytes(0, SIZE)
+    assert not os.path.exists(f'{part}{SEGMENTS_SUFFIX}')
+
+
+def test_falls_back_when_server_ignores_range(big_site, tmp_path, fetched):
+    big_site.set_conditions(ranges=False)
+    path = download(big_site, tmp_path, 'norange')
+
+    assert fetched == []
+    assert read(path) == media_bytes(0, SIZE)
+
+
+def test_falls_back_to_continue_a_plain_part_file(big_site, tmp_path, fetched):
+    # A .part without a segments record was written by yt-dlp's own downloader, which continues
+    # it: the bytes already there are kept as they are
+    written = MIN_SEGMENT_SIZE + 123
+    (tmp_path / 'plain.mp4.part').write_bytes(b'\xee' * written)
+    path = download(big_site, tmp_path, 'plain')
+
+    assert fetched == []
+    assert read(path) == b'\xee' * written + media_bytes(written, SIZE - written)
+
+
+def test_stale_segments_record_without_part_file_starts_over(big_site, tmp_path, fetched):
+    # The .part was deleted (or never written) after the segments record was saved
+    with open(tmp_path / f'stale.mp4.part{SEGMENTS_SUFFIX}', 'w') as f:
+        json.dump({'total': SIZE, 'chunk_size': MIN_SEGMENT_SIZE, 'done': [0, 1]}, f)
+
+    path = download(big_site, tmp_path, 'stale')
+
+    assert len(fetched) == SIZE // MIN_SEGMENT_SIZE
+    assert read(path) == media_bytes(0, SIZE)
+    assert not os.path.exists(f'{path}.part{SEGMENTS_SUFFIX}')
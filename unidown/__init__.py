@@ -0,0 +1 @@
+# Non-GUI helpers shared by the UniDown front-ends
@@ -0,0 +1,65 @@
+import os
+import re
+import threading
+
+from .cache import normalize_video_key
+
+ARCHIVE_NAME = '.unidown-archive.txt'
+# yt-dlp's Bilibili ids: the video ID, with _pN for pages of multi-part videos
+BILIBILI_ID = re.compile(r'(BV[a-zA-Z0-9]{10}|av[0-9]+)(?:_p(\d+))?')
+
+
+def item_archive_key(item):
+    # (extractor, video id) for a download item; URL-derived where the URL identifies the video.
+    # Bilibili keys always name the page (BVxxx_p1), however the item was found
+    key = normalize_video_key(item.get('url'))
+    if key.startswith('bilibili:'):
+        _, video_id, page = key.split(':', 2)
+        return 'bilibili', f"{video_id}_{page}"
+    if key.startswith('youtube:') and not key.startswith('youtube:playlist:'):
+        return 'youtube', key.split(':')[1]
+    if item.get('ie_key') and item.get('id'):
+        extractor, video_id = item['ie_key'].lower(), str(item['id'])
+        match = BILIBILI_ID.fullmatch(video_id)
+        if extractor == 'bilibili' and match:
+            return 'bilibili', f"{match.group(1)}_p{match.group(2) or 1}"
+        return extractor, video_id
+    return 'url', key
+
+
+class DownloadArchive:
+    # Append-only "extractor id" lines, one per finished item, loaded into a set for O(1) checks
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done = set()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        self._done.add(line)
+
+    @classmethod
+    def for_directory(cls, directory):
+        return cls(os.path.join(directory, ARCHIVE_NAME))
+
+    @staticmethod
+    def _line(extractor, video_id):
+        return f"{extractor} {video_id}"
+
+    def contains(self, extractor, video_id):
+        return self._line(extractor, video_id) in self._done
+
+    def add(self, extractor, video_id):
+        line = self._line(extractor, video_id)
+        with self._lock:
+            if line in self._done:
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self._done.add(line)
+
+    def __len__(self):
+        return len(self._done)
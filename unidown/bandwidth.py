@@ -0,0 +1,91 @@
+import threading
+import time
+
+# Bucket depth in seconds of traffic; keeps bursts short without stalling small reads
+BURST_SECONDS = 0.5
+
+
+class TokenBucket:
+    # rate is in bytes per second; 0 means unlimited. Consumers may overdraw the bucket
+    # and then sleep off the debt, so a single large read never blocks forever.
+
+    def __init__(self, rate=0):
+        self._lock = threading.Lock()
+        self.rate = 0
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self.set_rate(rate)
+
+    def set_rate(self, rate):
+        with self._lock:
+            self._refill()
+            self.rate = max(0, int(rate or 0))
+            # Drop accumulated debt/credit so a new limit takes effect right away
+            self._tokens = min(self._tokens, self._capacity())
+            if self._tokens < 0 or not self.rate:
+                self._tokens = 0.0
+
+    def _capacity(self):
+        return self.rate * BURST_SECONDS
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate:
+            self._tokens = min(self._capacity(), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self, nbytes):
+        # Take nbytes and return how long the caller has to wait to stay under the rate
+        with self._lock:
+            if not self.rate:
+                return 0.0
+            self._refill()
+            self._tokens -= nbytes
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+
+class BandwidthGovernor:
+    # One process-wide limit plus optional limits per channel (e.g. per platform tab)
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.global_bucket = TokenBucket()
+        self._channels = {}
+
+    def channel(self, name):
+        with self._lock:
+            if name not in self._channels:
+                self._channels[name] = TokenBucket()
+            return self._channels[name]
+
+    def set_global_limit(self, rate):
+        self.global_bucket.set_rate(rate)
+
+    def set_channel_limit(self, name, rate):
+        self.channel(name).set_rate(rate)
+
+    def throttle(self, nbytes, channel=None, cancel_event=None):
+        # Called after nbytes were transferred; blocks long enough to honour every applicable cap
+        if nbytes <= 0:
+            return
+        delay = self.global_bucket.reserve(nbytes)
+        if channel is not None:
+            delay = max(delay, self.channel(channel).reserve(nbytes))
+        if delay <= 0:
+            return
+        if cancel_event is not None:
+            cancel_event.wait(delay)
+        else:
+            time.sleep(delay)
+
+
+_governor = None
+_governor_lock = threading.Lock()
+
+
+def shared_governor():
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = BandwidthGovernor()
+        return _governor
@@ -0,0 +1,126 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse, parse_qs
+
+from .paths import user_cache_dir
+
+DEFAULT_TTL = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+DEFAULT_MAX_ENTRIES = 500
+
+
+def normalize_video_key(url):
+    # Map the many URL spellings of one video/playlist to a single cache key
+    url = (url or '').strip()
+    query = parse_qs(urlparse(url).query)
+
+    bv_match = re.search(r'(BV[a-zA-Z0-9]{10}|av[0-9]+)', url)
+    if bv_match and ('bilibili.com' in url or not url.startswith('http')):
+        page = (query.get('p') or ['1'])[0]
+        return f"bilibili:{bv_match.group(1)}:p{page}"
+
+    short_match = re.search(r'b23\.tv/([a-zA-Z0-9]+)', url)
+    if short_match:
+        return f"b23:{short_match.group(1)}"
+
+    yt_match = re.search(r'(?:youtube\.com/(?:watch\?(?:.*&)?v=|shorts/|embed/|live/)|youtu\.be/)([a-zA-Z0-9_-]{11})', url)
+    list_id = (query.get('list') or [None])[0]
+    if yt_match:
+        key = f"youtube:{yt_match.group(1)}"
+        return f"{key}:list={list_id}" if list_id else key
+    if list_id and ('youtube.com' in url or 'youtu.be' in url):
+        return f"youtube:playlist:{list_id}"
+
+    return url
+
+
+class AnalysisCache:
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path or os.path.join(user_cache_dir(), 'analysis.sqlite3')
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS analysis ('
+            'key TEXT PRIMARY KEY, data TEXT NOT NULL, size INTEGER NOT NULL, '
+            'created REAL NOT NULL, accessed REAL NOT NULL)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS analysis_accessed ON analysis (accessed)')
+        self._conn.commit()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def _key(self, url, kind):
+        # Different kinds of results for the same video live side by side
+        key = normalize_video_key(url)
+        return key if kind == 'analysis' else f"{kind}|{key}"
+
+    def get(self, url, kind='analysis'):
+        key = self._key(url, kind)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute('SELECT data, created FROM analysis WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            data, created = row
+            if self.ttl and now - created > self.ttl:
+                self._conn.execute('DELETE FROM analysis WHERE key = ?', (key,))
+                self._conn.commit()
+                return None
+            self._conn.execute('UPDATE analysis SET accessed = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+        try:
+            return json.loads(data)
+        except ValueError:
+            self.invalidate(url, kind)
+            return None
+
+    def put(self, url, info, kind='analysis'):
+        key = self._key(url, kind)
+        # Only JSON values are stored (pass yt-dlp results through YoutubeDL.sanitize_info first);
+        # anything else raises TypeError instead of coming back from a hit as a different value
+        data = json.dumps(info, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO analysis (key, data, size, created, accessed) VALUES (?, ?, ?, ?, ?)',
+                (key, data, len(data), now, now))
+            self._evict()
+            self._conn.commit()
+
+    def invalidate(self, url, kind='analysis'):
+        with self._lock:
+            self._conn.execute('DELETE FROM analysis WHERE key = ?', (self._key(url, kind),))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM analysis')
+            self._conn.commit()
+
+    def _evict(self):
+        # Expired rows go first, then least recently used rows until both bounds hold
+        if self.ttl:
+            self._conn.execute('DELETE FROM analysis WHERE created < ?', (time.time() - self.ttl,))
+        count, total = self._conn.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis').fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute('SELECT key, size FROM analysis ORDER BY accessed ASC').fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM analysis WHERE key = ?', (key,))
+            count -= 1
+            total -= size
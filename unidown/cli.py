@@ -0,0 +1,236 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+# Headless entry point: python -m unidown analyze|download|watch ...
+# Uses the same engine as the GUI; the engine (and yt-dlp with it) is only imported
+# once a command actually runs, so argument parsing and --help never load it.
+
+DEFAULT_FORMAT = 'bestvideo+bestaudio/best'
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='unidown', description='Analyze and download Bilibili/YouTube videos without the GUI.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    analyze = sub.add_parser('analyze', help='show formats or playlist entries of a URL')
+    analyze.add_argument('url')
+    analyze.add_argument('--json', action='store_true', help='print the full analysis as JSON')
+    _add_common(analyze)
+
+    download = sub.add_parser('download', help='download one or more URLs')
+    download.add_argument('urls', nargs='*', metavar='URL')
+    download.add_argument('-i', '--input-file', help="read URLs from a list file, one per line ('-' for stdin)")
+    _add_download_options(download)
+    _add_common(download)
+
+    watch = sub.add_parser('watch', help='keep downloading URLs appended to a list file')
+    watch.add_argument('input_file', metavar='LIST_FILE')
+    watch.add_argument('--interval', type=float, default=30, help='seconds between checks of the list file (default: 30)')
+    _add_download_options(watch)
+    _add_common(watch)
+    return parser
+
+
+def _add_common(parser):
+    parser.add_argument('--proxy', help='proxy URL, e.g. http://127.0.0.1:7890')
+    parser.add_argument('--refresh', action='store_true', help='ignore cached analysis results')
+    cookies = parser.add_mutually_exclusive_group()
+    cookies.add_argument('--cookies-from-browser', metavar='BROWSER[:PROFILE]',
+                         help='send the cookies of a browser, e.g. firefox or chrome:Profile 1')
+    cookies.add_argument('--no-cookies', dest='cookies_from_browser', action='store_const', const=None,
+                         help='send no browser cookies (default)')
+    parser.add_argument('-v', '--verbose', action='store_true', help='log engine diagnostics to stderr')
+    parser.add_argument('--trace', metavar='FILE', help='write per-phase timings as Chrome trace JSON to FILE')
+
+
+def _add_download_options(parser):
+    parser.add_argument('-f', '--format', default=DEFAULT_FORMAT, help=f'yt-dlp format spec (default: {DEFAULT_FORMAT})')
+    parser.add_argument('-p', '--profile', help='format profile resolved per item instead of -f: a saved profile name '
+                        "or rules like 'height<=1080,codec=avc,abr>=128,size<=2G' ('audio' for audio only)")
+    parser.add_argument('-o', '--output', default='.', help='download folder (default: current directory)')
+    parser.add_argument('-j', '--jobs', type=int, default=3, help='items downloaded at the same time (default: 3)')
+    parser.add_argument('-c', '--connections', type=int, default=1, help='connections per file (default: 1)')
+    parser.add_argument('--limit', type=int, default=0, help='total bandwidth limit in KB/s (default: unlimited)')
+    parser.add_argument('--analysis-jobs', type=int, default=6,
+                        help='links analyzed at the same time before downloading (default: 6)')
+    parser.add_argument('--preallocate', action='store_true',
+                        help='reserve each file\'s full size before downloading (less fragmentation on hard disks)')
+    parser.add_argument('--no-reuse', dest='reuse', action='store_false',
+                        help='download again even when the same video and format exist in another folder')
+
+
+def read_url_list(path):
+    if path == '-':
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith('#')]
+
+
+def collect_urls(texts):
+    # Every link and BV/av ID in the given arguments or list lines, without duplicates
+    from .cache import normalize_video_key
+    from .links import extract_urls
+
+    urls, seen = [], set()
+    for text in texts:
+        for url in extract_urls(text) or [text.strip()]:
+            key = normalize_video_key(url)
+            if key not in seen:
+                seen.add(key)
+                urls.append(url)
+    return urls
+
+
+def analyze_url(url, proxy=None, force_refresh=False, cookies_browser=None):
+    from .engine import Analyzer
+
+    # Notifiers fire on this thread, so running the analyzer inline is enough
+    result = {}
+    analyzer = Analyzer(url, proxy, force_refresh, cookies_browser=cookies_browser)
+    analyzer.finished.connect(lambda info: result.update(info=info))
+    analyzer.error.connect(lambda message: result.update(error=message))
+    analyzer.run()
+    if 'error' in result:
+        raise RuntimeError(result['error'])
+    return result['info']
+
+
+def cmd_analyze(args):
+    try:
+        info = analyze_url(args.url, args.proxy, args.refresh, args.cookies_from_browser)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        json.dump(info, sys.stdout, ensure_ascii=False, indent=2, default=str)
+        print()
+        return 0
+
+    from .formats import episode_title, format_size
+    from .progress import format_bytes, format_eta
+
+    print(info.get('title', 'Unknown'))
+    if info.get('is_playlist'):
+        entries = info.get('entries') or []
+        print(f"Playlist, {len(entries)} entries")
+        for i, entry in enumerate(entries):
+            duration = format_eta(entry.get('duration')) if entry.get('duration') else '--:--'
+            print(f"  P{i + 1:02d}  {duration:>8}  {episode_title(entry, info.get('title') or '')}")
+        info = info.get('sample_info') or {}
+        print("Formats (first entry):")
+    for fmt in info.get('formats') or []:
+        resolution = f"{fmt['width']}x{fmt['height']}" if fmt.get('width') and fmt.get('height') else 'audio' if fmt.get('vcodec') == 'none' else '-'
+        size = format_bytes(format_size(fmt)) if format_size(fmt) else '-'
+        print(f"  {fmt.get('format_id', ''):<12} {fmt.get('ext', ''):<5} {resolution:<10} {size:>10}  {fmt.get('format_note') or ''}")
+    return 0
+
+
+def resolve_profile(text):
+    from .profiles import ProfileStore, parse_profile
+
+    return ProfileStore().get(text) or parse_profile(text)
+
+
+def download_urls(urls, args, profile=None):
+    from .bandwidth import shared_governor
+    from .engine import BatchDownloader, BulkAnalyzer, download_items, playlist_folder
+
+    if args.limit:
+        shared_governor().set_global_limit(args.limit * 1024)
+
+    # All links are analyzed up front on a bounded pool, then downloaded in list order
+    print(f"Analyzing {len(urls)} link(s)...", file=sys.stderr)
+    analyzer = BulkAnalyzer(urls, args.proxy, args.refresh, args.analysis_jobs, args.cookies_from_browser)
+    analyzed = {}
+    analyzer.finished.connect(lambda results, errors: analyzed.update(results=results, errors=errors))
+    analyzer.run()
+    for url, message in analyzed['errors']:
+        print(f"Error: {url}: {message}", file=sys.stderr)
+
+    failures = len(analyzed['errors'])
+    for url, info in analyzed['results']:
+        items = download_items(info, args.format, profile)
+        path = args.output
+        # Same layout as the GUI: multi-item playlists get their own folder
+        if info.get('is_playlist') and len(items) > 1:
+            path = playlist_folder(path, info.get('title') or 'Playlist')
+        os.makedirs(path, exist_ok=True)
+
+        errors = []
+        downloader = BatchDownloader(items, path, args.format, args.proxy, args.jobs, print_progress=True,
+                                     connections=args.connections, reuse_existing=args.reuse,
+                                     preallocate=args.preallocate, cookies_browser=args.cookies_from_browser)
+        downloader.progress.connect(lambda message: print(message, file=sys.stderr))
+        downloader.error.connect(lambda message: (errors.append(message), print(message, file=sys.stderr)))
+        downloader.finished.connect(print)
+        downloader.run()
+        failures += len(errors)
+    return 1 if failures else 0
+
+
+def cmd_download(args):
+    urls = list(args.urls)
+    if args.input_file:
+        try:
+            urls += read_url_list(args.input_file)
+        except OSError as e:
+            print(f"Error: cannot read {args.input_file}: {e}", file=sys.stderr)
+            return 2
+    urls = collect_urls(urls)
+    if not urls:
+        print("Error: no URLs given", file=sys.stderr)
+        return 2
+    try:
+        profile = resolve_profile(args.profile) if args.profile else None
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    return download_urls(urls, args, profile)
+
+
+def cmd_watch(args):
+    # Daemon mode: the per-folder download archive makes re-reading the whole list cheap
+    try:
+        profile = resolve_profile(args.profile) if args.profile else None
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    seen = set()
+    print(f"Watching {args.input_file} every {args.interval:g}s (Ctrl+C to stop)", file=sys.stderr)
+    try:
+        while True:
+            try:
+                urls = [url for url in collect_urls(read_url_list(args.input_file)) if url not in seen]
+            except OSError as e:
+                print(f"Error: cannot read {args.input_file}: {e}", file=sys.stderr)
+                urls = []
+            if urls:
+                seen.update(urls)
+                download_urls(urls, args, profile)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+
+
+def main(argv=None):
+    from .net import close_sessions
+    from .trace import configure_logging, tracer
+
+    args = build_parser().parse_args(argv)
+    configure_logging(args.verbose)
+    if args.trace:
+        tracer.enable()
+    commands = {'analyze': cmd_analyze, 'download': cmd_download, 'watch': cmd_watch}
+    try:
+        return commands[args.command](args)
+    finally:
+        close_sessions()
+        if args.trace:
+            tracer.export_chrome_trace(args.trace)
+            print(f"Trace written to {args.trace}", file=sys.stderr)
@@ -0,0 +1,109 @@
+import logging
+import os
+import re
+import threading
+
+log = logging.getLogger(__name__)
+
+# Browser setting meaning "run yt-dlp without cookies"
+NO_COOKIES = 'none'
+
+
+class _ExtractionLog:
+    # Logger for yt-dlp's cookie extraction; remembers which database the cookies came from
+    DATABASE = re.compile(r'Extracting cookies from: "(.+)"')
+
+    def __init__(self):
+        self.db_path = None
+
+    def debug(self, message):
+        match = self.DATABASE.search(message)
+        if match:
+            self.db_path = match.group(1)
+        log.debug(message)
+
+    def info(self, message):
+        log.debug(message)
+
+    def warning(self, message, only_once=False):
+        log.warning(message)
+
+    def error(self, message):
+        log.error(message)
+
+
+class BrowserCookieProvider:
+    # Loads a browser's cookies once and shares the resulting jar with every YoutubeDL. The jar
+    # is reloaded when the database file it came from changes. Only the main file counts: a
+    # running Firefox rewrites its -wal file constantly, and reloading on that would rebuild
+    # every reused YoutubeDL mid-batch. Without a browser, or when its cookies cannot be read,
+    # the jar is empty and yt-dlp runs as if no cookies were configured.
+
+    def __init__(self, browser=None, profile=None):
+        self.browser = browser
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._jar = None
+        self._db_path = None
+        self._signature = None
+
+    def _current_signature(self):
+        if not self._db_path:
+            return None
+        try:
+            return os.stat(self._db_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load(self):
+        from yt_dlp.cookies import YoutubeDLCookieJar, extract_cookies_from_browser
+
+        self._db_path = None
+        if not self.browser:
+            return YoutubeDLCookieJar()
+        extraction = _ExtractionLog()
+        try:
+            jar = extract_cookies_from_browser(self.browser, self.profile, logger=extraction)
+        except Exception as e:
+            # No such browser or profile here, or a locked/encrypted database
+            log.warning(f"Could not load {self.browser} cookies, continuing without them: {e}")
+            return YoutubeDLCookieJar()
+        log.debug(f"Loaded {len(jar)} {self.browser} cookies")
+        self._db_path = extraction.db_path
+        return jar
+
+    def get_jar(self):
+        with self._lock:
+            if self._jar is None or self._current_signature() != self._signature:
+                self._jar = self._load()
+                self._signature = self._current_signature()
+            return self._jar
+
+    def apply(self, ydl):
+        # YoutubeDL.cookiejar is a cached_property; seeding it skips yt-dlp's own browser lookup
+        ydl.cookiejar = self.get_jar()
+        return ydl
+
+    def is_current(self, ydl):
+        # False once the jar seeded into ydl was replaced. A reused YoutubeDL has to be rebuilt
+        # then: its request handlers keep the jar they were created with
+        return ydl.__dict__.get('cookiejar') is self.get_jar()
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def shared_cookie_provider(browser=None, profile=None):
+    # browser may also be given as 'BROWSER:PROFILE', like yt-dlp's --cookies-from-browser;
+    # None or 'none' gives the provider of an always empty jar
+    if browser and profile is None and ':' in browser:
+        browser, profile = browser.split(':', 1)
+    browser = (browser or '').lower()
+    if browser in ('', NO_COOKIES):
+        browser, profile = None, None
+    with _providers_lock:
+        key = (browser, profile or None)
+        if key not in _providers:
+            _providers[key] = BrowserCookieProvider(browser, profile or None)
+        return _providers[key]
@@ -0,0 +1,987 @@
+import contextlib
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .archive import DownloadArchive, item_archive_key
+from .bandwidth import shared_governor
+from .cache import AnalysisCache
+from .cookies import shared_cookie_provider
+from .formats import compact_entry, compact_format_info, episode_title
+from .journal import DONE, FAILED, IN_PROGRESS
+from .library import ContentIndex
+from .net import BROWSER_HEADERS, get_session, resolve_short_link
+from .postprocess import shared_postprocess_pool
+from .preflight import SPACE_MARGIN, InsufficientSpaceError, bytes_on_disk, download_size, free_space
+from .profiles import profile_format_spec
+from .progress import ProgressThrottle, format_bytes, format_progress, progress_payload
+from .retry import RetryPolicy, classify_error
+from .trace import tracer
+
+# Analysis and download engine shared by the GUI and the command line. Nothing here imports
+# Qt; main.py wraps these classes in QThreads and forwards the notifiers to Qt signals.
+
+log = logging.getLogger(__name__)
+
+# Links analyzed at the same time by BulkAnalyzer
+BULK_ANALYSIS_WORKERS = 6
+
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+
+class Notifier:
+    # Minimal stand-in for a Qt signal: callbacks run on the emitting thread
+
+    def __init__(self):
+        self._callbacks = []
+
+    def connect(self, callback):
+        self._callbacks.append(callback)
+
+    def disconnect(self, callback=None):
+        if callback is None:
+            self._callbacks = []
+        else:
+            self._callbacks.remove(callback)
+
+    def emit(self, *args):
+        for callback in list(self._callbacks):
+            callback(*args)
+
+
+def clean_error(e):
+    # yt-dlp colours its messages; strip ANSI codes before showing them
+    return ANSI_ESCAPE.sub('', str(e))
+
+
+def playlist_folder(path, playlist_title):
+    # Multi-item playlist downloads go into a subfolder named after the playlist
+    safe_title = re.sub(r'[\\/*?:"<>|]', "_", playlist_title).strip()
+    # Truncate very long titles to avoid path length issues
+    return os.path.abspath(os.path.join(path, safe_title[:150]))
+
+
+def download_items(info, format_str=None, profile=None):
+    # BatchDownloader items for an analysis result: every playlist entry, numbered like
+    # the episode list, or the single video itself. A format profile (see unidown.profiles)
+    # is resolved per item at download time and takes precedence over format_str
+    if not info.get('is_playlist'):
+        return [{
+            'url': info['webpage_url'],
+            'id': info.get('id'),
+            'ie_key': info.get('extractor_key'),
+            'title': info.get('title', 'video'),
+            'duration': info.get('duration'),
+            'format': format_str,
+            'profile': profile,
+        }]
+    playlist_title = info.get('title') or ''
+    items = []
+    for i, entry in enumerate(info.get('entries') or []):
+        # Merged bulk lists (see merge_analyses) are unrelated videos, not numbered episodes
+        number = '' if info.get('bulk') else f"P{i + 1:02d} "
+        items.append({
+            'url': entry.get('url') or entry.get('webpage_url'),
+            'id': entry.get('id'),
+            'ie_key': entry.get('ie_key'),
+            'title': f"{number}{episode_title(entry, playlist_title)}",
+            'duration': entry.get('duration'),
+            'format': format_str,
+            'profile': profile,
+        })
+    return items
+
+
+class YoutubeDLCache:
+    # YoutubeDL instances kept across analyses, one per thread and option set. Building one
+    # registers every yt-dlp extractor, about 0.1 s of CPU that holds the GIL, so a pool of
+    # analysis threads creating one per link would mostly wait on each other.
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._created = []
+
+    def get(self, opts, cookies):
+        import yt_dlp
+
+        instances = self._local.__dict__.setdefault('instances', {})
+        key = repr(sorted(opts.items()))
+        ydl = instances.get(key)
+        if ydl is not None and not cookies.is_current(ydl):
+            # The browser's cookies changed since this instance was built
+            with self._lock:
+                self._created.remove(ydl)
+            ydl.close()
+            ydl = None
+        if ydl is None:
+            ydl = instances[key] = cookies.apply(yt_dlp.YoutubeDL(dict(opts)))
+            with self._lock:
+                self._created.append(ydl)
+        return ydl
+
+    def close(self):
+        with self._lock:
+            created, self._created = self._created, []
+        for ydl in created:
+            ydl.close()
+
+
+class Analyzer:
+    # Resolves a URL into an info dict for format selection. Results go out through
+    # notifiers: finished(info) or error(message); in incremental mode a playlist first
+    # sends playlist_started(header, with sample_info but no entries) and then entries_batch(list)
+
+    STREAM_BATCH_SIZE = 50
+    STREAM_BATCH_INTERVAL = 0.5
+    
+    def __init__(self, url, proxy=None, force_refresh=False, incremental=True, ydl_cache=None, cookies_browser=None):
+        self.finished = Notifier()
+        self.error = Notifier()
+        self.playlist_started = Notifier()
+        self.entries_batch = Notifier()
+        self.url = url
+        self.proxy = proxy
+        self.force_refresh = force_refresh
+        self.incremental = incremental
+        self.ydl_cache = ydl_cache
+        # Browser to take cookies from ('firefox', 'chrome:Profile 1', ...); None for no cookies
+        self.cookies = shared_cookie_provider(cookies_browser)
+        self._is_cancelled = False
+
+    def stop(self):
+        self._is_cancelled = True
+
+    @property
+    def cancelled(self):
+        return self._is_cancelled
+
+    def _youtube_dl(self, opts):
+        if self.ydl_cache is not None:
+            return contextlib.nullcontext(self.ydl_cache.get(opts, self.cookies))
+        import yt_dlp
+        return self.cookies.apply(yt_dlp.YoutubeDL(opts))
+
+    def _emit_result(self, info):
+        with tracer.span('analyze.cache_write', url=self.url):
+            try:
+                AnalysisCache.shared().put(self.url, info)
+            except Exception as e:
+                log.warning(f"Analysis cache write failed: {e}")
+        self._deliver(info)
+
+    def _deliver(self, info):
+        # A stopped analysis reports its cancellation instead of a result nobody asked for anymore
+        if self._is_cancelled:
+            self.error.emit("Analysis cancelled")
+        else:
+            self.finished.emit(info)
+
+    def run(self):
+        with tracer.span('analyze', url=self.url):
+            self._run()
+
+    def _run(self):
+        # 0. Serve a recent analysis of the same video from the on-disk cache
+        if not self.force_refresh:
+            with tracer.span('analyze.cache_lookup', url=self.url) as span:
+                try:
+                    cached = AnalysisCache.shared().get(self.url)
+                except Exception as e:
+                    log.warning(f"Analysis cache read failed: {e}")
+                    cached = None
+                span['hit'] = bool(cached)
+            if cached:
+                log.debug(f"Analysis cache hit for: {self.url}")
+                self._deliver(cached)
+                return
+
+        # Browser cookies are loaded once per session and seeded into each YoutubeDL.
+        # Playlists are only enumerated: every platform's entries come back flat, and the format
+        # dialog fetches full details (formats, exact title and duration) for the rows it shows
+        ydl_opts = {
+            'quiet': True,
+            'no_color': True,
+            'extract_flat': 'in_playlist',
+        }
+
+        if self.proxy:
+            ydl_opts['proxy'] = self.proxy
+            
+        try:
+            # 1. Try Bilibili Specific API for multi-page videos
+            if 'bilibili.com' in self.url or 'b23.tv' in self.url:
+                try:
+                    effective_url = self.url
+                    if 'b23.tv' in effective_url:
+                        # Follow redirect for short links
+                        try:
+                            with tracer.span('analyze.resolve_short_link', url=effective_url):
+                                effective_url = resolve_short_link(effective_url, self.proxy)
+                        except Exception as e:
+                            # The unresolved link still goes to yt-dlp below
+                            log.warning(f"Short link resolution failed: {e}")
+                    
+                    bvid_match = re.search(r'(BV[a-zA-Z0-9]{10}|av[0-9]+)', effective_url)
+                    if bvid_match:
+                        bvid = bvid_match.group(1)
+                        log.debug(f"Extracted BV ID: {bvid}")
+                        api_url = 'https://api.bilibili.com/x/web-interface/view'
+                        params = {'bvid': bvid} if bvid.startswith('BV') else {'aid': bvid[2:]}
+
+                        # Pooled keep-alive session: TLS/DNS is paid once per proxy setting
+                        with tracer.span('analyze.view_api', bvid=bvid):
+                            resp = get_session(self.proxy).get(api_url, params=params, headers=BROWSER_HEADERS, timeout=10)
+                            api_data = resp.json()
+                        log.debug(f"API response code: {api_data.get('code')}")
+                        
+                        if api_data.get('code') == 0:
+                            v_data = api_data['data']
+                            pages = v_data.get('pages', [])
+                            log.debug(f"Pages count: {len(pages)}")
+                            
+                            # Only use API for multi-page videos
+                            if len(pages) > 1:
+                                log.debug("Multi-page video detected")
+                                entries = []
+                                for p in pages:
+                                    p_num = p.get('page', 1)
+                                    p_url = f"https://www.bilibili.com/video/{bvid}?p={p_num}"
+                                    entries.append({
+                                        'title': p.get('part', f"P{p_num}"),
+                                        'duration': p.get('duration'),
+                                        'url': p_url,
+                                        'webpage_url': p_url,
+                                        'id': f"{bvid}_p{p_num}"
+                                    })
+                                
+                                with tracer.span('analyze.sample_extract', url=entries[0]['url']), \
+                                        self._youtube_dl({'quiet': True, 'no_color': True, 'proxy': self.proxy}) as ydl:
+                                    # Get format info from the first page
+                                    sample_info = ydl.extract_info(entries[0]['url'], download=False)
+                                
+                                final_info = {
+                                    'is_playlist': True,
+                                    'title': v_data.get('title', 'Bilibili Multi-page'),
+                                    'entries': entries,
+                                    'sample_info': ydl.sanitize_info(sample_info),
+                                    'webpage_url': effective_url
+                                }
+                                self._emit_result(final_info)
+                                return
+                            # For single-page videos, fall through to yt-dlp below
+                            log.debug("Single-page video, falling through to yt-dlp")
+                        else:
+                            log.debug(f"API returned non-zero code: {api_data.get('code')}, {api_data.get('message')}")
+                except Exception as e:
+                    log.warning(f"Bilibili API failed: {e}")
+
+
+            # 2. Default extraction with yt-dlp
+            log.debug(f"Starting yt-dlp extraction for: {self.url}")
+            try:
+                with self._youtube_dl(ydl_opts) as ydl:
+                    # 1. Initial extraction
+                    log.debug("Calling ydl.extract_info...")
+                    if self.incremental:
+                        # Unprocessed result: playlist entries are still a lazy generator here
+                        with tracer.span('analyze.extract_info', url=self.url) as span:
+                            info = ydl.extract_info(self.url, download=False, process=False)
+                            hops = 0
+                            while info.get('_type') in ('url', 'url_transparent') and hops < 3:
+                                info = ydl.extract_info(info['url'], download=False, ie_key=info.get('ie_key'), process=False)
+                                hops += 1
+                            span['hops'] = hops
+                        if info.get('_type') == 'playlist' and 'entries' in info:
+                            log.debug("Detected as playlist, streaming entries")
+                            self._stream_playlist(ydl, info)
+                            return
+                        with tracer.span('analyze.process', url=self.url):
+                            info = ydl.process_ie_result(info, download=False)
+                    else:
+                        with tracer.span('analyze.extract_info', url=self.url):
+                            info = ydl.extract_info(self.url, download=False)
+                    log.debug(f"extract_info completed, type: {info.get('_type') if info else 'None'}")
+                    
+                    # Check if it is a playlist
+                    if info.get('_type') == 'playlist' and 'entries' in info:
+                        log.debug("Detected as playlist")
+                        entries = [compact_entry(entry) for entry in info.get('entries', []) if entry]
+                        if not entries:
+                             raise Exception("Playlist is empty")
+                             
+                        # Get sample format from the first entry
+                        sample_entry = entries[0]
+                        sample_url = sample_entry.get('url') or sample_entry.get('webpage_url')
+                        if not sample_url:
+                            sample_url = self.url 
+                        
+                        with tracer.span('analyze.sample_extract', url=sample_url), \
+                                self._youtube_dl({'quiet': True, 'no_color': True, 'proxy': self.proxy}) as ydl_sample:
+                            sample_info = ydl_sample.extract_info(sample_url, download=False)
+                        
+                        final_info = {
+                            'is_playlist': True,
+                            'title': info.get('title', 'Playlist'),
+                            'entries': entries,
+                            'sample_info': ydl_sample.sanitize_info(sample_info),
+                            'webpage_url': info.get('webpage_url', self.url)
+                        }
+                        self._emit_result(final_info)
+                    
+                    else:
+                        # Single video
+                        log.debug("Detected as single video")
+                        if 'formats' not in info:
+                            log.debug("No formats, re-extracting...")
+                            # Re-extract fully
+                            ydl_opts.pop('extract_flat')
+                            with tracer.span('analyze.full_extract', url=self.url), self._youtube_dl(ydl_opts) as ydl_full:
+                                 info = ydl_full.extract_info(self.url, download=False)
+                        else:
+                            log.debug(f"Found {len(info.get('formats', []))} formats")
+
+                        info['is_playlist'] = False
+                        log.debug(f"Emitting single video: {info.get('title')}")
+                        self._emit_result(ydl.sanitize_info(info))
+                        log.debug("Emit completed")
+            except Exception as yt_err:
+                log.debug(f"yt-dlp extraction error: {yt_err}")
+                raise
+                    
+        except Exception as e:
+            self.error.emit(clean_error(e))
+
+    def _stream_playlist(self, ydl, playlist_info):
+        header = None
+        entries = []
+        batch = []
+        last_emit = time.monotonic()
+
+        for entry in playlist_info['entries']:
+            if self._is_cancelled:
+                log.debug(f"Playlist analysis cancelled after {len(entries)} entries")
+                self.error.emit("Analysis cancelled")
+                return
+            if not entry:
+                continue
+
+            if header is None:
+                # Some extractors list entries with their formats; otherwise the first is sampled
+                if entry.get('formats'):
+                    sample_info = entry
+                else:
+                    sample_url = entry.get('url') or entry.get('webpage_url') or self.url
+                    with tracer.span('analyze.sample_extract', url=sample_url), \
+                            self._youtube_dl({'quiet': True, 'no_color': True, 'proxy': self.proxy}) as ydl_sample:
+                        sample_info = ydl_sample.extract_info(sample_url, download=False)
+                header = {
+                    'is_playlist': True,
+                    'title': playlist_info.get('title', 'Playlist'),
+                    'entries': [],
+                    'sample_info': ydl.sanitize_info(sample_info),
+                    'webpage_url': playlist_info.get('webpage_url', self.url),
+                    'loading': True,
+                }
+                tracer.instant('analyze.first_entries', url=self.url)
+                self.playlist_started.emit(header)
+
+            entry = compact_entry(entry)
+            entries.append(entry)
+            batch.append(entry)
+            # First row goes out immediately, then batches bounded by size and time
+            if len(entries) == 1 or len(batch) >= self.STREAM_BATCH_SIZE or time.monotonic() - last_emit >= self.STREAM_BATCH_INTERVAL:
+                self.entries_batch.emit(batch)
+                batch = []
+                last_emit = time.monotonic()
+
+        if batch:
+            self.entries_batch.emit(batch)
+        if header is None:
+            raise Exception("Playlist is empty")
+
+        final_info = dict(header, entries=entries, loading=False)
+        self._emit_result(final_info)
+
+
+class BulkAnalyzer:
+    # Analyzes many links on a bounded pool, so the wall time grows with the number of links
+    # divided by the pool size rather than with the number of links. Notifiers: progress(done,
+    # total, url) after each link and finished(results, errors) at the end, with results as
+    # [(url, info)] in input order and errors as [(url, message)]
+
+    def __init__(self, urls, proxy=None, force_refresh=False, max_workers=BULK_ANALYSIS_WORKERS, cookies_browser=None):
+        self.progress = Notifier()
+        self.finished = Notifier()
+        self.urls = list(urls)
+        self.proxy = proxy
+        self.cookies_browser = cookies_browser
+        self.force_refresh = force_refresh
+        self.max_workers = max(1, int(max_workers or 1))
+        self._is_cancelled = False
+        self._lock = threading.Lock()
+        self._running = set()
+        self._ydl_cache = YoutubeDLCache()
+
+    def stop(self):
+        self._is_cancelled = True
+        with self._lock:
+            analyzers = list(self._running)
+        for analyzer in analyzers:
+            analyzer.stop()
+
+    @property
+    def cancelled(self):
+        return self._is_cancelled
+
+    def _analyze(self, url):
+        if self._is_cancelled:
+            return None, "Cancelled"
+        result = {}
+        # Whole playlists at once: there is no dialog to stream entries into yet
+        analyzer = Analyzer(url, self.proxy, self.force_refresh, incremental=False, ydl_cache=self._ydl_cache,
+                            cookies_browser=self.cookies_browser)
+        analyzer.finished.connect(lambda info: result.update(info=info))
+        analyzer.error.connect(lambda message: result.update(error=message))
+        with self._lock:
+            self._running.add(analyzer)
+        try:
+            analyzer.run()
+        finally:
+            with self._lock:
+                self._running.discard(analyzer)
+        return result.get('info'), result.get('error')
+
+    def run(self):
+        results, errors = {}, []
+        with tracer.span('analyze.bulk', links=len(self.urls), workers=self.max_workers):
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(self.urls)) or 1,
+                                    thread_name_prefix='unidown-analyze') as pool:
+                futures = {pool.submit(self._analyze, url): i for i, url in enumerate(self.urls)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    i = futures[future]
+                    try:
+                        info, error = future.result()
+                    except Exception as e:
+                        info, error = None, clean_error(e)
+                    if info is not None:
+                        results[i] = info
+                    elif not self._is_cancelled:
+                        errors.append((self.urls[i], error or "Analysis failed"))
+                    self.progress.emit(done, len(self.urls), self.urls[i])
+        self._ydl_cache.close()
+        self.finished.emit([(self.urls[i], results[i]) for i in sorted(results)], errors)
+
+
+def merge_analyses(results, title=None):
+    # One playlist-shaped info for several analysis results: every video and every playlist
+    # entry in link order. Entries of single videos keep their formats, so the format dialog
+    # needs no probe for them
+    entries = []
+    sample_info = None
+    for url, info in results:
+        if info.get('is_playlist'):
+            playlist_title = info.get('title') or ''
+            for entry in info.get('entries') or []:
+                # Parts of several playlists end up side by side; keep the playlist in the name
+                title = episode_title(entry, playlist_title)
+                entries.append(dict(entry, title=f"{playlist_title} - {title}" if playlist_title else title))
+            sample_info = sample_info or info.get('sample_info')
+        else:
+            entries.append(compact_entry(info))
+            sample_info = sample_info or compact_format_info(info)
+    return {
+        'is_playlist': True,
+        'title': title or f"{len(results)} links",
+        'entries': entries,
+        'sample_info': sample_info or {'formats': []},
+        'webpage_url': None,
+        'bulk': True,
+    }
+
+
+class DownloadCancelledException(Exception):
+    pass
+
+class BatchDownloader:
+    # Downloads a list of items ({'url', 'title', optional 'format'/'profile'/'id'/'ie_key'/'duration'})
+    # into one folder. Reports through notifiers: progress(str) status lines, progress_data(payload)
+    # transfer payloads (see unidown.progress), error(str) per failed item, finished(str) summary,
+    # and done() once the batch is over for any reason (finished, cancelled or stopped for resume).
+    # Items needing a merge or fixup leave their job slot once the streams are downloaded and
+    # finish in the post-processing pool (see unidown.postprocess)
+
+    def __init__(self, urls, path, format_str=None, proxy=None, max_workers=1, print_progress=False, retry_policy=None,
+                 journal=None, connections=1, bandwidth_channel=None, postprocess_pool=None, reuse_existing=True,
+                 preallocate=False, cookies_browser=None):
+        self.finished = Notifier()
+        self.error = Notifier()
+        self.progress = Notifier()
+        self.progress_data = Notifier()
+        self.done = Notifier()
+        # Ensure urls is a list
+        self.urls = urls if isinstance(urls, list) else [urls]
+        self.path = path
+        self.format_str = format_str
+        self.proxy = proxy
+        # Number of playlist items downloaded at the same time
+        self.max_workers = max(1, int(max_workers or 1))
+        self.print_progress = print_progress
+        self._throttle = ProgressThrottle()
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Attempts made so far per item index
+        self.attempts = {}
+        # Items whose last attempt failed, with the error
+        self.failed = {}
+        self.batch_running = False
+        self._queue = None
+        self._done = threading.Event()
+        # Optional BatchJournal mirroring each item's state on disk
+        self.journal = journal
+        # Connections per file: parallel fragments (DASH/HLS) or Range segments (progressive)
+        self.connections = connections
+        # Reserve each progressive file's full size on disk before writing it
+        self.preallocate = preallocate
+        # Estimated bytes of items whose transfer is running, and the files each one has written
+        # so far; only the part not yet on disk is counted against free space
+        self._reserved = {}
+        self._written_files = {}
+        # Transfers are paced by the process-wide governor; the channel adds a per-tab cap
+        self.bandwidth_channel = bandwidth_channel
+        self._bandwidth = shared_governor()
+        self._postprocess_pool = postprocess_pool or shared_postprocess_pool()
+        # Hardlink content finished before in any download folder instead of fetching it again
+        self.reuse_existing = reuse_existing
+        # Browser cookies for every item's requests (see unidown.cookies); None for no cookies
+        self.cookies = shared_cookie_provider(cookies_browser)
+        # Bytes reported so far per running item and stream, for the bandwidth limit
+        self._transferred = {}
+        self._is_cancelled = False
+        self._keep_partial = False
+        self._cancel_event = threading.Event()
+        # In-flight file of every active item, keyed by item index
+        self._current_files = {}
+        # Trace span start times of running transfers and post-processors
+        self._trace_started = {}
+        self._lock = threading.Lock()
+        # Long-lived YoutubeDL engines, one per pool thread
+        self._local = threading.local()
+        self._engines = []
+        # Track video information for detailed progress
+        self.total_videos = len(self.urls)
+        self.completed_videos = 0
+        self.skipped_videos = 0
+        self.linked_videos = 0
+        self.active_videos = set()
+        # Finished items of this download folder, checked before each item starts
+        self.archive = DownloadArchive.for_directory(path)
+
+    def stop(self, keep_partial=False):
+        # keep_partial: stop for a later resume (app closing) instead of a user cancel
+        self._keep_partial = keep_partial
+        self._is_cancelled = True
+        self._cancel_event.set()
+        if self._queue:
+            # Let the queue drop this batch's waiting items right away
+            self._queue.wake()
+
+    def _set_journal_state(self, index, state, error=None):
+        if self.journal:
+            try:
+                self.journal.set_state(index, state, error)
+            except OSError as e:
+                log.warning(f"Journal write failed: {e}")
+
+    def _progress_hook(self, d):
+        # One hook per engine; the item it belongs to travels in the info dict
+        info_dict = d.get('info_dict') or {}
+        index = info_dict.get('unidown_index', 0)
+        title = self.urls[index - 1]['title'] if index else info_dict.get('title', 'Unknown')
+        total_videos = self.total_videos
+
+        if d.get('filename'):
+            with self._lock:
+                self._current_files[index] = d['filename']
+                self._written_files.setdefault(index, set()).add(d['filename'])
+        if tracer.enabled:
+            self._trace_transfer(d, index)
+
+        if self._is_cancelled:
+            # Raising an exception inside the hook is a common way to stop yt-dlp
+            raise DownloadCancelledException("Download cancelled")
+
+        status = d['status']
+        if status == 'downloading' and not d.get('unidown_throttled'):
+            # yt-dlp's own downloaders report bytes after each read; sleeping here paces the next one
+            key = d.get('tmpfilename') or d.get('filename')
+            downloaded = d.get('downloaded_bytes') or 0
+            with self._lock:
+                streams = self._transferred.setdefault(index, {})
+                # A smaller count than last time means the stream started over (a retry): new baseline
+                delta = max(0, downloaded - streams.get(key, 0))
+                streams[key] = downloaded
+            self._throttle_bytes(delta)
+        if status not in ('downloading', 'finished'):
+            return
+        # Coalesce chunk callbacks to a bounded rate per item; completion always goes out
+        if not self._throttle.should_emit(index, force=status == 'finished'):
+            return
+
+        payload = progress_payload(d, index, total_videos, title)
+        payload['completed'] = self.completed_videos
+        payload['active'] = len(self.active_videos)
+        if self.print_progress:
+            line = format_progress(payload)
+            # Clear the line and print new progress in one line
+            print(f"\r  {line}" + ("                    \n" if status == 'finished' else ""), end='', flush=True)
+        self.progress_data.emit(payload)
+        if status == 'finished' and self.max_workers == 1:
+            self.progress.emit("Finalizing file...")
+
+    def _trace_transfer(self, d, index):
+        # One 'item.download' span per stream, ending at 'finished'. The downloader's own elapsed
+        # time gives the start; the first progress report is the fallback
+        key = ('download', d.get('filename'))
+        if d['status'] == 'downloading':
+            self._trace_started.setdefault(key, tracer.now())
+        elif d['status'] == 'finished':
+            start = self._trace_started.pop(key, None)
+            if d.get('elapsed') is not None:
+                start = tracer.now() - int(d['elapsed'] * 1000000)
+            if start is not None:
+                tracer.complete('item.download', start, index=index, file=os.path.basename(d.get('filename') or ''),
+                                bytes=d.get('total_bytes') or d.get('downloaded_bytes'))
+
+    def _postprocessor_hook(self, d):
+        # Merging, fixups and moves show up as 'item.postprocess' spans
+        if not tracer.enabled:
+            return
+        key = ('postprocess', threading.get_ident(), d.get('postprocessor'))
+        if d['status'] == 'started':
+            self._trace_started[key] = tracer.now()
+        elif d['status'] == 'finished':
+            start = self._trace_started.pop(key, None)
+            if start is not None:
+                index = (d.get('info_dict') or {}).get('unidown_index', 0)
+                tracer.complete('item.postprocess', start, index=index, postprocessor=d.get('postprocessor'))
+
+    def _throttle_bytes(self, nbytes):
+        self._bandwidth.throttle(nbytes, self.bandwidth_channel, self._cancel_event)
+
+    def _get_engine(self, ydl_opts):
+        # Each pool thread keeps one YoutubeDL for the whole batch, so extractors,
+        # post-processors and keep-alive connections are set up only once per thread
+        ydl = getattr(self._local, 'ydl', None)
+        if ydl is not None and not self.cookies.is_current(ydl):
+            # The browser's cookies changed mid-batch; start over with an engine on the new jar
+            with self._lock:
+                self._engines.remove(ydl)
+            ydl.close()
+            self._local.__dict__.pop('selectors', None)
+            ydl = None
+        if ydl is None:
+            from .transfer import TransferYoutubeDL
+            ydl = self.cookies.apply(TransferYoutubeDL(ydl_opts))
+            self._local.ydl = ydl
+            with self._lock:
+                self._engines.append(ydl)
+        return ydl
+
+    def _get_postprocess_engine(self):
+        # Post-processing gets its own YoutubeDL per pool thread, built from the same options:
+        # the engine that downloaded the item is already busy with the next one, and a YoutubeDL
+        # must not be used from two threads at once
+        ydl = getattr(self._local, 'postprocess_ydl', None)
+        if ydl is None:
+            from .transfer import TransferYoutubeDL
+            ydl = TransferYoutubeDL(dict(self._ydl_opts))
+            self._local.postprocess_ydl = ydl
+            with self._lock:
+                self._engines.append(ydl)
+        return ydl
+
+    def _check_space(self, info):
+        # Runs once formats are chosen, before the transfer: an item that cannot fit fails
+        # now instead of filling the disk and leaving a partial file
+        size = download_size(info)
+        if not size:
+            return
+        index = info.get('unidown_index', 0)
+        free = free_space(self.path)
+        with self._lock:
+            # free already reflects what running items wrote (or preallocated); count only the rest
+            reserved = sum(max(0, estimate - bytes_on_disk(self._written_files.get(running, ())))
+                           for running, estimate in self._reserved.items())
+            if free is not None and free - reserved < size + SPACE_MARGIN:
+                raise InsufficientSpaceError(
+                    f"Not enough disk space: needs about {format_bytes(size)} plus {format_bytes(SPACE_MARGIN)} headroom, "
+                    f"{format_bytes(max(0, free - reserved))} available in {self.path}")
+            self._reserved[index] = size
+
+    def _select_formats(self, ctx):
+        # Items may carry their own format spec or a profile ranked against this entry's own
+        # formats; build each selector once per engine
+        profile = getattr(self._local, 'profile', None)
+        if profile:
+            spec = profile_format_spec(ctx['formats'], profile, self._local.duration) or 'best'
+            log.debug(f"Profile {profile.get('name')!r} picked {spec}")
+        else:
+            spec = getattr(self._local, 'format_spec', None) or self.format_str or 'best'
+        selectors = self._local.__dict__.setdefault('selectors', {})
+        if spec not in selectors:
+            selectors[spec] = self._local.ydl.build_format_selector(spec)
+        return selectors[spec](ctx)
+
+    def _close_engines(self):
+        with self._lock:
+            engines, self._engines = self._engines, []
+        for ydl in engines:
+            try:
+                ydl.close()
+            except Exception:
+                pass
+
+    def _download_item(self, index, item_data, ydl_opts):
+        url = item_data['url']
+        title = item_data['title']
+        total_videos = self.total_videos
+
+        # Check cancellation at start of each video
+        if self._is_cancelled:
+            raise DownloadCancelledException()
+
+        with self._lock:
+            self.active_videos.add(index)
+        try:
+            msg = f"Processing ({index}/{total_videos})..." if total_videos > 1 else "Starting download..."
+            self.progress.emit(msg)
+
+            if not url:
+                raise Exception("Missing video URL")
+
+            archive_key = item_archive_key(item_data)
+            if self.archive.contains(*archive_key) or (self.journal and self.journal.is_done(index)):
+                self._set_journal_state(index, DONE)
+                with self._lock:
+                    self.skipped_videos += 1
+                    self.completed_videos += 1
+                self.progress.emit(f"Skipping ({index}/{total_videos}): {title} (already downloaded)")
+                return 'skipped'
+
+            ydl = self._get_engine(ydl_opts)
+            ydl.take_deferred_postprocess()
+            ydl.take_linked_source()
+            if self._is_cancelled: raise DownloadCancelledException()
+            self._set_journal_state(index, IN_PROGRESS)
+
+            # Sanitize title for filename; the shared outtmpl picks it up from extra_info
+            safe_title = re.sub(r'[\\/*?::"<>|]', "_", title).strip()
+            self._local.format_spec = item_data.get('format')
+            self._local.profile = item_data.get('profile')
+            self._local.duration = item_data.get('duration')
+            self.progress.emit(f"Analyzing ({index}/{total_videos}): {title}")
+            # Extraction and download/merge run as two steps so each gets its own span
+            with tracer.span('item.extract', index=index, url=url):
+                ie_result = ydl.extract_info(url, download=False, process=False)
+            with tracer.span('item.process', index=index):
+                ydl.process_ie_result(ie_result, download=True, extra_info={
+                    'unidown_index': index,
+                    'unidown_filename': safe_title,
+                })
+            linked_source = ydl.take_linked_source()
+            if linked_source:
+                with self._lock:
+                    self.linked_videos += 1
+                self.progress.emit(f"Linked ({index}/{total_videos}): {title} (same video already in {os.path.dirname(linked_source)})")
+            deferred = ydl.take_deferred_postprocess()
+            if deferred:
+                # Streams are on disk; the merge runs in the post-processing stage while this
+                # job slot moves on to the next item
+                self.progress.emit(f"Downloaded ({index}/{total_videos}), queued for merging: {title}")
+                self._postprocess_pool.submit(self._postprocess_item, index, deferred)
+                return 'postprocessing'
+            self._complete_item(index, archive_key)
+            return 'done'
+        finally:
+            with self._lock:
+                self.active_videos.discard(index)
+                self._reserved.pop(index, None)
+                self._written_files.pop(index, None)
+                self._transferred.pop(index, None)
+                # Keep the file of a cancelled item around so it can be cleaned up
+                if not self._is_cancelled:
+                    self._current_files.pop(index, None)
+            self._throttle.forget(index)
+
+    def _complete_item(self, index, archive_key):
+        # The hook's 'finished' fires once per stream before merging; the item
+        # only goes into the archive after post-processing left everything in place
+        self.archive.add(*archive_key)
+        self._set_journal_state(index, DONE)
+        with self._lock:
+            self.completed_videos += 1
+
+    def _postprocess_item(self, index, deferred):
+        # Runs on a post-processing pool thread and reports the item's final state to the queue
+        item_data = self.urls[index - 1]
+        delay = None
+        if self._is_cancelled:
+            # Kept for a resume, which then only has to merge them; a user cancel removes them
+            with self._lock:
+                for n, stream_file in enumerate(deferred[1].get('__files_to_merge') or []):
+                    self._current_files[(index, n)] = stream_file
+            outcome = 'cancelled'
+        else:
+            self.progress.emit(f"Merging ({index}/{self.total_videos}): {item_data['title']}")
+            try:
+                with tracer.span('item.postprocess_stage', index=index):
+                    self._get_postprocess_engine().run_deferred_postprocess(deferred)
+                self._complete_item(index, item_archive_key(item_data))
+                self.progress.emit(f"Finished ({index}/{self.total_videos}): {item_data['title']}")
+                outcome = 'done'
+            except Exception as e:
+                outcome, delay = self._item_error(index, e)
+        self._queue.stage_finished(self, index, outcome, delay)
+
+    @property
+    def cancelled(self):
+        return self._is_cancelled
+
+    def start(self, queue):
+        # Called by the JobQueue on submit; items then run one by one through run_item()
+        self._queue = queue
+        self._ydl_opts = {
+            'format': self._select_formats,
+            'outtmpl': f'{self.path}/%(unidown_filename)s.%(ext)s',
+            'noplaylist': True,
+            'progress_hooks': [self._progress_hook],
+            'postprocessor_hooks': [self._postprocessor_hook],
+            'quiet': True,
+            'no_warnings': True,
+            'no_color': True,
+            # Progress is reported through progress_data (and print_progress) instead
+            'noprogress': True,
+        }
+        from .transfer import transfer_options
+        self._ydl_opts.update(transfer_options(self.connections, self.preallocate))
+        self._ydl_opts['unidown_preflight'] = self._check_space
+        self._ydl_opts['unidown_throttle'] = self._throttle_bytes
+        self._ydl_opts['unidown_defer_postprocess'] = True
+        if self.reuse_existing:
+            self._ydl_opts['unidown_content_index'] = ContentIndex.shared()
+        if self.proxy:
+            self._ydl_opts['proxy'] = self.proxy
+        self._trace_batch_start = tracer.now()
+        self.batch_running = True
+
+    def run_item(self, index):
+        # One attempt at one item. Returns (state, retry delay) for the queue, see unidown.jobqueue
+        self.attempts[index] = self.attempts.get(index, 0) + 1
+        with tracer.span('item', index=index, url=self.urls[index - 1].get('url'), attempt=self.attempts[index]) as span:
+            outcome, delay = self._run_item(index)
+            span['outcome'] = outcome
+        return outcome, delay
+
+    def _run_item(self, index):
+        try:
+            outcome = self._download_item(index, self.urls[index - 1], self._ydl_opts)
+            self.failed.pop(index, None)
+            return outcome, None
+        except DownloadCancelledException:
+            self._is_cancelled = True
+            return 'cancelled', None
+        except Exception as e:
+            return self._item_error(index, e)
+
+    def _item_error(self, index, e):
+        # Cancellation raised from the hook may come back wrapped by yt-dlp
+        if "Download cancelled" in str(e):
+            self._is_cancelled = True
+            return 'cancelled', None
+        self.failed[index] = e
+        kind = classify_error(e)
+        attempt = self.attempts[index]
+        if self.retry_policy.should_retry(attempt, kind) and not self._is_cancelled:
+            delay = self.retry_policy.delay(attempt)
+            log.info(f"Video {index} failed ({kind}), retry {attempt + 1}/{self.retry_policy.max_attempts} in {delay:.1f}s: {e}")
+            self.progress.emit(f"Video {index} failed, retrying in {delay:.0f}s (attempt {attempt + 1}/{self.retry_policy.max_attempts})")
+            return 'retry', delay
+        # Report error but keep going with the rest of the batch
+        self._set_journal_state(index, FAILED, e)
+        self.error.emit(f"Error on video {index}: {str(e)}")
+        return 'failed', None
+
+    def finish(self):
+        # Called by the queue once every item reached a final state
+        self.batch_running = False
+        tracer.complete('batch', self._trace_batch_start, path=self.path, items=self.total_videos,
+                        failed=len(self.failed), skipped=self.skipped_videos, cancelled=self._is_cancelled)
+        self._close_engines()
+        try:
+            if self._is_cancelled:
+                if self._keep_partial:
+                    # Leave .part files and the journal for the next start
+                    return
+                self._cleanup_partial_file()
+                self._discard_finished_journal()
+                self.error.emit("Download cancelled by user.")
+                return
+
+            total_videos = self.total_videos
+            downloaded = total_videos - len(self.failed) - self.skipped_videos
+            if not self.failed:
+                msg = "Batch Download Complete!" if total_videos > 1 else "Download Complete!"
+            else:
+                msg = f"Batch finished: {downloaded} downloaded, {len(self.failed)} failed"
+            if self.skipped_videos:
+                msg += f" ({self.skipped_videos} already downloaded, skipped)"
+            if self.linked_videos:
+                msg += f" ({self.linked_videos} linked from earlier downloads)"
+            self._discard_finished_journal()
+            self.finished.emit(msg)
+        finally:
+            self._done.set()
+            self.done.emit()
+
+    def _discard_finished_journal(self):
+        # Failed or never started items keep the journal, so they are offered for resume later
+        if self.journal and not self.journal.remaining():
+            self.journal.discard()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def run(self):
+        # Standalone use (command line, scripts): a private queue with this batch's concurrency
+        from .jobqueue import JobQueue
+
+        queue = JobQueue(self.max_workers)
+        try:
+            queue.submit(self)
+            self.wait()
+        finally:
+            queue.shutdown()
+
+    def _cleanup_partial_file(self):
+        with self._lock:
+            current_files = list(self._current_files.values())
+
+        for current_file in current_files:
+            # List of potential temp extensions yt-dlp uses
+            files_to_check = [
+                current_file,
+                current_file + ".part",
+                current_file + ".part.segments",
+                current_file + ".ytdl"
+            ]
+
+            for f_path in files_to_check:
+                if os.path.exists(f_path):
+                    try:
+                        os.remove(f_path)
+                        log.debug(f"Cleaned up: {f_path}")
+                    except OSError:
+                        pass
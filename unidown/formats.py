@@ -0,0 +1,99 @@
+# Fields the format table and the per-episode probes actually look at
+FORMAT_FIELDS = (
+    'format_id', 'ext', 'width', 'height', 'fps', 'vcodec', 'acodec', 'abr', 'tbr', 'asr',
+    'filesize', 'filesize_approx', 'format_note', 'dynamic_range',
+)
+
+
+def compact_format_info(info):
+    # Small, JSON-friendly view of an extracted video used for per-episode caches
+    return {
+        'id': info.get('id'),
+        'title': info.get('title'),
+        'duration': info.get('duration'),
+        'formats': [
+            {k: fmt.get(k) for k in FORMAT_FIELDS if fmt.get(k) is not None}
+            for fmt in info.get('formats') or []
+        ],
+    }
+
+
+def is_audio_only(fmt):
+    return fmt.get('vcodec', 'none') == 'none' and fmt.get('acodec', 'none') != 'none'
+
+
+def format_size(fmt):
+    return fmt.get('filesize') or fmt.get('filesize_approx') or 0
+
+
+def estimated_size(fmt, duration=None):
+    # Reported size, else bitrate x duration; None when neither is known
+    size = format_size(fmt)
+    if not size and fmt.get('tbr') and duration:
+        size = fmt['tbr'] * 1000 / 8 * duration
+    return size or None
+
+
+def find_equivalent_format(formats, chosen):
+    # Returns (status, format) where status is 'exact', 'equivalent' or 'missing'
+    chosen_id = str(chosen.get('format_id', ''))
+    for fmt in formats:
+        if str(fmt.get('format_id', '')) == chosen_id:
+            return 'exact', fmt
+
+    if is_audio_only(chosen):
+        audio = [f for f in formats if is_audio_only(f)]
+        if audio:
+            return 'equivalent', max(audio, key=lambda f: f.get('abr') or f.get('tbr') or f.get('asr') or 0)
+        return 'missing', None
+
+    same_res = [
+        f for f in formats
+        if not is_audio_only(f) and f.get('height') == chosen.get('height') and f.get('width') == chosen.get('width')
+    ]
+    if not same_res:
+        same_res = [f for f in formats if not is_audio_only(f) and f.get('height') and f.get('height') == chosen.get('height')]
+    if same_res:
+        # Same rule as the format table: keep the largest file for a resolution
+        return 'equivalent', max(same_res, key=format_size)
+    return 'missing', None
+
+
+def fallback_format_spec(chosen, merge_audio=True):
+    # Closest yt-dlp selector for an episode that lacks the chosen format
+    if is_audio_only(chosen):
+        return 'bestaudio/best'
+    height = chosen.get('height')
+    if not height:
+        return 'bestvideo+bestaudio/best' if merge_audio else 'best'
+    if merge_audio:
+        return f'bestvideo[height<={height}]+bestaudio/best[height<={height}]/best'
+    return f'best[height<={height}]/bestvideo[height<={height}]/best'
+
+
+def compact_entry(entry):
+    # Playlist row as the episode list needs it; full extractions keep only their format table
+    url = entry.get('webpage_url') or entry.get('url')
+    compact = {
+        'url': url,
+        'webpage_url': url,
+        'id': entry.get('id'),
+        'ie_key': entry.get('ie_key') or entry.get('extractor_key'),
+        'title': entry.get('title'),
+        'duration': entry.get('duration'),
+    }
+    if not compact['title'] and entry.get('description'):
+        compact['description'] = entry['description']
+    if entry.get('formats'):
+        compact['formats'] = compact_format_info(entry)['formats']
+    return {k: v for k, v in compact.items() if v is not None}
+
+
+def episode_title(entry, playlist_title=''):
+    display_title = entry.get('title') or entry.get('description') or "Unknown"
+    # Clean Title (remove main video/playlist title prefix)
+    if playlist_title and display_title.startswith(playlist_title):
+        display_title = display_title[len(playlist_title):].strip()
+        if display_title.startswith('-') or display_title.startswith('_'):
+            display_title = display_title[1:].strip()
+    return display_title
@@ -0,0 +1,299 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .engine import Notifier
+
+log = logging.getLogger(__name__)
+
+# Scheduling policies
+FIFO = 'fifo'
+PRIORITY = 'priority'
+SHORTEST_FIRST = 'shortest'
+POLICIES = (FIFO, PRIORITY, SHORTEST_FIRST)
+
+# Job states
+QUEUED = 'queued'
+RUNNING = 'running'
+RETRY_WAIT = 'retry'
+# Downloaded and waiting for or in post-processing; the job no longer holds a slot
+POSTPROCESSING = 'postprocessing'
+DONE = 'done'
+SKIPPED = 'skipped'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+FINAL_STATES = (DONE, SKIPPED, FAILED, CANCELLED)
+
+# Upper bound for the global concurrency setting
+MAX_WORKERS_LIMIT = 16
+# Job threads beyond max_workers: a finished job still holds its thread briefly after its slot
+# is handed to the next one
+SPARE_JOB_THREADS = 2
+
+
+class Job:
+    # One item of a submitted batch
+
+    def __init__(self, batch, index, platform, priority):
+        self.batch = batch
+        self.index = index
+        self.item = batch.urls[index - 1]
+        self.platform = platform
+        self.priority = priority
+        self.duration = self.item.get('duration')
+        self.state = QUEUED
+        self.ready_at = 0.0
+        # Latest transfer payload (see unidown.progress) while running
+        self.progress = None
+        # (outcome, delay) of a post-processing stage that finished before run_item() returned
+        self.stage_outcome = None
+
+    @property
+    def title(self):
+        return self.item.get('title', '')
+
+
+class JobQueue:
+    # Application-wide scheduler for BatchDownloader items. Batches are split into jobs;
+    # a dispatcher thread starts the best eligible job whenever a slot frees up, honouring the
+    # global limit, per-platform limits and the scheduling policy. Retries wait in the queue
+    # until their backoff expires instead of holding a slot, and so do merges: an item that
+    # returns POSTPROCESSING frees its slot and reports its final state via stage_finished().
+
+    def __init__(self, max_workers=3, policy=FIFO, platform_limits=None):
+        self.changed = Notifier()
+        self.max_workers = max(1, int(max_workers))
+        self.policy = policy
+        self.platform_limits = dict(platform_limits or {})
+        self._jobs = []
+        self._running = {}
+        self._finished_batches = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pool_size = self.max_workers + SPARE_JOB_THREADS
+        self._executor = ThreadPoolExecutor(max_workers=self._pool_size, thread_name_prefix='unidown-job')
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name='unidown-dispatcher', daemon=True)
+        self._dispatcher.start()
+
+    # --- configuration, all adjustable while jobs run ---
+
+    def set_max_workers(self, max_workers):
+        with self._cond:
+            self.max_workers = max(1, min(int(max_workers), MAX_WORKERS_LIMIT))
+            if self.max_workers + SPARE_JOB_THREADS > self._pool_size:
+                # A pool cannot grow; jobs already running finish on the old one
+                retired = self._executor
+                self._pool_size = self.max_workers + SPARE_JOB_THREADS
+                self._executor = ThreadPoolExecutor(max_workers=self._pool_size, thread_name_prefix='unidown-job')
+                retired.shutdown(wait=False)
+            self._cond.notify_all()
+        self.changed.emit()
+
+    def set_platform_limit(self, platform, limit):
+        # 0 or None: no limit beyond the global one
+        with self._cond:
+            self.platform_limits[platform] = int(limit or 0)
+            self._cond.notify_all()
+        self.changed.emit()
+
+    def set_policy(self, policy):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        with self._cond:
+            self.policy = policy
+            self._cond.notify_all()
+        self.changed.emit()
+
+    # --- submitting and editing ---
+
+    def submit(self, batch, platform=None, priority=0):
+        batch.start(self)
+        jobs = [Job(batch, i + 1, platform, priority) for i in range(len(batch.urls))]
+
+        def track_progress(payload):
+            # Keep each job's latest transfer payload for the queue view
+            if payload.get('index'):
+                jobs[payload['index'] - 1].progress = payload
+        batch.progress_data.connect(track_progress)
+
+        with self._cond:
+            self._jobs.extend(jobs)
+            if not jobs:
+                self._finished_batches.add(batch)
+            self._cond.notify_all()
+        if not jobs:
+            batch.finish()
+        self.changed.emit()
+        return jobs
+
+    def set_priority(self, jobs, priority):
+        with self._cond:
+            for job in jobs:
+                job.priority = priority
+            self._cond.notify_all()
+        self.changed.emit()
+
+    def move(self, jobs, offset):
+        # Shifts jobs within the queue order (the FIFO order and every policy's tie-breaker)
+        with self._cond:
+            order = sorted(jobs, key=self._jobs.index, reverse=offset > 0)
+            for job in order:
+                pos = self._jobs.index(job)
+                new_pos = max(0, min(len(self._jobs) - 1, pos + offset))
+                self._jobs.insert(new_pos, self._jobs.pop(pos))
+            self._cond.notify_all()
+        self.changed.emit()
+
+    def cancel(self, batch, keep_partial=False):
+        # Queued items are dropped at once; running ones stop at their next progress callback
+        batch.stop(keep_partial)
+        self.wake()
+
+    def cancel_all(self, keep_partial=False):
+        with self._cond:
+            batches = {job.batch for job in self._jobs if job.state not in FINAL_STATES}
+        for batch in batches:
+            batch.stop(keep_partial)
+        self.wake()
+
+    def clear_finished(self):
+        with self._cond:
+            done = set(self._finished_batches)
+            self._jobs = [job for job in self._jobs if job.batch not in done]
+            self._finished_batches.clear()
+        self.changed.emit()
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    # --- inspection ---
+
+    def snapshot(self):
+        # Jobs in queue order plus the dispatch rank of each waiting job (1 = starts next)
+        with self._cond:
+            waiting = sorted((job for job in self._jobs if job.state in (QUEUED, RETRY_WAIT)),
+                             key=self._sort_key())
+            ranks = {id(job): rank for rank, job in enumerate(waiting, 1)}
+            return [(job, ranks.get(id(job))) for job in self._jobs]
+
+    def pending_count(self):
+        with self._cond:
+            return sum(1 for job in self._jobs if job.state not in FINAL_STATES)
+
+    def wait_idle(self, timeout=None):
+        # Waits until no job is running; returns False on timeout
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._running, timeout)
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    # --- scheduling ---
+
+    def _sort_key(self):
+        positions = {id(job): pos for pos, job in enumerate(self._jobs)}
+        if self.policy == PRIORITY:
+            return lambda job: (-job.priority, positions[id(job)])
+        if self.policy == SHORTEST_FIRST:
+            # Unknown durations go last; explicit priorities still win
+            return lambda job: (-job.priority, job.duration is None, job.duration or 0, positions[id(job)])
+        return lambda job: positions[id(job)]
+
+    def _next_job(self, now):
+        # Called with the lock held
+        running_per_platform = {}
+        for job in self._running.values():
+            running_per_platform[job.platform] = running_per_platform.get(job.platform, 0) + 1
+
+        candidates = []
+        for job in self._jobs:
+            if job.state not in (QUEUED, RETRY_WAIT):
+                continue
+            if job.ready_at > now:
+                continue
+            limit = self.platform_limits.get(job.platform) or 0
+            if limit and running_per_platform.get(job.platform, 0) >= limit:
+                continue
+            candidates.append(job)
+        return min(candidates, key=self._sort_key()) if candidates else None
+
+    def _dispatch_loop(self):
+        while True:
+            to_finish = []
+            with self._cond:
+                if self._closed:
+                    return
+                now = time.monotonic()
+                for job in self._jobs:
+                    if job.state in (QUEUED, RETRY_WAIT) and job.batch.cancelled:
+                        job.state = CANCELLED
+                started = 0
+                while len(self._running) < self.max_workers:
+                    job = self._next_job(now)
+                    if job is None:
+                        break
+                    job.state = RUNNING
+                    self._running[id(job)] = job
+                    self._executor.submit(self._run_job, job)
+                    started += 1
+                to_finish = self._collect_finished_batches()
+                # Sleep until something changes or the next retry becomes ready
+                waits = [job.ready_at - now for job in self._jobs if job.state == RETRY_WAIT and job.ready_at > now]
+                timeout = min(waits) if waits else None
+                if not to_finish and not started:
+                    self._cond.wait(timeout)
+            for batch in to_finish:
+                batch.finish()
+            if to_finish or started:
+                self.changed.emit()
+
+    def _collect_finished_batches(self):
+        # Batches whose items all reached a final state; called with the lock held
+        states = {}
+        for job in self._jobs:
+            if job.batch in self._finished_batches:
+                continue
+            states.setdefault(job.batch, []).append(job.state)
+        finished = [batch for batch, batch_states in states.items()
+                    if all(state in FINAL_STATES for state in batch_states)]
+        self._finished_batches.update(finished)
+        return finished
+
+    def _run_job(self, job):
+        try:
+            outcome, delay = job.batch.run_item(job.index)
+        except Exception:
+            # run_item reports item errors itself; this is a bug guard so the slot is never lost
+            log.exception(f"Job {job.index} crashed")
+            outcome, delay = FAILED, None
+        with self._cond:
+            self._running.pop(id(job), None)
+            if outcome == POSTPROCESSING and job.stage_outcome:
+                outcome, delay = job.stage_outcome
+            self._set_outcome(job, outcome, delay)
+        self.changed.emit()
+
+    def stage_finished(self, batch, index, outcome, delay=None):
+        # Final state of an item that left its slot in POSTPROCESSING
+        with self._cond:
+            job = next((job for job in self._jobs if job.batch is batch and job.index == index), None)
+            if job is not None and job.state == RUNNING:
+                # Fast merge: the job is still handing over its slot
+                job.stage_outcome = (outcome, delay)
+            elif job is not None:
+                self._set_outcome(job, outcome, delay)
+        self.changed.emit()
+
+    def _set_outcome(self, job, outcome, delay):
+        # Called with the lock held
+        if outcome == RETRY_WAIT:
+            job.ready_at = time.monotonic() + delay
+        job.state = outcome
+        job.progress = None
+        job.stage_outcome = None
+        self._cond.notify_all()
@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+import time
+import uuid
+
+from .paths import user_data_dir
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def journal_dir():
+    path = os.path.join(user_data_dir(), 'journals')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class BatchJournal:
+    # On-disk record of one download batch: what was selected, how, and how far each item got
+
+    def __init__(self, path, data):
+        self.path = path
+        self.data = data
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, items, path, format_str, proxy=None, playlist_title=None, platform=None):
+        data = {
+            'created': time.time(),
+            'platform': platform,
+            'playlist_title': playlist_title,
+            'path': os.path.abspath(path),
+            'format': format_str,
+            'proxy': proxy,
+            'items': [dict(item, state=PENDING) for item in items],
+        }
+        file_name = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.json"
+        journal = cls(os.path.join(journal_dir(), file_name), data)
+        journal.save()
+        return journal
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            return cls(path, json.load(f))
+
+    @classmethod
+    def list_unfinished(cls):
+        journals = []
+        for name in sorted(os.listdir(journal_dir())):
+            if not name.endswith('.json'):
+                continue
+            try:
+                journal = cls.load(os.path.join(journal_dir(), name))
+            except (OSError, ValueError):
+                continue
+            if journal.remaining():
+                journals.append(journal)
+        return journals
+
+    @property
+    def items(self):
+        return self.data['items']
+
+    def remaining(self):
+        return sum(1 for item in self.items if item['state'] != DONE)
+
+    def is_done(self, index):
+        return self.items[index - 1]['state'] == DONE
+
+    def set_state(self, index, state, error=None):
+        # index is 1-based, like DownloadWorker's item numbering
+        with self._lock:
+            item = self.items[index - 1]
+            item['state'] = state
+            if error:
+                item['error'] = str(error)
+            else:
+                item.pop('error', None)
+            self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        # Write-then-rename so a crash never leaves a truncated journal behind
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def discard(self):
+        with self._lock:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
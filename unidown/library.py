@@ -0,0 +1,97 @@
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from .paths import user_data_dir
+
+log = logging.getLogger(__name__)
+
+
+class ContentIndex:
+    # Every file UniDown finished, across all download folders, keyed by (extractor, video id,
+    # format). A later download of the same content is hardlinked from a known copy instead of
+    # being fetched again, or copied when the copy lives on another filesystem.
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_data_dir(), 'library.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS content ('
+            'extractor TEXT NOT NULL, video_id TEXT NOT NULL, format TEXT NOT NULL, path TEXT NOT NULL, '
+            'size INTEGER NOT NULL, added REAL NOT NULL, PRIMARY KEY (extractor, video_id, format, path))')
+        self._conn.commit()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @staticmethod
+    def key(info):
+        # (extractor, video id, format) of a processed yt-dlp info dict, or None
+        if not info.get('id') or not info.get('format_id'):
+            return None
+        extractor = (info.get('extractor_key') or info.get('extractor') or 'generic').lower()
+        video_id = str(info['id'])
+        if extractor == 'generic':
+            # Generic ids come from file names, which say nothing across sites; the page URL does
+            video_id = info.get('webpage_url') or info.get('url') or video_id
+        return extractor, video_id, str(info['format_id'])
+
+    def add(self, key, path):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO content VALUES (?, ?, ?, ?, ?, ?)',
+                               (*key, os.path.abspath(path), size, time.time()))
+            self._conn.commit()
+
+    def find(self, key):
+        # A recorded copy that is still in place with its recorded size; stale rows are dropped
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT path, size FROM content WHERE extractor = ? AND video_id = ? AND format = ? '
+                'ORDER BY added DESC', key).fetchall()
+        for path, size in rows:
+            try:
+                if os.path.getsize(path) == size:
+                    return path
+            except OSError:
+                pass
+            with self._lock:
+                self._conn.execute('DELETE FROM content WHERE extractor = ? AND video_id = ? AND format = ? AND path = ?',
+                                   (*key, path))
+                self._conn.commit()
+        return None
+
+    def link_existing(self, key, target):
+        # Puts a known copy at target; returns the source path, or None when there is none
+        source = self.find(key)
+        if source is None or os.path.abspath(source) == os.path.abspath(target):
+            return None
+        os.makedirs(os.path.dirname(target) or '.', exist_ok=True)
+        try:
+            os.link(source, target)
+            log.info(f"Hardlinked {target} from {source}")
+        except OSError:
+            # Other filesystem, or no hardlink support there
+            try:
+                shutil.copy2(source, target)
+            except OSError:
+                # No half-written file that would later pass for a finished download
+                if os.path.exists(target):
+                    os.remove(target)
+                raise
+            log.info(f"Copied {target} from {source}")
+        self.add(key, target)
+        return source
@@ -0,0 +1,53 @@
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from .cache import normalize_video_key
+
+# Pulls every supported link out of free text (a chat log, a spreadsheet column, a .txt file).
+# URLs are matched before bare IDs, so an ID inside a matched URL is not counted twice.
+_QUERY = r'(?:[?&][^\s<>"\'，。#]*)?'
+LINK_PATTERN = re.compile(
+    r'(?P<bilibili>https?://(?:www\.|m\.)?bilibili\.com/video/(?:BV[a-zA-Z0-9]{10}|av[0-9]+)/?' + _QUERY + ')'
+    r'|(?P<short>https?://b23\.tv/[a-zA-Z0-9]+)'
+    r'|(?P<youtube>https?://(?:www\.|m\.)?(?:youtube\.com/(?:watch\?(?:[^\s&#]*&)*v=|shorts/)|youtu\.be/)[a-zA-Z0-9_-]{11}'
+    + _QUERY + ')'
+    r'|(?P<playlist>https?://(?:www\.)?youtube\.com/playlist\?list=[a-zA-Z0-9_-]+' + _QUERY + ')'
+    r'|\b(?P<id>BV[a-zA-Z0-9]{10}|av[0-9]+)\b'
+    # Any other link is passed on as is for yt-dlp's generic extractors
+    r'|(?P<other>https?://[^\s<>"\'，。]+)')
+
+# Query parameters that pick what a link points at (the page of a multi-part video, the
+# playlist around a video); tracking and share parameters are dropped
+KEPT_PARAMS = {
+    'bilibili': ('p',),
+    'youtube': ('v', 'list'),
+    'playlist': ('list',),
+}
+# Sentence punctuation right after a link is not part of it
+TRAILING_PUNCTUATION = '.,;:!?)]}'
+
+
+def _keep_params(url, names):
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name in names]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+
+def extract_urls(text):
+    # Unique links in order of appearance; bare BV/av IDs become Bilibili video URLs
+    urls = []
+    seen = set()
+    for match in LINK_PATTERN.finditer(text or ''):
+        if match.group('id'):
+            url = f"https://www.bilibili.com/video/{match.group('id')}"
+        elif match.group('other'):
+            url = match.group('other').rstrip(TRAILING_PUNCTUATION)
+        elif match.lastgroup in KEPT_PARAMS:
+            url = _keep_params(match.group(0).rstrip(TRAILING_PUNCTUATION), KEPT_PARAMS[match.lastgroup])
+        else:
+            url = match.group(0)
+        key = normalize_video_key(url)
+        if key not in seen:
+            seen.add(key)
+            urls.append(url)
+    return urls
@@ -0,0 +1,51 @@
+import threading
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
+    'Referer': 'https://www.bilibili.com/'
+}
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+# b23.tv short link -> final URL, kept for the lifetime of the process
+_short_links = {}
+_short_links_lock = threading.Lock()
+
+
+def get_session(proxy=None):
+    # One keep-alive session per proxy setting, shared by every worker thread
+    key = proxy or ''
+    with _sessions_lock:
+        session = _sessions.get(key)
+        if session is None:
+            # requests is imported on first use; the GUI warms it up in the background
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            if proxy:
+                session.proxies = {'http': proxy, 'https': proxy}
+            _sessions[key] = session
+        return session
+
+
+def resolve_short_link(url, proxy=None, timeout=5):
+    with _short_links_lock:
+        if url in _short_links:
+            return _short_links[url]
+    r = get_session(proxy).head(url, allow_redirects=True, timeout=timeout)
+    with _short_links_lock:
+        _short_links[url] = r.url
+    return r.url
+
+
+def close_sessions():
+    # On exit (end of a command, window closed); a later get_session() starts a new session
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
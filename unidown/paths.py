@@ -0,0 +1,30 @@
+import os
+import sys
+
+
+def user_cache_dir():
+    # Per-user cache location (safe to delete at any time)
+    if sys.platform in ('win32', 'cygwin'):
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~')
+        path = os.path.join(base, 'UniDown', 'Cache')
+    elif sys.platform == 'darwin':
+        path = os.path.expanduser('~/Library/Caches/UniDown')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+        path = os.path.join(base, 'unidown')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def user_data_dir():
+    # Per-user state that must survive restarts
+    if sys.platform in ('win32', 'cygwin'):
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+        path = os.path.join(base, 'UniDown')
+    elif sys.platform == 'darwin':
+        path = os.path.expanduser('~/Library/Application Support/UniDown')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+        path = os.path.join(base, 'unidown')
+    os.makedirs(path, exist_ok=True)
+    return path
@@ -0,0 +1,63 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+log = logging.getLogger(__name__)
+
+# Second stage of the download pipeline. Once an item's streams are on disk, its merge, remux
+# and fixups are handed here and the job slot moves on to the next item's network transfer.
+# The CPU work happens in FFmpeg child processes; the pool's threads only drive them, so the
+# pool is sized to the CPU cores rather than to the download concurrency.
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+class PostProcessPool:
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or default_workers()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='unidown-postprocess')
+        self._cond = threading.Condition()
+        self._pending = 0
+
+    def submit(self, fn, *args):
+        with self._cond:
+            self._pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future):
+        with self._cond:
+            self._pending -= 1
+            self._cond.notify_all()
+        if not future.cancelled() and future.exception() is not None:
+            # Tasks report their own errors; this only catches bugs in them
+            log.error("Post-processing task crashed", exc_info=future.exception())
+
+    def pending(self):
+        # Items waiting for or in post-processing
+        with self._cond:
+            return self._pending
+
+    def wait_idle(self, timeout=None):
+        # Waits until every submitted item is through; returns False on timeout
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending, timeout)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def shared_postprocess_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PostProcessPool()
+        return _pool
@@ -0,0 +1,101 @@
+import os
+import shutil
+
+from .formats import estimated_size, find_equivalent_format, is_audio_only
+from .profiles import choose_formats
+
+# Pre-flight checks: how much a selection will take on disk and whether the target drive has
+# room for it, so a batch that cannot fit is caught up front rather than when the disk fills.
+
+# Always left free on top of the estimate (yt-dlp's .part files, journal, archive)
+SPACE_MARGIN = 256 * 1024 * 1024
+
+
+class InsufficientSpaceError(Exception):
+    pass
+
+
+def entry_size(formats, duration=None, chosen=None, merge_audio=True, profile=None):
+    # Estimated bytes for one entry with the dialog's chosen format row or a profile; None if unknown
+    if profile is not None:
+        streams = [f for f in choose_formats(formats, profile, duration) if f]
+    else:
+        fmt = find_equivalent_format(formats, chosen)[1] if chosen else None
+        if fmt is None:
+            return None
+        streams = [fmt]
+        if merge_audio and fmt.get('acodec', 'none') == 'none' and not is_audio_only(fmt):
+            audio = [f for f in formats if is_audio_only(f)]
+            if audio:
+                streams.append(max(audio, key=lambda f: f.get('abr') or f.get('tbr') or 0))
+    sizes = [estimated_size(f, duration) for f in streams]
+    if not sizes or None in sizes:
+        return None
+    return int(sum(sizes))
+
+
+def download_size(info):
+    # Estimated bytes for a processed yt-dlp info dict (after format selection), or None
+    streams = info.get('requested_formats') or [info]
+    sizes = [estimated_size(f, info.get('duration')) for f in streams]
+    if None in sizes:
+        return None
+    return int(sum(sizes))
+
+
+def estimate_batch(sizes):
+    # sizes: per-entry estimates, None where unknown. Unknown entries are extrapolated from the
+    # average of the known ones
+    known = [size for size in sizes if size is not None]
+    unknown = len(sizes) - len(known)
+    measured = sum(known)
+    total = measured + (measured / len(known) * unknown if known else 0)
+    return {
+        'entries': len(sizes),
+        'known': len(known),
+        'unknown': unknown,
+        'measured_bytes': measured,
+        'total_bytes': int(total),
+        # A merge briefly needs room for the streams and the merged file side by side
+        'largest_bytes': max(known, default=0),
+    }
+
+
+def free_space(path):
+    # Free bytes on the drive holding path (the folder may not exist yet)
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        parent = os.path.dirname(path)
+        if parent == path:
+            break
+        path = parent
+    try:
+        return shutil.disk_usage(path).free
+    except OSError:
+        return None
+
+
+def bytes_on_disk(filenames):
+    # Space taken by a download's files so far: finished streams plus the .part being written.
+    # Allocated blocks where the platform reports them, so sparse and preallocated files count right
+    total = 0
+    for filename in filenames:
+        for path in (filename, filename + '.part'):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            total += stat.st_blocks * 512 if hasattr(stat, 'st_blocks') else stat.st_size
+    return total
+
+
+def required_space(estimate):
+    return estimate['total_bytes'] + estimate['largest_bytes'] + SPACE_MARGIN
+
+
+def check_space(path, estimate):
+    # (free bytes, enough) for an estimate_batch() result; enough is None when free space is unknown
+    free = free_space(path)
+    if free is None or not estimate['known']:
+        return free, None
+    return free, free >= required_space(estimate)
@@ -0,0 +1,238 @@
+import json
+import os
+import re
+import threading
+
+from .formats import estimated_size, is_audio_only
+from .paths import user_data_dir
+
+# Format profiles are rule sets ("<=1080p, prefer AVC, audio >=128 kbps, cap 2 GB") that are
+# resolved against each entry's own format list when it downloads, instead of one format ID
+# picked from the first video. A profile is a plain dict so it can travel in download items
+# and batch journals:
+#   name, max_height, max_fps, vcodec ('avc', 'hevc', 'vp9', 'av1'), ext, min_abr (kbps),
+#   max_size (bytes, video + audio), audio_only
+
+CODEC_FAMILIES = {
+    'avc': ('avc', 'h264'),
+    'hevc': ('hev', 'hvc', 'h265'),
+    'vp9': ('vp9', 'vp09'),
+    'av1': ('av01', 'av1'),
+}
+CODEC_NAMES = {'avc': 'AVC', 'hevc': 'HEVC', 'vp9': 'VP9', 'av1': 'AV1'}
+SIZE_UNITS = {'': 1, 'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+
+BUILTIN_PROFILES = [
+    {'name': 'Best quality'},
+    {'name': '1080p AVC, 2 GB cap', 'max_height': 1080, 'vcodec': 'avc', 'min_abr': 128, 'max_size': 2 * 1024 ** 3},
+    {'name': '720p data saver', 'max_height': 720, 'max_size': 500 * 1024 ** 2},
+    {'name': 'Audio only', 'audio_only': True, 'min_abr': 128},
+]
+
+
+def codec_family(vcodec):
+    vcodec = (vcodec or '').lower()
+    for family, prefixes in CODEC_FAMILIES.items():
+        if vcodec.startswith(prefixes):
+            return family
+    return None
+
+
+def parse_profile(text, name=None):
+    # Rule syntax for the command line: "height<=1080,codec=avc,abr>=128,size<=2G" ("audio" = audio only)
+    profile = {'name': name or text}
+    for rule in filter(None, (part.strip() for part in text.split(','))):
+        if rule.lower() in ('audio', 'audio-only'):
+            profile['audio_only'] = True
+            continue
+        match = re.fullmatch(r'(\w+)\s*(<=|>=|=)\s*([\w.]+)', rule)
+        if not match:
+            raise ValueError(f"Cannot parse profile rule: {rule!r}")
+        key, op, value = match.group(1).lower(), match.group(2), match.group(3)
+        if key == 'height' and op == '<=':
+            profile['max_height'] = int(value.lower().rstrip('p'))
+        elif key == 'fps' and op == '<=':
+            profile['max_fps'] = int(value)
+        elif key in ('codec', 'vcodec') and op == '=':
+            if value.lower() not in CODEC_FAMILIES:
+                raise ValueError(f"Unknown codec {value!r}, expected one of: {', '.join(CODEC_FAMILIES)}")
+            profile['vcodec'] = value.lower()
+        elif key == 'ext' and op == '=':
+            profile['ext'] = value.lower()
+        elif key == 'abr' and op == '>=':
+            profile['min_abr'] = int(value)
+        elif key == 'size' and op == '<=':
+            size = re.fullmatch(r'(\d+(?:\.\d+)?)([KMG]?)B?', value.upper())
+            if not size:
+                raise ValueError(f"Cannot parse size: {value!r}")
+            profile['max_size'] = int(float(size.group(1)) * SIZE_UNITS[size.group(2)])
+        else:
+            raise ValueError(f"Unsupported profile rule: {rule!r}")
+    return profile
+
+
+def describe_profile(profile):
+    parts = []
+    if profile.get('audio_only'):
+        parts.append("audio only")
+    elif profile.get('max_height'):
+        parts.append(f"≤{profile['max_height']}p")
+    else:
+        parts.append("best resolution")
+    if profile.get('max_fps'):
+        parts.append(f"≤{profile['max_fps']} fps")
+    if profile.get('vcodec'):
+        parts.append(f"prefer {CODEC_NAMES.get(profile['vcodec'], profile['vcodec'])}")
+    if profile.get('ext'):
+        parts.append(f"prefer {profile['ext']}")
+    if profile.get('min_abr'):
+        parts.append(f"audio ≥{profile['min_abr']} kbps")
+    if profile.get('max_size'):
+        size = profile['max_size']
+        parts.append(f"cap {size / 1024 ** 3:g} GB" if size >= 1024 ** 3 else f"cap {size / 1024 ** 2:g} MB")
+    return ", ".join(parts)
+
+
+# --- ranking ---
+
+def _audio_key(fmt, profile):
+    bitrate = fmt.get('abr') or fmt.get('tbr') or 0
+    return (bitrate >= (profile.get('min_abr') or 0), profile.get('ext') is None or fmt.get('ext') == _audio_ext(profile),
+            bitrate)
+
+
+def _audio_ext(profile):
+    # mp4 video merges best with m4a audio
+    return 'm4a' if profile.get('ext') == 'mp4' else profile.get('ext')
+
+
+def _video_key(fmt, profile):
+    return (fmt.get('height') or 0,
+            profile.get('vcodec') is None or codec_family(fmt.get('vcodec')) == profile['vcodec'],
+            fmt.get('fps') or 0,
+            profile.get('ext') is None or fmt.get('ext') == profile['ext'],
+            fmt.get('tbr') or 0)
+
+
+def _fits(fmt, profile):
+    if profile.get('max_height') and (fmt.get('height') or 0) > profile['max_height']:
+        return False
+    if profile.get('max_fps') and (fmt.get('fps') or 0) > profile['max_fps']:
+        return False
+    return True
+
+
+def choose_formats(formats, profile, duration=None):
+    # Returns (video, audio) for one entry: video is a video-only or muxed format, audio an
+    # audio-only format to merge (or the pick itself for audio-only profiles). Either may be None.
+    videos, audios = [], []
+    for fmt in formats:
+        if fmt.get('ext') == 'mhtml' or (fmt.get('vcodec') == 'none' and fmt.get('acodec') == 'none'):
+            continue
+        (audios if is_audio_only(fmt) else videos).append(fmt)
+
+    audios.sort(key=lambda f: _audio_key(f, profile), reverse=True)
+    best_audio = audios[0] if audios else None
+    if profile.get('audio_only'):
+        if best_audio:
+            return None, best_audio
+        # No separate audio stream: the smallest muxed format still carries it
+        videos.sort(key=lambda f: estimated_size(f, duration) or float('inf'))
+        return (videos[0] if videos else None), None
+
+    candidates = [f for f in videos if _fits(f, profile)]
+    if not candidates and videos:
+        # Nothing within the limits: take the closest streams above them
+        lowest = min(f.get('height') or 0 for f in videos)
+        candidates = [f for f in videos if (f.get('height') or 0) == lowest]
+    candidates.sort(key=lambda f: _video_key(f, profile), reverse=True)
+
+    def pair(video):
+        return video, (best_audio if video.get('acodec') == 'none' else None)
+
+    cap = profile.get('max_size')
+    if not cap:
+        return pair(candidates[0]) if candidates else (None, best_audio)
+    smallest, smallest_size = None, None
+    for video in candidates:
+        choice = pair(video)
+        sizes = [estimated_size(f, duration) for f in choice if f]
+        if None in sizes:
+            # Unknown size cannot be checked against the cap; accept it
+            return choice
+        if sum(sizes) <= cap:
+            return choice
+        if smallest_size is None or sum(sizes) < smallest_size:
+            smallest, smallest_size = choice, sum(sizes)
+    return smallest or (None, best_audio)
+
+
+def profile_format_spec(formats, profile, duration=None):
+    # yt-dlp format spec for the streams choose_formats() picks, or None when nothing fits
+    video, audio = choose_formats(formats, profile, duration)
+    if video and audio:
+        return f"{video['format_id']}+{audio['format_id']}"
+    fmt = video or audio
+    return str(fmt['format_id']) if fmt else None
+
+
+def describe_choice(video, audio):
+    parts = []
+    if video:
+        resolution = f"{video['height']}p" if video.get('height') else str(video.get('format_id'))
+        codec = CODEC_NAMES.get(codec_family(video.get('vcodec')))
+        parts.append(f"{resolution} {codec}" if codec else resolution)
+    if audio:
+        bitrate = audio.get('abr') or audio.get('tbr')
+        parts.append(f"{bitrate:.0f}k audio" if bitrate else "audio")
+    return " + ".join(parts)
+
+
+class ProfileStore:
+    # Saved profiles in the user data folder; the built-in set until the user saves their own
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(user_data_dir(), 'format_profiles.json')
+        self._lock = threading.Lock()
+
+    def load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                profiles = json.load(f)
+            if isinstance(profiles, list):
+                return [p for p in profiles if isinstance(p, dict) and p.get('name')]
+        except (OSError, ValueError):
+            pass
+        return [dict(p) for p in BUILTIN_PROFILES]
+
+    def get(self, name):
+        for profile in self.load():
+            if profile['name'] == name:
+                return profile
+        return None
+
+    def save_profile(self, profile, replace=None):
+        # replace: name of the profile being edited, when it was renamed
+        with self._lock:
+            profiles = self.load()
+            names = [p['name'] for p in profiles]
+            for old_name in (replace, profile['name']):
+                if old_name in names:
+                    # Edited in place, so the list keeps its order
+                    position = names.index(old_name)
+                    profiles[position] = profile
+                    break
+            else:
+                profiles.append(profile)
+            # A rename onto an existing name replaces that profile too
+            self._write([p for p in profiles if p is profile or p['name'] != profile['name']])
+
+    def delete(self, name):
+        with self._lock:
+            self._write([p for p in self.load() if p['name'] != name])
+
+    def _write(self, profiles):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(profiles, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,78 @@
+import threading
+import time
+
+# Default cap on progress events per item (10 Hz)
+DEFAULT_INTERVAL = 0.1
+
+
+class ProgressThrottle:
+    # Coalesces high-frequency hook calls: at most one event per key per interval
+
+    def __init__(self, min_interval=DEFAULT_INTERVAL):
+        self.min_interval = min_interval
+        self._last = {}
+        self._lock = threading.Lock()
+
+    def should_emit(self, key, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last.get(key, 0) < self.min_interval:
+                return False
+            self._last[key] = now
+            return True
+
+    def forget(self, key):
+        with self._lock:
+            self._last.pop(key, None)
+
+
+def progress_payload(d, index=0, total=0, title=''):
+    # Structured view of a yt-dlp progress dict; formatting is left to the consumer
+    return {
+        'index': index,
+        'total': total,
+        'title': title,
+        'status': d.get('status'),
+        'filename': d.get('filename'),
+        'downloaded_bytes': d.get('downloaded_bytes') or 0,
+        'total_bytes': d.get('total_bytes') or d.get('total_bytes_estimate'),
+        'speed': d.get('speed'),
+        'eta': d.get('eta'),
+        'fragment_index': d.get('fragment_index'),
+        'fragment_count': d.get('fragment_count'),
+    }
+
+
+def format_bytes(num):
+    if num is None:
+        return "N/A"
+    for unit in ('B', 'KiB', 'MiB', 'GiB'):
+        if abs(num) < 1024:
+            return f"{num:.1f}{unit}" if unit != 'B' else f"{int(num)}B"
+        num /= 1024
+    return f"{num:.1f}TiB"
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return "--:--"
+    mins, secs = divmod(int(seconds), 60)
+    hours, mins = divmod(mins, 60)
+    return f"{hours:02d}:{mins:02d}:{secs:02d}" if hours > 0 else f"{mins:02d}:{secs:02d}"
+
+
+def format_progress(payload):
+    # One-line status text, e.g. "[3/12] Title (45.2% of 120.0MiB at 3.1MiB/s, ETA: 00:12)"
+    prefix = f"[{payload['index']}/{payload['total']}] {payload['title']}"
+    if payload['status'] == 'finished':
+        return f"{prefix} - Download Complete!"
+    total = payload.get('total_bytes')
+    done = payload.get('downloaded_bytes') or 0
+    if total:
+        amount = f"{done / total * 100:.1f}% of {format_bytes(total)}"
+    elif payload.get('fragment_count'):
+        amount = f"fragment {payload.get('fragment_index') or 0}/{payload['fragment_count']}"
+    else:
+        amount = format_bytes(done)
+    speed = f"{format_bytes(payload['speed'])}/s" if payload.get('speed') else "--"
+    return f"{prefix} ({amount} at {speed}, ETA: {format_eta(payload.get('eta'))})"
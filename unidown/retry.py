@@ -0,0 +1,74 @@
+import random
+import re
+import socket
+import ssl
+
+TRANSIENT = 'transient'
+PERMANENT = 'permanent'
+
+# Messages yt-dlp wraps around errors that are worth another attempt
+_TRANSIENT_PATTERNS = re.compile(
+    r'timed? ?out|connection (?:reset|refused|aborted)|remote end closed|temporary failure|'
+    r'name resolution|network is unreachable|incomplete ?read|content too short|'
+    r'HTTP Error (?:408|429|5\d\d)|Got error: \d+ bytes read|SSL|EOF occurred',
+    re.IGNORECASE)
+_PERMANENT_PATTERNS = re.compile(
+    r'unsupported url|private video|video unavailable|not available|members?[- ]only|'
+    r'has been removed|copyright|sign in to confirm your age|HTTP Error (?:400|401|404|410)|'
+    r'requested format is not available|no video formats',
+    re.IGNORECASE)
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=4, base_delay=2.0, max_delay=60.0, jitter=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+
+    def should_retry(self, attempt, kind):
+        return kind == TRANSIENT and attempt < self.max_attempts
+
+    def delay(self, attempt):
+        # Exponential backoff, randomized by +/- jitter so parallel items do not retry in lockstep
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+def _error_chain(exc):
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc_info = getattr(exc, 'exc_info', None)
+        if exc_info and exc_info[1] is not None and id(exc_info[1]) not in seen:
+            exc = exc_info[1]
+        else:
+            exc = exc.__cause__ or exc.__context__
+
+
+def classify_error(exc):
+    # Network hiccups are transient; extractor verdicts (removed, private, unsupported) are not
+    try:
+        from yt_dlp.networking.exceptions import HTTPError, TransportError
+        from yt_dlp.utils import ExtractorError, UnsupportedError, GeoRestrictedError
+    except ImportError:
+        HTTPError = TransportError = ExtractorError = UnsupportedError = GeoRestrictedError = ()
+
+    for err in _error_chain(exc):
+        if isinstance(err, HTTPError):
+            status = err.status
+            return TRANSIENT if status in (408, 429) or status >= 500 else PERMANENT
+        if isinstance(err, (UnsupportedError, GeoRestrictedError)):
+            return PERMANENT
+        if isinstance(err, (TransportError, socket.timeout, TimeoutError, ConnectionError, ssl.SSLError)):
+            return TRANSIENT
+        if isinstance(err, ExtractorError) and err.expected and not _TRANSIENT_PATTERNS.search(str(err)):
+            return PERMANENT
+
+    message = str(exc)
+    if _PERMANENT_PATTERNS.search(message):
+        return PERMANENT
+    if _TRANSIENT_PATTERNS.search(message):
+        return TRANSIENT
+    return PERMANENT
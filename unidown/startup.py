@@ -0,0 +1,103 @@
+import sys
+import threading
+import time
+
+# Startup timeline for --profile-startup. Times are relative to the first import of this
+# module, which main.py does before anything else; interpreter start-up is not included.
+_T0 = time.perf_counter()
+
+
+class StartupProfile:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events = []
+
+    def mark(self, name):
+        # Point in time on the calling thread, e.g. "window shown"
+        self._record(name, time.perf_counter() - _T0, None)
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def _record(self, name, at, duration):
+        with self._lock:
+            self._events.append((at, duration, threading.current_thread().name, name))
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        with self._lock:
+            events = sorted(self._events)
+        print("Startup profile (ms since unidown.startup import):", file=file)
+        for at, duration, thread, name in events:
+            took = f"{duration * 1000:8.1f} ms" if duration is not None else " " * 11
+            print(f"  {at * 1000:8.1f}  {took}  [{thread}] {name}", file=file)
+        file.flush()
+
+
+class _Span:
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        name = self.name if exc is None else f"{self.name} (failed: {exc})"
+        self.profile._record(name, end - _T0, end - self.start)
+        return False
+
+
+startup_profile = StartupProfile()
+
+
+def _import_yt_dlp():
+    import yt_dlp  # noqa: F401
+
+
+def _load_extractors():
+    import yt_dlp
+    # Building one YoutubeDL initialises the extractor registry and request handlers;
+    # the real Bilibili/YouTube extractor modules are resolved from the lazy classes
+    with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
+        for ie_key in ('BiliBili', 'Youtube', 'YoutubeTab'):
+            ydl.get_info_extractor(ie_key)
+
+
+def _load_http_stack():
+    from .net import get_session
+    get_session()
+
+
+def _load_downloader():
+    from . import transfer  # noqa: F401
+
+
+# In the order the first analysis needs them
+WARM_UP_STEPS = (
+    ("import yt_dlp", _import_yt_dlp),
+    ("extractor registry", _load_extractors),
+    ("HTTP stack", _load_http_stack),
+    ("segmented downloader", _load_downloader),
+)
+
+
+def warm_up(profile=startup_profile, cookies_browser=None):
+    # Pays the one-time import/initialisation costs off the GUI thread. Python's import lock
+    # makes a concurrent import on the GUI thread wait for the module instead of loading it
+    # twice. Steps are best effort: whatever fails here is retried by the real code path.
+    steps = list(WARM_UP_STEPS)
+    if cookies_browser:
+        from .cookies import shared_cookie_provider
+        steps.append(("browser cookies", shared_cookie_provider(cookies_browser).get_jar))
+    for name, step in steps:
+        try:
+            with profile.span(f"warm-up: {name}"):
+                step()
+        except Exception:
+            pass
+    profile.mark("warm-up done")
@@ -0,0 +1,93 @@
+import collections
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+
+# Phase timing for analysis and downloads. Spans are recorded as Chrome trace events and can be
+# exported for chrome://tracing or https://ui.perfetto.dev. Recording is off by default; a disabled
+# recorder costs one attribute check per span.
+
+# Oldest events are dropped beyond this, so a long-running session cannot grow without bound
+MAX_EVENTS = 200000
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s [%(threadName)s] %(message)s'
+
+
+class TraceRecorder:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self._events = collections.deque(maxlen=max_events)
+        self._thread_names = {}
+        self._pid = os.getpid()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    @staticmethod
+    def now():
+        # Trace timestamps are microseconds on the monotonic clock
+        return time.perf_counter_ns() // 1000
+
+    def span(self, name, **args):
+        # with tracer.span('analyze.view_api', url=url) as span: ... span['pages'] = n
+        if not self.enabled:
+            return contextlib.nullcontext(args)
+        return self._span(name, args)
+
+    @contextlib.contextmanager
+    def _span(self, name, args):
+        start = self.now()
+        try:
+            yield args
+        except BaseException as e:
+            args['error'] = type(e).__name__
+            raise
+        finally:
+            self.complete(name, start, **args)
+
+    def complete(self, name, start, **args):
+        # A span that started at `start` (from now()) and ends now, on the calling thread
+        if not self.enabled:
+            return
+        self._events.append({'name': name, 'cat': name.split('.', 1)[0], 'ph': 'X', 'ts': start,
+                             'dur': self.now() - start, 'pid': self._pid, 'tid': self._thread_id(), 'args': args})
+
+    def instant(self, name, **args):
+        if not self.enabled:
+            return
+        self._events.append({'name': name, 'cat': name.split('.', 1)[0], 'ph': 'i', 's': 't', 'ts': self.now(),
+                             'pid': self._pid, 'tid': self._thread_id(), 'args': args})
+
+    def _thread_id(self):
+        thread = threading.current_thread()
+        self._thread_names.setdefault(thread.ident, thread.name)
+        return thread.ident
+
+    def events(self):
+        return list(self._events)
+
+    def clear(self):
+        self._events.clear()
+
+    def export_chrome_trace(self, path):
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': 'UniDown'}}]
+        events += [{'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+                   for tid, name in list(self._thread_names.items())]
+        events += self.events()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, default=str)
+        os.replace(tmp_path, path)
+        return len(events)
+
+
+tracer = TraceRecorder()
+
+
+def configure_logging(verbose=False):
+    # Engine diagnostics go to stderr so command line output stays machine-readable
+    level = logging.DEBUG if verbose else os.environ.get('UNIDOWN_LOG_LEVEL', 'WARNING').upper()
+    logging.basicConfig(level=level, format=LOG_FORMAT, stream=sys.stderr)
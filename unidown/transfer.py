@@ -0,0 +1,298 @@
+import errno
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+
+from yt_dlp import YoutubeDL
+from yt_dlp.downloader.common import FileDownloader
+from yt_dlp.downloader.http import HttpFD
+from yt_dlp.networking import Request
+from yt_dlp.networking.exceptions import HTTPError, TransportError
+from yt_dlp.utils import DownloadError, determine_protocol, parse_http_range
+
+# Below this size a second connection costs more than it gains
+MIN_SEGMENT_SIZE = 1024 * 1024
+# Upper bound per range request; hosts like YouTube throttle long single responses
+MAX_SEGMENT_SIZE = 8 * 1024 * 1024
+READ_SIZE = 64 * 1024
+SEGMENTS_SUFFIX = '.segments'
+
+
+class SegmentedHttpFD(FileDownloader):
+    # Downloads one progressive http(s) file over several connections using Range requests.
+    # Chunks are pulled from a shared list so fast connections pick up more work; finished
+    # chunks are recorded next to the .part file so an interrupted download can continue.
+
+    FD_NAME = 'unidown-segmented'
+
+    def real_download(self, filename, info_dict):
+        connections = self.params.get('unidown_connections') or 1
+        url = info_dict['url']
+        headers = dict(info_dict.get('http_headers') or {})
+        tmpfilename = self.temp_name(filename)
+        state_path = tmpfilename + SEGMENTS_SUFFIX
+
+        total = None
+        preallocate = self.params.get('unidown_preallocate')
+        if (connections > 1 or preallocate) and (not os.path.exists(tmpfilename) or os.path.exists(state_path)):
+            total, last_modified = self._probe_size(url, headers)
+        if not total or (total < 2 * MIN_SEGMENT_SIZE and not preallocate):
+            # No range support, unknown size, small file, or a .part left by the plain downloader
+            return self._fallback(filename, info_dict)
+
+        chunk_size = info_dict.get('downloader_options', {}).get('http_chunk_size') or MAX_SEGMENT_SIZE
+        chunk_size = max(MIN_SEGMENT_SIZE, min(chunk_size, math.ceil(total / connections)))
+        chunks = [(start, min(start + chunk_size, total) - 1) for start in range(0, total, chunk_size)]
+
+        done = self._load_state(state_path, total, chunk_size)
+        if not done or not os.path.exists(tmpfilename) or os.path.getsize(tmpfilename) != total:
+            # Nothing to resume: no record, or a record whose .part is gone or does not match
+            done = set()
+            try:
+                os.remove(state_path)
+            except OSError:
+                pass
+            with open(tmpfilename, 'wb') as f:
+                if preallocate:
+                    allocate(f, total)
+                else:
+                    f.truncate(total)
+        pending = [i for i in range(len(chunks)) if i not in done]
+
+        self.report_destination(filename)
+        progress = {'downloaded': sum(chunks[i][1] - chunks[i][0] + 1 for i in done)}
+        resumed_bytes = progress['downloaded']
+        lock = threading.Lock()
+        stop = threading.Event()
+        throttle = self.params.get('unidown_throttle')
+
+        def worker():
+            with open(tmpfilename, 'r+b') as f:
+                while not stop.is_set():
+                    with lock:
+                        if not pending:
+                            return
+                        i = pending.pop(0)
+                    if not self._fetch_chunk(url, headers, chunks[i], f, stop, lock, progress, throttle):
+                        return
+                    with lock:
+                        done.add(i)
+                        self._save_state(state_path, total, chunk_size, done)
+
+        started = time.time()
+        executor = ThreadPoolExecutor(max_workers=min(connections, len(pending)) or 1)
+        futures = [executor.submit(worker) for _ in range(min(connections, len(pending)))]
+        try:
+            while True:
+                finished, running = wait(futures, timeout=0.2, return_when=FIRST_EXCEPTION)
+                for future in finished:
+                    # Surface the first failed connection; the others stop below
+                    future.result()
+                elapsed = time.time() - started
+                downloaded = progress['downloaded']
+                speed = (downloaded - resumed_bytes) / elapsed if elapsed > 0 else None
+                self._hook_progress({
+                    'status': 'downloading',
+                    'downloaded_bytes': downloaded,
+                    'total_bytes': total,
+                    'filename': filename,
+                    'tmpfilename': tmpfilename,
+                    'elapsed': elapsed,
+                    'speed': speed,
+                    'eta': (total - downloaded) / speed if speed else None,
+                    # Bytes were already paced per read; hooks must not throttle them again
+                    'unidown_throttled': bool(throttle),
+                }, info_dict)
+                if not running:
+                    break
+        finally:
+            stop.set()
+            executor.shutdown(wait=True)
+
+        try:
+            os.remove(state_path)
+        except OSError:
+            pass
+        self.try_rename(tmpfilename, filename)
+        if self.params.get('updatetime', True):
+            info_dict['filetime'] = self.try_utime(filename, last_modified)
+        self._hook_progress({
+            'status': 'finished',
+            'downloaded_bytes': total,
+            'total_bytes': total,
+            'filename': filename,
+            'elapsed': time.time() - started,
+        }, info_dict)
+        return True
+
+    def _fallback(self, filename, info_dict):
+        fd = HttpFD(self.ydl, self.params)
+        for ph in self._progress_hooks:
+            fd.add_progress_hook(ph)
+        return fd.real_download(filename, info_dict)
+
+    def _probe_size(self, url, headers):
+        try:
+            response = self.ydl.urlopen(Request(url, headers={**headers, 'Range': 'bytes=0-0'}))
+        except (HTTPError, TransportError):
+            return None, None
+        try:
+            if response.status != 206:
+                return None, None
+            _, _, total = parse_http_range(response.headers.get('Content-Range'))
+            return total, response.headers.get('Last-Modified')
+        finally:
+            response.close()
+
+    def _fetch_chunk(self, url, headers, chunk, f, stop, lock, progress, throttle=None):
+        start, end = chunk
+        offset = start
+        retries = self.params.get('retries', 10)
+        count = 0
+        while True:
+            try:
+                response = self.ydl.urlopen(Request(url, headers={**headers, 'Range': f'bytes={offset}-{end}'}))
+                try:
+                    if response.status != 206:
+                        raise DownloadError(f'Server ignored range request (HTTP {response.status})')
+                    while offset <= end:
+                        if stop.is_set():
+                            return False
+                        data = response.read(min(READ_SIZE, end - offset + 1))
+                        if not data:
+                            raise TransportError(f'Connection closed at byte {offset}')
+                        f.seek(offset)
+                        f.write(data)
+                        offset += len(data)
+                        with lock:
+                            progress['downloaded'] += len(data)
+                        if throttle:
+                            throttle(len(data))
+                    return True
+                finally:
+                    response.close()
+            except (HTTPError, TransportError) as e:
+                count += 1
+                retryable = not isinstance(e, HTTPError) or e.status == 429 or e.status >= 500
+                if not retryable or count > retries or stop.is_set():
+                    raise DownloadError(f'Segment {start}-{end} failed: {e}') from e
+                self.to_screen(f'[{self.FD_NAME}] Retrying segment {start}-{end} ({count}/{retries}): {e}')
+                time.sleep(min(2 ** count, 10) * 0.1)
+
+    def _load_state(self, state_path, total, chunk_size):
+        try:
+            with open(state_path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        if state.get('total') != total or state.get('chunk_size') != chunk_size:
+            return set()
+        return set(state.get('done', []))
+
+    def _save_state(self, state_path, total, chunk_size, done):
+        tmp_path = state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'total': total, 'chunk_size': chunk_size, 'done': sorted(done)}, f)
+        os.replace(tmp_path, state_path)
+
+
+class TransferYoutubeDL(YoutubeDL):
+    # Routes progressive http(s) downloads through SegmentedHttpFD when more than one
+    # connection per file is configured or files are preallocated; fragmented formats use yt-dlp's own
+    # concurrent_fragment_downloads instead
+
+    def dl(self, name, info, subtitle=False, test=False):
+        if (not test and not subtitle and name != '-' and info.get('url')
+                and ((self.params.get('unidown_connections') or 1) > 1 or self.params.get('unidown_preallocate'))
+                and not info.get('requested_formats')
+                and determine_protocol(info) in ('http', 'https')):
+            fd = SegmentedHttpFD(self, self.params)
+            for ph in self._progress_hooks:
+                fd.add_progress_hook(ph)
+            new_info = self._copy_infodict(info)
+            if new_info.get('http_headers') is None:
+                new_info['http_headers'] = self._calc_headers(new_info)
+            return fd.download(name, new_info, subtitle)
+        return super().dl(name, info, subtitle, test)
+
+    def process_info(self, info_dict):
+        # With a unidown_content_index, content finished before (same extractor, id and format)
+        # is linked into place instead of downloaded; take_linked_source() tells where it came from
+        content_index = self.params.get('unidown_content_index')
+        key = content_index and content_index.key(info_dict)
+        if key:
+            target = self.prepare_filename(info_dict)
+            try:
+                source = not os.path.exists(target) and content_index.link_existing(key, target)
+            except OSError as e:
+                self.report_warning(f"Could not reuse the existing copy, downloading instead: {e}")
+                source = None
+            if source:
+                self._linked_source = source
+                info_dict['filepath'] = target
+                return
+        preflight = self.params.get('unidown_preflight')
+        if preflight:
+            preflight(info_dict)
+        super().process_info(info_dict)
+
+    def take_linked_source(self):
+        source, self._linked_source = getattr(self, '_linked_source', None), None
+        return source
+
+    def post_process(self, filename, info, files_to_move=None):
+        # With unidown_defer_postprocess, an item's own post-processors (stream merge, fixups)
+        # are left for take_deferred_postprocess() so the caller can run them off the download thread
+        if self.params.get('unidown_defer_postprocess') and info.get('__postprocessors'):
+            # A copy: yt-dlp strips the keys it copied from the format's info once process_info returns
+            self._deferred_postprocess = (filename, dict(info), files_to_move)
+            info['filepath'] = filename
+            return info
+        return self._record_content(super().post_process(filename, info, files_to_move))
+
+    def take_deferred_postprocess(self):
+        deferred, self._deferred_postprocess = getattr(self, '_deferred_postprocess', None), None
+        return deferred
+
+    def run_deferred_postprocess(self, deferred):
+        # May run on another YoutubeDL than the one that deferred it; the item's post-processors
+        # were created for that one and report to this one from here on
+        filename, info, files_to_move = deferred
+        for pp in info.get('__postprocessors') or []:
+            pp.set_downloader(self)
+        return self._record_content(super().post_process(filename, info, files_to_move))
+
+    def _record_content(self, info):
+        content_index = self.params.get('unidown_content_index')
+        key = content_index and content_index.key(info)
+        if key and info.get('filepath'):
+            content_index.add(key, info['filepath'])
+        return info
+
+
+def allocate(f, size):
+    # Reserves the file's blocks up front: one contiguous extent on most filesystems instead of
+    # pieces scattered by out-of-order range writes
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(f.fileno(), 0, size)
+            return
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                raise
+            # Not supported by this filesystem; a plain resize still works
+    f.truncate(size)
+
+
+def transfer_options(connections, preallocate=False):
+    # Extra YoutubeDL params for N connections per file
+    connections = max(1, int(connections or 1))
+    return {
+        'unidown_connections': connections,
+        'concurrent_fragment_downloads': connections,
+        # Progressive files go through SegmentedHttpFD (even over one connection) to be preallocated
+        'unidown_preallocate': preallocate,
+    }